@@ -0,0 +1,64 @@
+import os
+import json
+import logging
+import argparse
+
+from src.config import LOGGING_LEVEL, PROCESSED_DATA_DIR, REPORTS_DIR, EMBEDDING_MODEL_NAME
+from src.parser.parser import load_tokenizer, token_lengths
+from src.vectorizer.vectorizer import iter_batches, iter_processed_chunks
+
+# chunks tokenized per call
+TOKENIZE_BATCH_SIZE = 512
+
+# --- Main Logic ---
+def setup_logging():
+	"""Sets up basic logging for the script."""
+	logging.basicConfig(level=LOGGING_LEVEL,
+						format='%(asctime)s - %(levelname)s - %(message)s')
+
+def audit_chunks(processed_data_dir: str) -> dict:
+	"""
+	Measures how much of the processed chunks the embedding model never sees
+	because they are longer than its max_seq_length.
+
+	ARGS:
+		processed_data_dir: str, the directory of processed chunks.
+	RETURNS:
+		report: dict, chunk and token totals, truncated tokens and chunks.
+	"""
+	_, max_seq_length = load_tokenizer()
+	chunks = tokens = truncated = truncated_chunks = 0
+	for batch in iter_batches(iter_processed_chunks(processed_data_dir), TOKENIZE_BATCH_SIZE):
+		for length in token_lengths([text for _, text, _ in batch]):
+			tokens += length
+			truncated += max(0, length - max_seq_length)
+			truncated_chunks += length > max_seq_length
+		chunks += len(batch)
+	return {
+		"embedding_model": EMBEDDING_MODEL_NAME,
+		"max_seq_length": max_seq_length,
+		"chunks": chunks,
+		"tokens": tokens,
+		"truncated_tokens": truncated,
+		"truncated_token_share": round(truncated / tokens, 4) if tokens else 0.0,
+		"truncated_chunks": truncated_chunks,
+	}
+
+def parse_args() -> argparse.Namespace:
+	arg_parser = argparse.ArgumentParser(description="Report how many chunk tokens the embedding model truncates.")
+	arg_parser.add_argument("--processed-dir", default=str(PROCESSED_DATA_DIR))
+	arg_parser.add_argument("--output", default=str(REPORTS_DIR / "chunk_token_audit.json"))
+	return arg_parser.parse_args()
+
+
+if __name__ == "__main__":
+	args = parse_args()
+	setup_logging()
+	report = audit_chunks(args.processed_dir)
+	os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+	with open(args.output, 'w') as f:
+		json.dump(report, f, indent=2)
+	logging.info(
+		f"{report['truncated_tokens']} of {report['tokens']} tokens ({report['truncated_token_share']:.1%}) in "
+		f"{report['truncated_chunks']} of {report['chunks']} chunks are past {report['max_seq_length']} and never embedded"
+	)
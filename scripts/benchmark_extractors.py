@@ -0,0 +1,119 @@
+import os
+import re
+import json
+import time
+import logging
+import argparse
+from typing import Dict, List, Set
+
+from src.config import LOGGING_LEVEL, CLONED_REPOS_DIR, REPORTS_DIR
+from src.scraper.scraper import is_doc_file
+from src.scraper.extractors import get_extractor, extract_html
+
+WORD_PATTERN = re.compile(r"\w+")
+
+# --- Helper Functions ---
+def setup_logging():
+	"""Sets up basic logging for the script."""
+	logging.basicConfig(level=LOGGING_LEVEL,
+						format='%(asctime)s - %(levelname)s - %(message)s')
+
+def words(text: str) -> Set[str]:
+	return set(WORD_PATTERN.findall(text.lower()))
+
+def find_markup_files(repos_dir: str) -> List[str]:
+	"""
+	Lists the Markdown, MDX and reStructuredText files the scraper would extract.
+	"""
+	filepaths = []
+	for root, _, files in os.walk(repos_dir):
+		if ".git" in root:
+			continue
+		filepaths.extend(os.path.join(root, f) for f in files if is_doc_file(f) and not f.lower().endswith(".html"))
+	return sorted(filepaths)
+
+# --- Main Logic ---
+def compare_file(filepath: str) -> Dict:
+	"""
+	Extracts one file with both its format extractor and trafilatura.
+
+	RETURNS:
+		result: dict, timings, output sizes and word overlap of the two outputs.
+			'trafilatura_recall' is the share of trafilatura's words that the
+			format extractor also kept.
+	"""
+	with open(filepath, 'r') as f:
+		content = f.read()
+	start = time.perf_counter()
+	fast_text = get_extractor(filepath)(content)
+	fast_seconds = time.perf_counter() - start
+	start = time.perf_counter()
+	trafilatura_text = extract_html(content)
+	trafilatura_seconds = time.perf_counter() - start
+
+	fast_words, trafilatura_words = words(fast_text), words(trafilatura_text)
+	union = fast_words | trafilatura_words
+	return {
+		"file": filepath,
+		"format": os.path.splitext(filepath)[1].lower(),
+		"bytes": len(content.encode('utf-8')),
+		"fast_seconds": fast_seconds,
+		"trafilatura_seconds": trafilatura_seconds,
+		"fast_empty": not fast_text.strip(),
+		"trafilatura_empty": not trafilatura_text.strip(),
+		"jaccard": len(fast_words & trafilatura_words) / len(union) if union else 1.0,
+		"trafilatura_recall": len(fast_words & trafilatura_words) / len(trafilatura_words) if trafilatura_words else None,
+	}
+
+def summarize(results: List[Dict]) -> Dict:
+	"""Aggregates per-file comparisons into throughput and parity figures."""
+	total_bytes = sum(r["bytes"] for r in results)
+	fast_seconds = sum(r["fast_seconds"] for r in results)
+	trafilatura_seconds = sum(r["trafilatura_seconds"] for r in results)
+	recalls = [r["trafilatura_recall"] for r in results if r["trafilatura_recall"] is not None]
+	return {
+		"files": len(results),
+		"mb": round(total_bytes / 1e6, 2),
+		"fast_mb_per_s": round(total_bytes / 1e6 / fast_seconds, 2) if fast_seconds else 0.0,
+		"trafilatura_mb_per_s": round(total_bytes / 1e6 / trafilatura_seconds, 2) if trafilatura_seconds else 0.0,
+		"speedup": round(trafilatura_seconds / fast_seconds, 1) if fast_seconds else 0.0,
+		"fast_empty": sum(r["fast_empty"] for r in results),
+		"trafilatura_empty": sum(r["trafilatura_empty"] for r in results),
+		"mean_jaccard": round(sum(r["jaccard"] for r in results) / len(results), 3) if results else 0.0,
+		"mean_trafilatura_recall": round(sum(recalls) / len(recalls), 3) if recalls else 0.0,
+	}
+
+def parse_args() -> argparse.Namespace:
+	arg_parser = argparse.ArgumentParser(description="Compare the markup extractors with trafilatura on the cloned repos.")
+	arg_parser.add_argument("--repos-dir", default=str(CLONED_REPOS_DIR))
+	arg_parser.add_argument("--worst", type=int, default=20, help="How many lowest-recall files to list for review.")
+	arg_parser.add_argument("--output", default=str(REPORTS_DIR / "extractor_benchmark.json"))
+	return arg_parser.parse_args()
+
+
+if __name__ == "__main__":
+	args = parse_args()
+	setup_logging()
+	filepaths = find_markup_files(args.repos_dir)
+	logging.info(f"Comparing extractors on {len(filepaths)} files in {args.repos_dir}")
+
+	results = []
+	for filepath in filepaths:
+		try:
+			results.append(compare_file(filepath))
+		except (OSError, UnicodeDecodeError) as e:
+			logging.warning(f"Skipping {filepath}: {e}")
+
+	report = {
+		"overall": summarize(results),
+		"by_format": {fmt: summarize([r for r in results if r["format"] == fmt]) for fmt in sorted({r["format"] for r in results})},
+		"worst_recall": sorted(
+			(r for r in results if r["trafilatura_recall"] is not None),
+			key=lambda r: r["trafilatura_recall"]
+		)[:args.worst],
+	}
+	os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+	with open(args.output, 'w') as f:
+		json.dump(report, f, indent=2)
+	print(json.dumps({"overall": report["overall"], "by_format": report["by_format"]}, indent=2))
+	logging.info(f"Extractor benchmark written to {args.output}")
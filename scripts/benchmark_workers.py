@@ -0,0 +1,192 @@
+import os
+import sys
+import json
+import time
+import signal
+import asyncio
+import logging
+import argparse
+import subprocess
+from typing import Dict, List
+
+import httpx
+
+from src.config import LOGGING_LEVEL, REPORTS_DIR
+from src.loadtest.load_generator import load_question_mix, positive_float, run_load_test
+
+# --- Helper Functions ---
+def setup_logging():
+	"""Sets up basic logging for the script."""
+	logging.basicConfig(level=LOGGING_LEVEL,
+						format='%(asctime)s - %(levelname)s - %(message)s')
+
+def child_pids(pid: int) -> List[int]:
+	"""
+	Lists the direct children of a process by scanning /proc.
+	"""
+	children = []
+	for entry in os.listdir("/proc"):
+		if not entry.isdigit():
+			continue
+		try:
+			with open(f"/proc/{entry}/stat", 'r') as f:
+				# the command name may contain spaces, so split after its closing parenthesis
+				fields = f.read().rsplit(")", 1)[1].split()
+		except OSError:
+			continue
+		if int(fields[1]) == pid:
+			children.append(int(entry))
+	return sorted(children)
+
+def memory_usage_mb(pid: int) -> Dict[str, float]:
+	"""
+	Reads the resident (RSS) and proportional (PSS) set size of a process.
+	PSS splits each shared page between the processes mapping it, so the PSS
+	of all server processes adds up to their real memory footprint.
+	"""
+	usage = {"rss_mb": 0.0, "pss_mb": 0.0}
+	with open(f"/proc/{pid}/smaps_rollup", 'r') as f:
+		for line in f:
+			key, _, value = line.partition(":")
+			if key in ("Rss", "Pss"):
+				usage[f"{key.lower()}_mb"] = round(int(value.split()[0]) / 1024, 1)
+	return usage
+
+def wait_until_ready(base_url: str, server: subprocess.Popen, workers: int, timeout: float) -> None:
+	"""
+	Waits for all workers to be forked and for the app to answer on '/'.
+	"""
+	deadline = time.monotonic() + timeout
+	while time.monotonic() < deadline:
+		if server.poll() is not None:
+			raise RuntimeError(f"Server exited with code {server.returncode} during startup.")
+		if len(child_pids(server.pid)) >= workers:
+			try:
+				if httpx.get(base_url + "/", timeout=1.0).status_code == 200:
+					return
+			except httpx.HTTPError:
+				pass
+		time.sleep(0.5)
+	raise TimeoutError(f"Server with {workers} workers was not ready after {timeout}s.")
+
+def stop_process(process: subprocess.Popen) -> None:
+	process.send_signal(signal.SIGTERM)
+	try:
+		process.wait(timeout=30)
+	except subprocess.TimeoutExpired:
+		process.kill()
+		process.wait()
+
+# --- Main Logic ---
+def benchmark_workers(
+	workers: int,
+	questions: List[str],
+	weights: List[float],
+	args: argparse.Namespace,
+	env: Dict[str, str]
+) -> Dict:
+	"""
+	Starts the pre-fork server with a number of workers, drives it with the
+	load generator and measures throughput, latency and memory per process.
+
+	ARGS:
+		workers: int, the number of worker processes.
+		questions: list[str], the question mix.
+		weights: list[float], relative weight of each question.
+		args: argparse.Namespace, the benchmark options.
+		env: dict, environment of the server process.
+	RETURNS:
+		result: dict, load test report plus RSS/PSS of the parent and workers.
+	"""
+	base_url = f"http://127.0.0.1:{args.port}"
+	server = subprocess.Popen(
+		[sys.executable, "-m", "src.rag_app.server", "--host", "127.0.0.1", "--port", str(args.port), "--workers", str(workers)],
+		env=env
+	)
+	try:
+		wait_until_ready(base_url, server, workers, args.startup_timeout)
+		# warm every worker up before measuring
+		asyncio.run(run_load_test(base_url + "/query", questions, weights, rate=workers * 2, duration=args.warmup, seed=0))
+		report = asyncio.run(run_load_test(
+			base_url + "/query", questions, weights, args.rate, args.duration,
+			max_in_flight=args.max_in_flight, seed=args.seed
+		))
+		parent = memory_usage_mb(server.pid)
+		worker_memory = [memory_usage_mb(pid) for pid in child_pids(server.pid)]
+	finally:
+		stop_process(server)
+
+	result = {
+		"workers": workers,
+		"throughput_rps": report["throughput_rps"],
+		"latency_ms": report["latency_ms"],
+		"ok": report["ok"],
+		"errors": report["errors"] + report["timeouts"],
+		"dropped": report["dropped"],
+		"parent_rss_mb": parent["rss_mb"],
+		"worker_rss_mb": round(sum(m["rss_mb"] for m in worker_memory) / len(worker_memory), 1),
+		"worker_pss_mb": round(sum(m["pss_mb"] for m in worker_memory) / len(worker_memory), 1),
+		"total_pss_mb": round(parent["pss_mb"] + sum(m["pss_mb"] for m in worker_memory), 1),
+	}
+	logging.info(f"{workers} workers: {result}")
+	return result
+
+def format_table(results: List[Dict]) -> str:
+	"""Renders the benchmark results as a markdown table."""
+	lines = [
+		"| workers | throughput (req/s) | p50 (ms) | p99 (ms) | errors | dropped | worker RSS (MB) | worker PSS (MB) | total PSS (MB) |",
+		"|---|---|---|---|---|---|---|---|---|",
+	]
+	for r in results:
+		lines.append(
+			f"| {r['workers']} | {r['throughput_rps']} | {r['latency_ms']['p50']} | {r['latency_ms']['p99']} "
+			f"| {r['errors']} | {r['dropped']} | {r['worker_rss_mb']} | {r['worker_pss_mb']} | {r['total_pss_mb']} |"
+		)
+	return "\n".join(lines)
+
+def parse_args() -> argparse.Namespace:
+	arg_parser = argparse.ArgumentParser(description="Benchmark per-worker memory and throughput of the pre-fork server.")
+	arg_parser.add_argument("--questions", required=True, help="Question mix for the load generator.")
+	arg_parser.add_argument("--workers", default="1,2,4,8", help="Comma-separated worker counts to benchmark.")
+	arg_parser.add_argument("--rate", type=positive_float, default=50.0, help="Arrival rate; set it above the expected capacity.")
+	arg_parser.add_argument("--duration", type=float, default=60.0)
+	arg_parser.add_argument("--warmup", type=float, default=10.0)
+	arg_parser.add_argument("--max-in-flight", type=int, default=256)
+	arg_parser.add_argument("--seed", type=int, default=1)
+	arg_parser.add_argument("--port", type=int, default=8100)
+	arg_parser.add_argument("--ollama-url", default=None, help="Use this Ollama instead of starting the fake server.")
+	arg_parser.add_argument("--fake-ollama-port", type=int, default=11500)
+	arg_parser.add_argument("--startup-timeout", type=float, default=300.0)
+	arg_parser.add_argument("--output", default=str(REPORTS_DIR / "worker_benchmark.json"))
+	return arg_parser.parse_args()
+
+
+if __name__ == "__main__":
+	args = parse_args()
+	setup_logging()
+	mix_questions, mix_weights = load_question_mix(args.questions)
+
+	fake_ollama = None
+	ollama_url = args.ollama_url
+	if ollama_url is None:
+		# a fast fake LLM keeps the benchmark focused on the app's own CPU and memory
+		fake_ollama = subprocess.Popen([
+			sys.executable, "-m", "src.loadtest.fake_ollama", "--host", "127.0.0.1", "--port", str(args.fake_ollama_port),
+			"--ttft-ms", "20", "--tokens-per-sec", "2000", "--max-concurrency", "1024"
+		])
+		ollama_url = f"http://127.0.0.1:{args.fake_ollama_port}"
+	server_env = dict(os.environ, OLLAMA_BASE_URL=ollama_url)
+
+	results = []
+	try:
+		for worker_count in [int(w) for w in args.workers.split(",")]:
+			results.append(benchmark_workers(worker_count, mix_questions, mix_weights, args, server_env))
+	finally:
+		if fake_ollama is not None:
+			stop_process(fake_ollama)
+
+	os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+	with open(args.output, 'w') as f:
+		json.dump(results, f, indent=2)
+	print(format_table(results))
+	logging.info(f"Benchmark results written to {args.output}")
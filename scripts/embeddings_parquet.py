@@ -0,0 +1,41 @@
+import logging
+import argparse
+
+from src.config import LOGGING_LEVEL, DB_DIR, COLLECTION_NAME, VECTORIZE_BATCH_SIZE
+from src.vectorizer.parquet_io import export_collection, import_collection
+
+# --- Main Logic ---
+def setup_logging():
+	"""Sets up basic logging for the script."""
+	logging.basicConfig(level=LOGGING_LEVEL,
+						format='%(asctime)s - %(levelname)s - %(message)s')
+
+def parse_args() -> argparse.Namespace:
+	"""Parses the command line options of the export and import commands."""
+	arg_parser = argparse.ArgumentParser(description="Export a Chroma collection to Parquet, or rebuild one from an export.")
+	subparsers = arg_parser.add_subparsers(dest="command", required=True)
+
+	export_parser = subparsers.add_parser("export", help="Write ids, documents, metadata and embeddings to a Parquet file.")
+	export_parser.add_argument("output", help="The Parquet file to write.")
+	export_parser.add_argument("--collection", default=COLLECTION_NAME)
+
+	import_parser = subparsers.add_parser("import", help="Build a collection from an export without re-encoding.")
+	import_parser.add_argument("input", help="The Parquet file to read.")
+	import_parser.add_argument("--collection", default=None, help="Defaults to the exported collection's name.")
+	import_parser.add_argument("--replace", action="store_true", help="Delete an existing collection of that name first.")
+
+	for subparser in (export_parser, import_parser):
+		subparser.add_argument("--db-dir", default=str(DB_DIR))
+		subparser.add_argument("--batch-size", type=int, default=VECTORIZE_BATCH_SIZE)
+	return arg_parser.parse_args()
+
+
+if __name__ == "__main__":
+	args = parse_args()
+	setup_logging()
+	if args.command == "export":
+		export_metadata = export_collection(args.output, args.db_dir, args.collection, args.batch_size)
+		logging.info(f"Exported {export_metadata['count']} embeddings of '{args.collection}' to {args.output}")
+	else:
+		imported = import_collection(args.input, args.db_dir, args.collection, args.batch_size, args.replace)
+		logging.info(f"Imported {imported} embeddings into {args.db_dir}")
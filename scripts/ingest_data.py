@@ -1,14 +1,20 @@
 import logging
+import argparse
+import contextvars
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List
 import shutil
 import os
 import stat
 
-from src.config import URLS_FILE, LOGGING_LEVEL, CLONED_REPOS_DIR
-from src.scraper.scraper import scrape_single_repo
+from src.config import URLS_FILE, LOGGING_LEVEL, CLONED_REPOS_DIR, REPORTS_DIR, DEDUP_ENABLED, VECTORIZE_JOURNAL_FILE
+from src.profiling import profiler
+from src.profiling.profiler import PipelineProfiler
+from src.scraper.scraper import scrape_single_repo, sanitize_filename
 from src.parser.parser import parse_and_chunk_files
+from src.deduplicator.deduplicator import deduplicate_chunk_stores
 from src.vectorizer.vectorizer import vectorize_and_store
+from src.vectorizer.journal import unfinished_run
 
 # --- Main Logic ---
 def setup_logging():
@@ -27,6 +33,14 @@ def load_base_urls(filepath: str) -> List[str]:
 		logging.error(f"Error: URL file not found at '{filepath}'. Please create it.")
 		return []
 
+def scrape_with_profile(url: str) -> str:
+	"""
+	Scrapes a single repository as its own 'scraper:<repo>' profiling stage.
+	"""
+	repo_name = sanitize_filename(url).replace('.txt', '')
+	with profiler.stage(f"scraper:{repo_name}", per_thread=True):
+		return scrape_single_repo(url)
+
 def run_scraper(urls_to_scrape: List[str]) -> List[str]:
 	"""
 	Scrapes all URLs in parallel and returns a list of file paths.
@@ -34,7 +48,11 @@ def run_scraper(urls_to_scrape: List[str]) -> List[str]:
 	logging.info("--- Starting Scraper Step ---")
 	scraped_files = []
 	with ThreadPoolExecutor(max_workers=5) as executor:
-		future_to_url = {executor.submit(scrape_single_repo, url): url for url in urls_to_scrape}
+		# each task runs in a copy of the caller's context so it reports into the active profiler
+		future_to_url = {
+			executor.submit(contextvars.copy_context().run, scrape_with_profile, url): url
+			for url in urls_to_scrape
+		}
 		for future in as_completed(future_to_url):
 			url = future_to_url[future]
 			try:
@@ -57,12 +75,21 @@ def run_parser(scraped_file_paths: List[str]) -> str:
 	logging.info("--- Parser Step Complete ---")
 	return output_dir
 
-def run_vectorizer(processed_data_dir: str) -> None:
+def run_deduplicator(processed_data_dir: str) -> None:
+	"""
+	Removes exact and near-duplicate chunks before they are embedded.
+	"""
+	logging.info("--- Starting Deduplication Step ---")
+	report = deduplicate_chunk_stores(processed_data_dir)
+	logging.info(f"Deduplication kept {report['chunks_out']} of {report['chunks_in']} chunks.")
+	logging.info("--- Deduplication Step Complete ---")
+
+def run_vectorizer(processed_data_dir: str, resume: bool = False) -> None:
 	"""
 	Vectorizes data and stores it in ChromaDB.
 	"""
 	logging.info("--- Starting Vectorizer Step ---")
-	vectorize_and_store(processed_data_dir)
+	vectorize_and_store(processed_data_dir, resume=resume)
 	logging.info("--- Vectorizer Step Complete ---")
 
 def run_cleanup(directory_to_clean: str) -> None:
@@ -93,20 +120,59 @@ def run_cleanup(directory_to_clean: str) -> None:
 	logging.info("--- Cleanup Step Complete")
 
 
+def parse_args() -> argparse.Namespace:
+	"""Parses the command line options of the ingestion pipeline."""
+	arg_parser = argparse.ArgumentParser(description="Scrape, chunk and vectorize the MLOps documentation.")
+	arg_parser.add_argument(
+		"--profile-stage",
+		default=None,
+		help="Dump a cProfile file for this stage, e.g. 'parser', 'vectorizer:encode' or 'scraper:zenml-io_zenml'."
+	)
+	arg_parser.add_argument("--report-dir", default=str(REPORTS_DIR), help="Where to write the profiling report.")
+	arg_parser.add_argument(
+		"--resume",
+		action="store_true",
+		help="Continue an interrupted vectorization from its journal instead of scraping and parsing again."
+	)
+	return arg_parser.parse_args()
+
+
 if __name__ == "__main__":
+	args = parse_args()
 	setup_logging()
 	logging.info("Starting data ingestion pipeline...")
 
-	urls = load_base_urls(str(URLS_FILE))
-	if not urls:
-		logging.warning("No URLs found. Exiting pipeline.")
-	else:
-		scraped_paths = run_scraper(urls)
-		if not scraped_paths:
-			logging.warning("Scraper did not produce any files. Exiting.")
-		else:
-			processed_dir = run_parser(scraped_paths)
-			run_vectorizer(processed_dir)
-			run_cleanup(str(CLONED_REPOS_DIR))
-			logging.info("Data ingestion pipeline has completed successfully.")
+	pipeline_profiler = PipelineProfiler(profile_stage=args.profile_stage, output_dir=args.report_dir)
+	with pipeline_profiler.activate():
+		try:
+			interrupted_run = unfinished_run(str(VECTORIZE_JOURNAL_FILE)) if args.resume else None
+			urls = [] if interrupted_run else load_base_urls(str(URLS_FILE))
+			if interrupted_run:
+				# the processed chunks of the interrupted run are still on disk
+				logging.info(f"Resuming the interrupted vectorization of {interrupted_run['processed_data_dir']}")
+				with profiler.stage("vectorizer"):
+					run_vectorizer(interrupted_run["processed_data_dir"], resume=True)
+				with profiler.stage("cleanup"):
+					run_cleanup(str(CLONED_REPOS_DIR))
+				logging.info("Data ingestion pipeline has completed successfully.")
+			elif not urls:
+				logging.warning("No URLs found. Exiting pipeline.")
+			else:
+				with profiler.stage("scraper"):
+					scraped_paths = run_scraper(urls)
+				if not scraped_paths:
+					logging.warning("Scraper did not produce any files. Exiting.")
+				else:
+					with profiler.stage("parser"):
+						processed_dir = run_parser(scraped_paths)
+					if DEDUP_ENABLED:
+						with profiler.stage("deduplicator"):
+							run_deduplicator(processed_dir)
+					with profiler.stage("vectorizer"):
+						run_vectorizer(processed_dir, resume=args.resume)
+					with profiler.stage("cleanup"):
+						run_cleanup(str(CLONED_REPOS_DIR))
+					logging.info("Data ingestion pipeline has completed successfully.")
+		finally:
+			pipeline_profiler.write_report()
 	
\ No newline at end of file
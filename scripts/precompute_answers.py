@@ -0,0 +1,94 @@
+import json
+import logging
+import argparse
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from src.config import LOGGING_LEVEL, ANSWER_SNAPSHOT_FILE, BATCH_QUERY_PARALLELISM
+from src.rag_app.answer_cache import write_snapshot, normalize_question
+from src.rag_app import main as rag_app
+
+# questions retrieved together per collection query
+RETRIEVAL_BATCH_SIZE = 256
+
+# --- Main Logic ---
+def setup_logging():
+	"""Sets up basic logging for the script."""
+	logging.basicConfig(level=LOGGING_LEVEL,
+						format='%(asctime)s - %(levelname)s - %(message)s')
+
+def load_questions(filepath: str, top: int = 0) -> List[str]:
+	"""
+	Loads the questions to precompute, most frequent first.
+
+	A '.jsonl' file is read as a query log with one {"question": ...} record
+	per line (an optional "count" field weights a record); any other file is
+	read as one question per line. Questions that normalize to the same key
+	are merged.
+
+	ARGS:
+		filepath: str, the question list or query log.
+		top: int, keep only the most frequent questions (0 keeps all).
+	RETURNS:
+		questions: list[str], one representative wording per distinct question.
+	"""
+	counts: Counter = Counter()
+	wording = {}
+	with open(filepath, 'r') as f:
+		for line in f:
+			line = line.strip()
+			if not line:
+				continue
+			if filepath.endswith(".jsonl"):
+				record = json.loads(line)
+				question, count = record["question"], int(record.get("count", 1))
+			else:
+				question, count = line, 1
+			key = normalize_question(question)
+			wording.setdefault(key, question)
+			counts[key] += count
+	ranked = [key for key, _ in counts.most_common(top or None)]
+	logging.info(f"Loaded {len(counts)} distinct questions from '{filepath}', precomputing {len(ranked)}")
+	return [wording[key] for key in ranked]
+
+def precompute_answers(questions: List[str], parallelism: int) -> List[dict]:
+	"""
+	Runs questions through the serving retrieval and prompt pipeline.
+	Questions whose generation fails are left out of the snapshot.
+	"""
+	answers = []
+	with ThreadPoolExecutor(max_workers=parallelism) as executor:
+		for start in range(0, len(questions), RETRIEVAL_BATCH_SIZE):
+			batch = questions[start:start + RETRIEVAL_BATCH_SIZE]
+			documents = rag_app.retrieve_batch(batch)
+			for result in executor.map(rag_app.answer_with_documents, range(start, start + len(batch)), batch, documents):
+				if result.get("error"):
+					logging.warning(f"Skipping question that failed to generate: {result['question']}")
+					continue
+				answers.append({key: result[key] for key in ("question", "answer", "source_documents")})
+			logging.info(f"Precomputed {len(answers)} of {min(start + len(batch), len(questions))} questions so far")
+	return answers
+
+def parse_args() -> argparse.Namespace:
+	"""Parses the command line options of the precompute job."""
+	arg_parser = argparse.ArgumentParser(description="Precompute answers to popular questions for the Q&A bot.")
+	arg_parser.add_argument("--questions", required=True, help="Question list (one per line) or .jsonl query log.")
+	arg_parser.add_argument("--top", type=int, default=0, help="Only precompute the N most frequent questions.")
+	arg_parser.add_argument("--parallelism", type=int, default=BATCH_QUERY_PARALLELISM, help="Concurrent generations.")
+	arg_parser.add_argument("--output", default=str(ANSWER_SNAPSHOT_FILE), help="Where to write the answer snapshot.")
+	return arg_parser.parse_args()
+
+
+if __name__ == "__main__":
+	args = parse_args()
+	setup_logging()
+	if rag_app.pipeline is None:
+		logging.error("RAG pipeline is not available. Exiting.")
+		raise SystemExit(1)
+
+	collection_version = rag_app.pipeline.collection_version
+	questions = load_questions(args.questions, args.top)
+	answers = precompute_answers(questions, args.parallelism)
+	write_snapshot(args.output, answers, collection_version)
+	logging.info(f"Answer snapshot for collection version '{collection_version}' is ready at {args.output}")
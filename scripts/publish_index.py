@@ -0,0 +1,109 @@
+import os
+import shutil
+import logging
+import argparse
+from typing import Dict, Optional
+
+from src.config import LOGGING_LEVEL, DB_DIR, COLLECTION_NAME, CHROMA_MODE, INDEXES_DIR, INDEX_MANIFEST_FILE
+from src.rag_app.chroma_client import open_collection
+from src.rag_app.index_manifest import read_manifest, write_manifest
+from src.chunkstore.chunkstore import DATA_SUFFIX, INDEX_SUFFIX, META_SUFFIX, list_chunk_stores
+
+# --- Main Logic ---
+def setup_logging():
+	"""Sets up basic logging for the script."""
+	logging.basicConfig(level=LOGGING_LEVEL,
+						format='%(asctime)s - %(levelname)s - %(message)s')
+
+def copy_chunk_stores(source_dir: str, target_dir: str) -> None:
+	"""Copies the chunk stores of a directory, and nothing else, to target_dir."""
+	os.makedirs(target_dir)
+	for name in list_chunk_stores(source_dir):
+		for suffix in (DATA_SUFFIX, INDEX_SUFFIX, META_SUFFIX):
+			shutil.copy2(os.path.join(source_dir, name + suffix), os.path.join(target_dir, name + suffix))
+
+def publish_index(
+	version: str,
+	collection: str,
+	mode: str,
+	db_dir: Optional[str] = None,
+	indexes_dir: str = str(INDEXES_DIR),
+	manifest_path: str = str(INDEX_MANIFEST_FILE),
+	**extra
+) -> Dict:
+	"""
+	Publishes a built collection as a new index version. In 'embedded' mode the
+	Chroma directory is copied to '<indexes_dir>/<version>/chroma_db', so the
+	running app never opens a directory that is still being written. In 'http'
+	mode the collection already lives on the Chroma server and only its name is
+	published. Chunk stores and an answer snapshot are copied to 'chunk_stores'
+	and 'answer_snapshot.json' of the version directory in both modes, as the
+	next ingest rewrites them in place. The manifest is written last, once the
+	copies are complete and the collection is known to be non-empty.
+
+	ARGS:
+		version: str, a unique name for this index build.
+		collection: str, the collection to serve.
+		mode: str, 'embedded' or 'http', as CHROMA_MODE.
+		db_dir: str, the built Chroma directory to copy ('embedded' only).
+		indexes_dir: str, where index versions are kept.
+		manifest_path: str, the manifest the app watches.
+		extra: optional 'chunk_store_dir' or 'answer_snapshot' paths to copy into this version.
+	RETURNS:
+		manifest: dict, what was published.
+	"""
+	current = read_manifest(manifest_path)
+	if current and current["version"] == version:
+		raise ValueError(f"Index version '{version}' is already being served.")
+
+	version_dir = os.path.join(indexes_dir, version)
+	if os.path.exists(version_dir):
+		raise ValueError(f"Index version '{version}' already exists at {version_dir}.")
+
+	published_dir = None
+	if mode == "embedded":
+		published_dir = os.path.join(version_dir, "chroma_db")
+		logging.info(f"Copying {db_dir} to {published_dir}")
+		shutil.copytree(db_dir, published_dir)
+	if extra.get("chunk_store_dir"):
+		chunk_store_dir = os.path.join(version_dir, "chunk_stores")
+		logging.info(f"Copying the chunk stores in {extra['chunk_store_dir']} to {chunk_store_dir}")
+		copy_chunk_stores(extra["chunk_store_dir"], chunk_store_dir)
+		extra["chunk_store_dir"] = chunk_store_dir
+	if extra.get("answer_snapshot"):
+		answer_snapshot = os.path.join(version_dir, "answer_snapshot.json")
+		logging.info(f"Copying {extra['answer_snapshot']} to {answer_snapshot}")
+		os.makedirs(version_dir, exist_ok=True)
+		shutil.copy2(extra["answer_snapshot"], answer_snapshot)
+		extra["answer_snapshot"] = answer_snapshot
+
+	client, published = open_collection(collection, mode, db_dir=published_dir)
+	count = published.count()
+	close = getattr(client, "close", None)
+	if close is not None:
+		close()
+	if count == 0:
+		raise ValueError(f"Collection '{collection}' is empty; refusing to publish it.")
+	logging.info(f"Collection '{collection}' of index version '{version}' has {count} chunks")
+	return write_manifest(manifest_path, version, collection, published_dir, count=count, **extra)
+
+def parse_args() -> argparse.Namespace:
+	"""Parses the command line options of the publish command."""
+	arg_parser = argparse.ArgumentParser(description="Publish a built collection as the index version the Q&A bot serves.")
+	arg_parser.add_argument("version", help="A unique name for this index build, e.g. a date or a git sha.")
+	arg_parser.add_argument("--collection", default=COLLECTION_NAME)
+	arg_parser.add_argument("--mode", default=CHROMA_MODE, choices=["embedded", "http"])
+	arg_parser.add_argument("--db-dir", default=str(DB_DIR), help="The built Chroma directory ('embedded' only).")
+	arg_parser.add_argument("--indexes-dir", default=str(INDEXES_DIR))
+	arg_parser.add_argument("--manifest", default=str(INDEX_MANIFEST_FILE))
+	arg_parser.add_argument("--chunk-store-dir", default=None, help="Chunk stores built with this collection.")
+	arg_parser.add_argument("--answer-snapshot", default=None, help="Answer snapshot precomputed for this collection.")
+	return arg_parser.parse_args()
+
+
+if __name__ == "__main__":
+	args = parse_args()
+	setup_logging()
+	extra = {key: value for key, value in (("chunk_store_dir", args.chunk_store_dir), ("answer_snapshot", args.answer_snapshot)) if value}
+	manifest = publish_index(args.version, args.collection, args.mode, args.db_dir, args.indexes_dir, args.manifest, **extra)
+	logging.info(f"Published index version '{manifest['version']}' in {args.manifest}")
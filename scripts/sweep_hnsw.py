@@ -0,0 +1,198 @@
+import os
+import json
+import time
+import shutil
+import logging
+import argparse
+import itertools
+import tempfile
+from typing import Dict, List, Optional
+import numpy as np
+import chromadb
+
+from src.config import (
+	LOGGING_LEVEL, DB_DIR, COLLECTION_NAME, EMBEDDING_MODEL_NAME, REPORTS_DIR, VECTORIZE_BATCH_SIZE,
+	HNSW_SPACE, HNSW_M, HNSW_CONSTRUCTION_EF, HNSW_SEARCH_EF, HNSW_NUM_THREADS
+)
+from src.loadtest.load_generator import percentile
+from src.vectorizer.vectorizer import hnsw_metadata, iter_batches
+
+# --- Helper Functions ---
+def setup_logging():
+	"""Sets up basic logging for the script."""
+	logging.basicConfig(level=LOGGING_LEVEL,
+						format='%(asctime)s - %(levelname)s - %(message)s')
+
+def parse_grid(values: str, cast=int) -> List:
+	return [cast(value) for value in values.split(",")]
+
+def load_collection_embeddings(db_dir: str, collection_name: str, limit: Optional[int] = None) -> np.ndarray:
+	"""
+	Reads the stored embeddings of the serving collection, page by page.
+	"""
+	collection = chromadb.PersistentClient(path=db_dir).get_collection(collection_name)
+	total = collection.count() if limit is None else min(limit, collection.count())
+	pages = []
+	for offset in range(0, total, VECTORIZE_BATCH_SIZE):
+		page = collection.get(include=["embeddings"], limit=min(VECTORIZE_BATCH_SIZE, total - offset), offset=offset)
+		pages.append(np.asarray(page["embeddings"], dtype=np.float32))
+	return np.concatenate(pages) if pages else np.zeros((0, 0), dtype=np.float32)
+
+def exact_neighbors(vectors: np.ndarray, queries: np.ndarray, k: int, space: str) -> np.ndarray:
+	"""
+	Brute-force top-k neighbor indices under Chroma's distance for the space.
+	"""
+	if space == "cosine":
+		vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+		queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+	neighbors = []
+	# bounded blocks keep the distance matrix small
+	for start in range(0, len(queries), 256):
+		block = queries[start:start + 256]
+		if space == "l2":
+			distances = (block ** 2).sum(axis=1)[:, None] - 2 * block @ vectors.T + (vectors ** 2).sum(axis=1)[None, :]
+		else:
+			distances = -(block @ vectors.T)
+		top = np.argpartition(distances, k - 1, axis=1)[:, :k]
+		order = np.take_along_axis(distances, top, axis=1).argsort(axis=1)
+		neighbors.append(np.take_along_axis(top, order, axis=1))
+	return np.concatenate(neighbors)
+
+def directory_size_mb(path: str) -> float:
+	total = 0
+	for root, _, files in os.walk(path):
+		total += sum(os.path.getsize(os.path.join(root, f)) for f in files)
+	return round(total / 1e6, 2)
+
+# --- Main Logic ---
+def sweep_index(
+	vectors: np.ndarray,
+	queries: np.ndarray,
+	truth: np.ndarray,
+	k: int,
+	space: str,
+	m: int,
+	construction_ef: int,
+	search_efs: List[int],
+	num_threads: int
+) -> List[Dict]:
+	"""
+	Builds one HNSW index and measures it at every search_ef.
+
+	ARGS:
+		vectors: np.ndarray, the corpus embeddings to index.
+		queries: np.ndarray, the query embeddings.
+		truth: np.ndarray, exact top-k neighbor indices per query.
+		k: int, results per query.
+		space, m, construction_ef, num_threads: the build parameters.
+		search_efs: list[int], query-time candidate list sizes to measure.
+	RETURNS:
+		results: list[dict], build time, index size, recall@k and latency per search_ef.
+	"""
+	build_dir = tempfile.mkdtemp(prefix="hnsw_sweep_")
+	try:
+		client = chromadb.PersistentClient(path=build_dir)
+		collection = client.create_collection(
+			name="hnsw_sweep",
+			metadata=hnsw_metadata(space, m, construction_ef, search_efs[0], num_threads)
+		)
+		ids = [str(i) for i in range(len(vectors))]
+		start = time.perf_counter()
+		for batch in iter_batches(range(len(vectors)), VECTORIZE_BATCH_SIZE):
+			collection.add(ids=[ids[i] for i in batch], embeddings=vectors[batch[0]:batch[-1] + 1].tolist())
+		build_seconds = time.perf_counter() - start
+		index_mb = directory_size_mb(build_dir)
+
+		results = []
+		for search_ef in search_efs:
+			collection.modify(configuration={"hnsw": {"ef_search": search_ef}})
+			# a loaded index keeps its search_ef until the client reopens it
+			client.clear_system_cache()
+			client = chromadb.PersistentClient(path=build_dir)
+			collection = client.get_collection("hnsw_sweep")
+			latencies = []
+			hits = 0
+			for query, expected in zip(queries, truth):
+				start = time.perf_counter()
+				found = collection.query(query_embeddings=[query.tolist()], n_results=k, include=[])["ids"][0]
+				latencies.append((time.perf_counter() - start) * 1000)
+				hits += len(set(int(i) for i in found) & set(expected.tolist()))
+			latencies.sort()
+			result = {
+				"space": space,
+				"M": m,
+				"construction_ef": construction_ef,
+				"search_ef": search_ef,
+				"num_threads": num_threads,
+				"build_s": round(build_seconds, 2),
+				"index_mb": index_mb,
+				f"recall@{k}": round(hits / (k * len(queries)), 4),
+				"p50_ms": round(percentile(latencies, 50), 3),
+				"p99_ms": round(percentile(latencies, 99), 3),
+			}
+			logging.info(f"HNSW sweep: {result}")
+			results.append(result)
+		client.clear_system_cache()
+		return results
+	finally:
+		shutil.rmtree(build_dir, ignore_errors=True)
+
+def format_table(results: List[Dict], k: int) -> str:
+	"""Renders the sweep results as a markdown table."""
+	columns = ["space", "M", "construction_ef", "search_ef", "num_threads", "build_s", "index_mb", f"recall@{k}", "p50_ms", "p99_ms"]
+	lines = ["| " + " | ".join(columns) + " |", "|" + "---|" * len(columns)]
+	lines.extend("| " + " | ".join(str(r[c]) for c in columns) + " |" for r in results)
+	return "\n".join(lines)
+
+def parse_args() -> argparse.Namespace:
+	arg_parser = argparse.ArgumentParser(description="Sweep HNSW parameters for build time, index size, recall and query latency.")
+	arg_parser.add_argument("--db-dir", default=str(DB_DIR), help="Vector database holding the corpus embeddings.")
+	arg_parser.add_argument("--collection", default=COLLECTION_NAME)
+	arg_parser.add_argument("--max-vectors", type=int, default=None, help="Only index the first N stored embeddings.")
+	arg_parser.add_argument("--questions", default=None, help="Embed these questions (one per line) as queries instead of held-out chunks.")
+	arg_parser.add_argument("--num-queries", type=int, default=500, help="Held-out corpus vectors used as queries.")
+	arg_parser.add_argument("--k", type=int, default=5)
+	arg_parser.add_argument("--space", default=HNSW_SPACE, help="Comma-separated list, e.g. 'l2,cosine'.")
+	arg_parser.add_argument("--m", default=f"8,{HNSW_M},32")
+	arg_parser.add_argument("--construction-ef", default=f"{HNSW_CONSTRUCTION_EF},200")
+	arg_parser.add_argument("--search-ef", default=f"10,50,{HNSW_SEARCH_EF},200")
+	arg_parser.add_argument("--num-threads", default=str(HNSW_NUM_THREADS))
+	arg_parser.add_argument("--seed", type=int, default=1)
+	arg_parser.add_argument("--output", default=str(REPORTS_DIR / "hnsw_sweep.json"))
+	return arg_parser.parse_args()
+
+
+if __name__ == "__main__":
+	args = parse_args()
+	setup_logging()
+	corpus = load_collection_embeddings(args.db_dir, args.collection, args.max_vectors)
+	rng = np.random.default_rng(args.seed)
+	if args.questions:
+		from sentence_transformers import SentenceTransformer
+		with open(args.questions, 'r') as f:
+			questions = [line.strip() for line in f if line.strip()]
+		query_vectors = SentenceTransformer(EMBEDDING_MODEL_NAME).encode(questions).astype(np.float32)
+		index_vectors = corpus
+	else:
+		# held-out chunks: a query never finds itself, which would inflate recall
+		held_out = rng.permutation(len(corpus))
+		query_vectors = corpus[held_out[:args.num_queries]]
+		index_vectors = corpus[np.sort(held_out[args.num_queries:])]
+	logging.info(f"Sweeping HNSW parameters over {len(index_vectors)} vectors with {len(query_vectors)} queries")
+
+	sweep_results = []
+	for space in args.space.split(","):
+		ground_truth = exact_neighbors(index_vectors, query_vectors, args.k, space)
+		for m, construction_ef, num_threads in itertools.product(
+			parse_grid(args.m), parse_grid(args.construction_ef), parse_grid(args.num_threads)
+		):
+			sweep_results.extend(sweep_index(
+				index_vectors, query_vectors, ground_truth, args.k,
+				space, m, construction_ef, parse_grid(args.search_ef), num_threads
+			))
+
+	os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+	with open(args.output, 'w') as f:
+		json.dump(sweep_results, f, indent=2)
+	print(format_table(sweep_results, args.k))
+	logging.info(f"HNSW sweep results written to {args.output}")
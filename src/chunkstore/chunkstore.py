@@ -0,0 +1,209 @@
+import os
+import json
+import mmap
+import struct
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# On-disk layout of a chunk store named '<prefix>':
+#   <prefix>.chunks     UTF-8 chunk texts, concatenated without separators
+#   <prefix>.idx        16-byte header, then one fixed-width record per chunk:
+#                       offset (u64), length (u32), metadata id (u32), little-endian
+#   <prefix>.meta.json  list of distinct metadata dicts referenced by the index
+DATA_SUFFIX = ".chunks"
+INDEX_SUFFIX = ".idx"
+META_SUFFIX = ".meta.json"
+INDEX_MAGIC = b"CHUNKIDX"
+INDEX_VERSION = 1
+HEADER = struct.Struct("<8sII")   # magic, version, reserved
+RECORD = struct.Struct("<QII")    # offset, length, metadata id
+
+# --- Helper Functions ---
+def is_chunk_store(path_prefix: str) -> bool:
+	"""
+	Checks whether a complete chunk store exists at the given prefix.
+	"""
+	return all(os.path.isfile(path_prefix + suffix) for suffix in (DATA_SUFFIX, INDEX_SUFFIX, META_SUFFIX))
+
+def list_chunk_stores(directory: str) -> List[str]:
+	"""
+	Lists the names (prefixes without directory) of the chunk stores in a directory.
+	"""
+	names = [filename[:-len(INDEX_SUFFIX)] for filename in os.listdir(directory) if filename.endswith(INDEX_SUFFIX)]
+	return sorted(name for name in names if is_chunk_store(os.path.join(directory, name)))
+
+def remove_chunk_store(path_prefix: str) -> None:
+	for suffix in (DATA_SUFFIX, INDEX_SUFFIX, META_SUFFIX):
+		if os.path.exists(path_prefix + suffix):
+			os.remove(path_prefix + suffix)
+
+def _map_file(filepath: str) -> Optional[mmap.mmap]:
+	# empty files cannot be memory-mapped
+	if os.path.getsize(filepath) == 0:
+		return None
+	with open(filepath, 'rb') as f:
+		return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+# --- Main Logic ---
+class ChunkStoreWriter:
+	"""
+	Appends chunks to a new chunk store. Files are written under temporary
+	names and renamed into place on close(), so readers never see a partial store.
+	"""
+
+	def __init__(self, path_prefix: str):
+		self.path_prefix = path_prefix
+		self._data = open(path_prefix + DATA_SUFFIX + ".tmp", 'wb')
+		self._index = open(path_prefix + INDEX_SUFFIX + ".tmp", 'wb')
+		self._index.write(HEADER.pack(INDEX_MAGIC, INDEX_VERSION, 0))
+		self._metadata: List[Dict] = []
+		self._metadata_ids: Dict[str, int] = {}
+		self._offset = 0
+		self.count = 0
+
+	def add(self, text: str, metadata: Optional[Dict] = None) -> int:
+		"""
+		Appends one chunk and returns its position in the store.
+		"""
+		encoded = text.encode('utf-8')
+		# identical metadata (e.g. all chunks of one page) is stored once
+		key = json.dumps(metadata or {}, sort_keys=True)
+		if key not in self._metadata_ids:
+			self._metadata_ids[key] = len(self._metadata)
+			self._metadata.append(metadata or {})
+		self._data.write(encoded)
+		self._index.write(RECORD.pack(self._offset, len(encoded), self._metadata_ids[key]))
+		self._offset += len(encoded)
+		self.count += 1
+		return self.count - 1
+
+	def close(self) -> None:
+		self._data.close()
+		self._index.close()
+		with open(self.path_prefix + META_SUFFIX + ".tmp", 'w') as f:
+			json.dump(self._metadata, f)
+		for suffix in (DATA_SUFFIX, INDEX_SUFFIX, META_SUFFIX):
+			os.replace(self.path_prefix + suffix + ".tmp", self.path_prefix + suffix)
+
+	def abort(self) -> None:
+		"""
+		Discards everything written so far.
+		"""
+		self._data.close()
+		self._index.close()
+		for suffix in (DATA_SUFFIX, INDEX_SUFFIX, META_SUFFIX):
+			if os.path.exists(self.path_prefix + suffix + ".tmp"):
+				os.remove(self.path_prefix + suffix + ".tmp")
+
+	def __enter__(self) -> "ChunkStoreWriter":
+		return self
+
+	def __exit__(self, exc_type, exc, tb) -> None:
+		if exc_type is None:
+			self.close()
+		else:
+			self.abort()
+
+class ChunkStore:
+	"""
+	Read-only, memory-mapped view of a chunk store. Looking up a chunk reads
+	one index record and slices the data file; nothing else is loaded.
+	"""
+
+	def __init__(self, path_prefix: str):
+		self.path_prefix = path_prefix
+		self.name = os.path.basename(path_prefix)
+		self._data = _map_file(path_prefix + DATA_SUFFIX)
+		self._index = _map_file(path_prefix + INDEX_SUFFIX)
+		if self._index is None or len(self._index) < HEADER.size:
+			raise ValueError(f"Chunk store index {path_prefix + INDEX_SUFFIX} is truncated.")
+		magic, version, _ = HEADER.unpack_from(self._index, 0)
+		if magic != INDEX_MAGIC or version != INDEX_VERSION:
+			raise ValueError(f"{path_prefix + INDEX_SUFFIX} is not a version {INDEX_VERSION} chunk store index.")
+		with open(path_prefix + META_SUFFIX, 'r') as f:
+			self._metadata: List[Dict] = json.load(f)
+		self._count = (len(self._index) - HEADER.size) // RECORD.size
+
+	def __len__(self) -> int:
+		return self._count
+
+	def _record(self, position: int) -> Tuple[int, int, int]:
+		if not 0 <= position < self._count:
+			raise IndexError(f"Chunk {position} is out of range for store '{self.name}' ({self._count} chunks).")
+		return RECORD.unpack_from(self._index, HEADER.size + position * RECORD.size)
+
+	def get_bytes(self, position: int) -> memoryview:
+		"""
+		Returns the UTF-8 bytes of a chunk as a zero-copy view into the mapped file.
+		"""
+		offset, length, _ = self._record(position)
+		if length == 0:
+			return memoryview(b"")
+		return memoryview(self._data)[offset:offset + length]
+
+	def get(self, position: int) -> str:
+		offset, length, _ = self._record(position)
+		if length == 0:
+			return ""
+		return self._data[offset:offset + length].decode('utf-8')
+
+	def metadata(self, position: int) -> Dict:
+		return dict(self._metadata[self._record(position)[2]])
+
+	def __iter__(self) -> Iterator[Tuple[str, Dict]]:
+		for position in range(self._count):
+			yield self.get(position), self.metadata(position)
+
+	def close(self) -> None:
+		for mapped in (self._data, self._index):
+			if mapped is not None:
+				mapped.close()
+
+	def __enter__(self) -> "ChunkStore":
+		return self
+
+	def __exit__(self, exc_type, exc, tb) -> None:
+		self.close()
+
+class ChunkStoreCatalog:
+	"""
+	Resolves chunk ids of the form '<store name>-<position>' (the ids the
+	vectorizer gives Chroma) against the chunk stores in a directory. Stores
+	are opened lazily and stay mapped for the lifetime of the catalog.
+	"""
+
+	def __init__(self, directory: str):
+		self.directory = directory
+		self._stores: Dict[str, ChunkStore] = {}
+		self._lock = threading.Lock()
+
+	def _store(self, name: str) -> ChunkStore:
+		with self._lock:
+			if name not in self._stores:
+				path_prefix = os.path.join(self.directory, name)
+				if os.path.basename(path_prefix) != name or not is_chunk_store(path_prefix):
+					raise KeyError(name)
+				self._stores[name] = ChunkStore(path_prefix)
+			return self._stores[name]
+
+	def lookup(self, chunk_id: str) -> Tuple[ChunkStore, int]:
+		"""
+		Returns the store and position of a chunk id. Raises KeyError if unknown.
+		"""
+		name, _, position = chunk_id.rpartition('-')
+		if not name or not position.isdigit():
+			raise KeyError(chunk_id)
+		store = self._store(name)
+		if int(position) >= len(store):
+			raise KeyError(chunk_id)
+		return store, int(position)
+
+	def get(self, chunk_id: str) -> str:
+		store, position = self.lookup(chunk_id)
+		return store.get(position)
+
+	def close(self) -> None:
+		with self._lock:
+			for store in self._stores.values():
+				store.close()
+			self._stores.clear()
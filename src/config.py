@@ -12,11 +12,87 @@ PROCESSED_DATA_DIR = DATA_DIR / "processed_data"
 DB_DIR = DATA_DIR / "chroma_db"
 URLS_FILE = DATA_DIR / "urls_to_scrape.txt"
 CLONED_REPOS_DIR = DATA_DIR / "cloned_repos"
+REPORTS_DIR = DATA_DIR / "reports"
 
 LOGGING_LEVEL = os.getenv("LOGGING_LEVEL", "INFO").upper()
 
 CHUNK_SIZE = 1024
 CHUNK_OVERLAP = 128
+# 'characters' splits by CHUNK_SIZE/CHUNK_OVERLAP; 'tokens' sizes chunks to the embedding
+# model's max_seq_length, with this fraction of a chunk overlapping the next
+CHUNKING_MODE = os.getenv("CHUNKING_MODE", "characters").lower()
+CHUNK_TOKEN_OVERLAP_RATIO = float(os.getenv("CHUNK_TOKEN_OVERLAP_RATIO", "0.125"))
+
+# near-duplicate chunk elimination between the parser and the vectorizer
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "true").lower() == "true"
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.85"))
+DEDUP_NUM_PERM = int(os.getenv("DEDUP_NUM_PERM", "128"))
+DEDUP_SHINGLE_SIZE = int(os.getenv("DEDUP_SHINGLE_SIZE", "5"))
+
+# chunks embedded and added to ChromaDB per batch
+VECTORIZE_BATCH_SIZE = int(os.getenv("VECTORIZE_BATCH_SIZE", "4000"))
 
 EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL_NAME", "all-MiniLM-L6-v2")
-COLLECTION_NAME = os.getenv("COLLECTION_NAME", "mlops_docs")
\ No newline at end of file
+COLLECTION_NAME = os.getenv("COLLECTION_NAME", "mlops_docs")
+# set to false to keep chunk text only in the chunk stores under PROCESSED_DATA_DIR
+CHROMA_STORE_DOCUMENTS = os.getenv("CHROMA_STORE_DOCUMENTS", "true").lower() == "true"
+CHUNK_STORE_DIR = Path(os.getenv("CHUNK_STORE_DIR", str(PROCESSED_DATA_DIR)))
+
+# HNSW index of the collection; defaults match Chroma's. space, M and construction_ef
+# are fixed when the collection is created, so changing them requires a fresh collection;
+# search_ef and num_threads are applied to an existing collection on every vectorizer run.
+HNSW_SPACE = os.getenv("HNSW_SPACE", "l2")
+HNSW_M = int(os.getenv("HNSW_M", "16"))
+HNSW_CONSTRUCTION_EF = int(os.getenv("HNSW_CONSTRUCTION_EF", "100"))
+HNSW_SEARCH_EF = int(os.getenv("HNSW_SEARCH_EF", "100"))
+HNSW_NUM_THREADS = int(os.getenv("HNSW_NUM_THREADS", str(os.cpu_count() or 1)))
+
+# 'embedded' opens DB_DIR in-process; 'http' talks to a standalone Chroma server (chroma run)
+CHROMA_MODE = os.getenv("CHROMA_MODE", "embedded").lower()
+CHROMA_HOST = os.getenv("CHROMA_HOST", "localhost")
+CHROMA_PORT = int(os.getenv("CHROMA_PORT", "8000"))
+CHROMA_SSL = os.getenv("CHROMA_SSL", "false").lower() == "true"
+# per-request timeout and retries of transient failures (connection errors, timeouts, 429/502/503/504)
+CHROMA_TIMEOUT_SECONDS = float(os.getenv("CHROMA_TIMEOUT_SECONDS", "10"))
+CHROMA_RETRIES = int(os.getenv("CHROMA_RETRIES", "3"))
+CHROMA_RETRY_BACKOFF_SECONDS = float(os.getenv("CHROMA_RETRY_BACKOFF_SECONDS", "0.2"))
+# connections kept open to the server, per worker process
+CHROMA_POOL_SIZE = int(os.getenv("CHROMA_POOL_SIZE", "32"))
+
+RETRIEVER_K = int(os.getenv("RETRIEVER_K", "5"))
+BATCH_QUERY_PARALLELISM = int(os.getenv("BATCH_QUERY_PARALLELISM", "4"))
+BATCH_QUERY_MAX_QUESTIONS = int(os.getenv("BATCH_QUERY_MAX_QUESTIONS", "1000"))
+# retrieval-only /retrieve endpoint and its in-process result cache
+RETRIEVE_MAX_K = int(os.getenv("RETRIEVE_MAX_K", "50"))
+RETRIEVE_CACHE_SIZE = int(os.getenv("RETRIEVE_CACHE_SIZE", "2048"))
+RETRIEVE_CACHE_TTL_SECONDS = float(os.getenv("RETRIEVE_CACHE_TTL_SECONDS", "600"))
+# per-request deadline of /query (retrieval and generation), overridable per request up to the maximum
+QUERY_TIMEOUT_SECONDS = float(os.getenv("QUERY_TIMEOUT_SECONDS", "120"))
+QUERY_MAX_TIMEOUT_SECONDS = float(os.getenv("QUERY_MAX_TIMEOUT_SECONDS", "600"))
+# opt-in stack sampling of the serving app: per request via PROFILE_HEADER or a sampled
+# fraction of requests, and process-wide via POST /admin/profile
+PROFILE_ENABLED = os.getenv("PROFILE_ENABLED", "false").lower() == "true"
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", str(REPORTS_DIR / "profiles")))
+# lets clients that are not on this machine profile, with the X-Profile-Token header
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")
+# versioned indexes published by scripts/publish_index.py; the app watches the manifest
+# and swaps to a new version without a restart (0 disables watching)
+INDEXES_DIR = Path(os.getenv("INDEXES_DIR", str(DATA_DIR / "indexes")))
+INDEX_MANIFEST_FILE = Path(os.getenv("INDEX_MANIFEST_FILE", str(INDEXES_DIR / "manifest.json")))
+INDEX_WATCH_INTERVAL_SECONDS = float(os.getenv("INDEX_WATCH_INTERVAL_SECONDS", "30"))
+# precomputed answers written by scripts/precompute_answers.py
+ANSWER_SNAPSHOT_FILE = Path(os.getenv("ANSWER_SNAPSHOT_FILE", str(DATA_DIR / "answer_snapshot.json")))
+
+# pre-fork server (src/rag_app/server.py)
+WEB_HOST = os.getenv("WEB_HOST", "0.0.0.0")
+WEB_PORT = int(os.getenv("WEB_PORT", "8000"))
+WEB_WORKERS = int(os.getenv("WEB_WORKERS", "1"))
+# set by the pre-fork server so importing the app loads only the shared embedding model
+PREFORK_ENV = "RAG_APP_PREFORK"
+# extracted page text by git blob SHA, reused across ingestion runs
+EXTRACTION_CACHE_ENABLED = os.getenv("EXTRACTION_CACHE_ENABLED", "true").lower() == "true"
+EXTRACTION_CACHE_FILE = Path(os.getenv("EXTRACTION_CACHE_FILE", str(DATA_DIR / "extraction_cache.sqlite")))
+# progress of the last vectorization run, used to resume it
+VECTORIZE_JOURNAL_FILE = Path(os.getenv("VECTORIZE_JOURNAL_FILE", str(DATA_DIR / "vectorize_journal.jsonl")))
\ No newline at end of file
@@ -0,0 +1,194 @@
+import os
+import re
+import zlib
+import hashlib
+import logging
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+from src.config import DEDUP_THRESHOLD, DEDUP_NUM_PERM, DEDUP_SHINGLE_SIZE
+from src.profiling import profiler
+from src.chunkstore.chunkstore import ChunkStore, ChunkStoreWriter, list_chunk_stores
+
+# a chunk is addressed by (store index, position in store)
+ChunkKey = Tuple[int, int]
+
+# --- Helper Functions ---
+def normalize_text(text: str) -> str:
+	"""
+	Lowercases and collapses whitespace so formatting differences don't hide duplicates.
+	"""
+	return re.sub(r"\s+", " ", text).strip().lower()
+
+def shingle_hashes(text: str, shingle_size: int = DEDUP_SHINGLE_SIZE) -> np.ndarray:
+	"""
+	Hashes the word n-grams of a normalized text to 32-bit integers. Texts
+	shorter than one shingle are hashed as a single shingle.
+	"""
+	words = text.split(" ")
+	size = min(shingle_size, len(words))
+	shingles = {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+	return np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles), dtype=np.uint64, count=len(shingles))
+
+def make_permutations(num_perm: int = DEDUP_NUM_PERM, seed: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+	"""
+	Draws the parameters of num_perm multiply-shift hash functions.
+	"""
+	rng = np.random.default_rng(seed)
+	a = rng.integers(1, 2**63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+	b = rng.integers(0, 2**63, size=num_perm, dtype=np.uint64)
+	return a, b
+
+def minhash_signature(hashes: np.ndarray, permutations: Tuple[np.ndarray, np.ndarray]) -> np.ndarray:
+	"""
+	Computes the MinHash signature of a set of shingle hashes. The fraction of
+	equal positions in two signatures estimates the Jaccard similarity of the sets.
+	"""
+	a, b = permutations
+	# uint64 arithmetic wraps around, which is exactly the multiply-shift scheme
+	with np.errstate(over='ignore'):
+		permuted = (a[:, None] * hashes[None, :] + b[:, None]) >> np.uint64(32)
+	return permuted.min(axis=1).astype(np.uint32)
+
+def lsh_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+	"""
+	Picks the number of LSH bands and rows per band whose S-curve midpoint,
+	(1/bands)^(1/rows), is closest to the similarity threshold.
+	"""
+	best = (1, num_perm)
+	best_error = float("inf")
+	for rows in range(1, num_perm + 1):
+		bands = num_perm // rows
+		error = abs((1 / bands) ** (1 / rows) - threshold)
+		if error < best_error:
+			best, best_error = (bands, rows), error
+	return best
+
+class NearDuplicateIndex:
+	"""
+	MinHash-LSH index that keeps one representative per group of near duplicates.
+	"""
+
+	def __init__(self, threshold: float = DEDUP_THRESHOLD, num_perm: int = DEDUP_NUM_PERM):
+		self.threshold = threshold
+		self.bands, self.rows = lsh_bands(threshold, num_perm)
+		self.buckets: Dict[Tuple[int, bytes], List[ChunkKey]] = {}
+		self.signatures: Dict[ChunkKey, np.ndarray] = {}
+
+	def find_or_add(self, key: ChunkKey, signature: np.ndarray) -> Optional[ChunkKey]:
+		"""
+		Returns the representative this signature duplicates, or registers it
+		as a new representative and returns None.
+		"""
+		band_keys = [
+			(band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+			for band in range(self.bands)
+		]
+		checked = set()
+		for band_key in band_keys:
+			for candidate in self.buckets.get(band_key, ()):
+				if candidate in checked:
+					continue
+				checked.add(candidate)
+				if np.mean(self.signatures[candidate] == signature) >= self.threshold:
+					return candidate
+		self.signatures[key] = signature
+		for band_key in band_keys:
+			self.buckets.setdefault(band_key, []).append(key)
+		return None
+
+# --- Main Logic ---
+def deduplicate_chunk_stores(
+	processed_data_dir: str,
+	threshold: float = DEDUP_THRESHOLD,
+	num_perm: int = DEDUP_NUM_PERM,
+	shingle_size: int = DEDUP_SHINGLE_SIZE
+) -> Dict:
+	"""
+	Removes exact and near-duplicate chunks across all chunk stores in a
+	directory, keeping the first occurrence. A surviving chunk lists the page
+	URLs of every chunk it absorbed under 'duplicate_sources'. Stores are
+	rewritten in place.
+
+	ARGS:
+		processed_data_dir: str, the directory containing the parser's chunk stores.
+		threshold: float, estimated Jaccard similarity above which chunks are duplicates.
+		num_perm: int, the MinHash signature length.
+		shingle_size: int, words per shingle.
+	RETURNS:
+		report: dict, chunk and byte counts before and after deduplication.
+	"""
+	logging.info(f"Deduplicating chunks in {processed_data_dir} (threshold={threshold}, num_perm={num_perm})")
+	store_names = list_chunk_stores(processed_data_dir)
+	permutations = make_permutations(num_perm)
+	index = NearDuplicateIndex(threshold, num_perm)
+	exact: Dict[bytes, ChunkKey] = {}
+	duplicate_of: Dict[ChunkKey, ChunkKey] = {}
+	absorbed_sources: Dict[ChunkKey, List[str]] = {}
+	report = {"chunks_in": 0, "bytes_in": 0, "exact_duplicates": 0, "near_duplicates": 0, "bytes_removed": 0}
+
+	#1. find a representative for every duplicate
+	with profiler.stage("deduplicator:scan"):
+		for store_index, name in enumerate(store_names):
+			with ChunkStore(os.path.join(processed_data_dir, name)) as store:
+				for position in range(len(store)):
+					key = (store_index, position)
+					text = normalize_text(store.get(position))
+					size = len(store.get_bytes(position))
+					report["chunks_in"] += 1
+					report["bytes_in"] += size
+
+					digest = hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+					representative = exact.get(digest)
+					if representative is not None:
+						report["exact_duplicates"] += 1
+					else:
+						signature = minhash_signature(shingle_hashes(text, shingle_size), permutations)
+						representative = index.find_or_add(key, signature)
+						if representative is not None:
+							report["near_duplicates"] += 1
+						# later exact copies go straight to the chunk that is kept
+						exact[digest] = representative or key
+					if representative is not None:
+						duplicate_of[key] = representative
+						report["bytes_removed"] += size
+						source = store.metadata(position).get("source")
+						if source:
+							absorbed_sources.setdefault(representative, []).append(source)
+
+	#2. rewrite each store with the survivors
+	with profiler.stage("deduplicator:write"):
+		for store_index, name in enumerate(store_names):
+			path_prefix = os.path.join(processed_data_dir, name)
+			store = ChunkStore(path_prefix)
+			try:
+				with ChunkStoreWriter(path_prefix) as writer:
+					for position in range(len(store)):
+						key = (store_index, position)
+						if key in duplicate_of:
+							continue
+						metadata = store.metadata(position)
+						extra_sources = [s for s in dict.fromkeys(absorbed_sources.get(key, [])) if s != metadata.get("source")]
+						if extra_sources:
+							metadata["duplicate_sources"] = extra_sources
+						writer.add(store.get(position), metadata)
+			finally:
+				store.close()
+
+	removed = report["exact_duplicates"] + report["near_duplicates"]
+	report["chunks_out"] = report["chunks_in"] - removed
+	report["removed_pct"] = round(100 * removed / report["chunks_in"], 2) if report["chunks_in"] else 0.0
+	profiler.count(
+		chunks_in=report["chunks_in"],
+		chunks_out=report["chunks_out"],
+		bytes_in=report["bytes_in"],
+		bytes_out=report["bytes_in"] - report["bytes_removed"],
+		exact_duplicates=report["exact_duplicates"],
+		near_duplicates=report["near_duplicates"]
+	)
+	logging.info(
+		f"Removed {removed} of {report['chunks_in']} chunks ({report['removed_pct']}%): "
+		f"{report['exact_duplicates']} exact and {report['near_duplicates']} near duplicates, "
+		f"{report['bytes_removed']} bytes."
+	)
+	return report
@@ -0,0 +1,202 @@
+import os
+import json
+import time
+import random
+import asyncio
+import logging
+import argparse
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+
+# --- Configuration ---
+@dataclass
+class FakeOllamaSettings:
+	"""
+	Knobs that shape the simulated model. Defaults come from environment
+	variables so the server can be configured inside a container.
+	"""
+	ttft_ms: float = float(os.getenv("FAKE_OLLAMA_TTFT_MS", "300"))
+	ttft_jitter_ms: float = float(os.getenv("FAKE_OLLAMA_TTFT_JITTER_MS", "50"))
+	tokens_per_sec: float = float(os.getenv("FAKE_OLLAMA_TOKENS_PER_SEC", "30"))
+	response_tokens: int = int(os.getenv("FAKE_OLLAMA_RESPONSE_TOKENS", "120"))
+	error_rate: float = float(os.getenv("FAKE_OLLAMA_ERROR_RATE", "0.0"))
+	midstream_error_rate: float = float(os.getenv("FAKE_OLLAMA_MIDSTREAM_ERROR_RATE", "0.0"))
+	max_concurrency: int = int(os.getenv("FAKE_OLLAMA_MAX_CONCURRENCY", "1"))
+	seed: Optional[int] = None
+	models: List[str] = field(default_factory=lambda: ["llama3"])
+
+# --- Helper Functions ---
+def _now() -> str:
+	return datetime.now(timezone.utc).isoformat()
+
+def _fake_tokens(prompt: str, count: int) -> List[str]:
+	"""
+	Builds a deterministic-looking answer by recycling words from the prompt.
+	"""
+	words = prompt.split() or ["lorem", "ipsum"]
+	return [f"{words[i % len(words)]} " for i in range(count)]
+
+def _final_message(model: str, prompt: str, tokens: List[str], started: float, first_token: float) -> Dict:
+	"""
+	Builds the closing 'done' record with the timing fields Ollama reports (in ns).
+	"""
+	finished = time.perf_counter()
+	return {
+		"model": model,
+		"created_at": _now(),
+		"response": "",
+		"done": True,
+		"done_reason": "stop",
+		"context": [],
+		"total_duration": int((finished - started) * 1e9),
+		"load_duration": 0,
+		"prompt_eval_count": len(prompt.split()),
+		"prompt_eval_duration": int((first_token - started) * 1e9),
+		"eval_count": len(tokens),
+		"eval_duration": int((finished - first_token) * 1e9),
+	}
+
+# --- Main Logic ---
+def create_app(settings: Optional[FakeOllamaSettings] = None) -> FastAPI:
+	"""
+	Creates a FastAPI app that mimics the parts of the Ollama HTTP API used by
+	langchain_ollama: '/', '/api/tags', '/api/generate' and '/api/chat'.
+
+	ARGS:
+		settings: FakeOllamaSettings, latency, throughput and error injection knobs.
+	RETURNS:
+		app: FastAPI, the fake server application.
+	"""
+	settings = settings or FakeOllamaSettings()
+	rng = random.Random(settings.seed)
+	app = FastAPI()
+	app.state.settings = settings
+	app.state.stats = {"requests": 0, "completed": 0, "errors": 0, "cancelled": 0, "in_flight": 0}
+	# models a server with a fixed number of parallel decode slots (OLLAMA_NUM_PARALLEL)
+	slots = asyncio.Semaphore(max(1, settings.max_concurrency))
+	stats = app.state.stats
+
+	async def generate_tokens(model: str, prompt: str, chat: bool):
+		"""
+		Yields NDJSON lines for one generation, holding a decode slot throughout.
+		"""
+		started = time.perf_counter()
+		async with slots:
+			stats["in_flight"] += 1
+			try:
+				ttft = max(0.0, rng.gauss(settings.ttft_ms, settings.ttft_jitter_ms)) / 1000
+				await asyncio.sleep(ttft)
+				first_token = time.perf_counter()
+				tokens = _fake_tokens(prompt, settings.response_tokens)
+				fail_at = rng.randrange(len(tokens)) if tokens and rng.random() < settings.midstream_error_rate else None
+				delay = 1 / settings.tokens_per_sec if settings.tokens_per_sec > 0 else 0
+				for i, token in enumerate(tokens):
+					if i == fail_at:
+						stats["errors"] += 1
+						yield json.dumps({"error": "injected mid-stream failure"}) + "\n"
+						return
+					if delay and i:
+						await asyncio.sleep(delay)
+					if chat:
+						message = {"model": model, "created_at": _now(), "message": {"role": "assistant", "content": token}, "done": False}
+					else:
+						message = {"model": model, "created_at": _now(), "response": token, "done": False}
+					yield json.dumps(message) + "\n"
+				final = _final_message(model, prompt, tokens, started, first_token)
+				if chat:
+					final.pop("response")
+					final["message"] = {"role": "assistant", "content": ""}
+				stats["completed"] += 1
+				yield json.dumps(final) + "\n"
+			except asyncio.CancelledError:
+				# the client hung up; a real Ollama server aborts the generation here
+				stats["cancelled"] += 1
+				raise
+			finally:
+				stats["in_flight"] -= 1
+
+	async def handle(request: Request, chat: bool):
+		body = await request.json()
+		stats["requests"] += 1
+		model = body.get("model", "")
+		if chat:
+			prompt = " ".join(m.get("content", "") for m in body.get("messages", []))
+		else:
+			prompt = body.get("prompt", "")
+
+		if model and model.split(":")[0] not in settings.models:
+			return JSONResponse(status_code=404, content={"error": f"model '{model}' not found"})
+		if rng.random() < settings.error_rate:
+			stats["errors"] += 1
+			return JSONResponse(status_code=500, content={"error": "injected failure"})
+
+		stream = generate_tokens(model, prompt, chat)
+		if body.get("stream", True):
+			return StreamingResponse(stream, media_type="application/x-ndjson")
+
+		# non-streaming: aggregate the records into a single response
+		parts = [json.loads(line) async for line in stream]
+		if "error" in parts[-1]:
+			return JSONResponse(status_code=500, content=parts[-1])
+		final = parts[-1]
+		if chat:
+			final["message"]["content"] = "".join(p["message"]["content"] for p in parts)
+		else:
+			final["response"] = "".join(p["response"] for p in parts)
+		return final
+
+	@app.get("/", response_class=PlainTextResponse)
+	def read_root():
+		return "Ollama is running"
+
+	@app.get("/api/tags")
+	def list_models():
+		return {"models": [{"name": f"{m}:latest", "model": f"{m}:latest", "modified_at": _now(), "size": 0} for m in settings.models]}
+
+	@app.post("/api/generate")
+	async def generate(request: Request):
+		return await handle(request, chat=False)
+
+	@app.post("/api/chat")
+	async def chat(request: Request):
+		return await handle(request, chat=True)
+
+	@app.get("/fake/stats")
+	def read_stats():
+		return stats
+
+	return app
+
+
+if __name__ == "__main__":
+	import uvicorn
+
+	arg_parser = argparse.ArgumentParser(description="Run a fake Ollama server for load testing.")
+	arg_parser.add_argument("--host", default="0.0.0.0")
+	arg_parser.add_argument("--port", type=int, default=11434)
+	arg_parser.add_argument("--ttft-ms", type=float, default=FakeOllamaSettings.ttft_ms, help="Mean time to first token.")
+	arg_parser.add_argument("--ttft-jitter-ms", type=float, default=FakeOllamaSettings.ttft_jitter_ms)
+	arg_parser.add_argument("--tokens-per-sec", type=float, default=FakeOllamaSettings.tokens_per_sec)
+	arg_parser.add_argument("--response-tokens", type=int, default=FakeOllamaSettings.response_tokens)
+	arg_parser.add_argument("--error-rate", type=float, default=FakeOllamaSettings.error_rate, help="Fraction of requests failed with HTTP 500.")
+	arg_parser.add_argument("--midstream-error-rate", type=float, default=FakeOllamaSettings.midstream_error_rate)
+	arg_parser.add_argument("--max-concurrency", type=int, default=FakeOllamaSettings.max_concurrency, help="Parallel generations before requests queue.")
+	arg_parser.add_argument("--seed", type=int, default=None)
+	args = arg_parser.parse_args()
+
+	logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+	fake_settings = FakeOllamaSettings(
+		ttft_ms=args.ttft_ms,
+		ttft_jitter_ms=args.ttft_jitter_ms,
+		tokens_per_sec=args.tokens_per_sec,
+		response_tokens=args.response_tokens,
+		error_rate=args.error_rate,
+		midstream_error_rate=args.midstream_error_rate,
+		max_concurrency=args.max_concurrency,
+		seed=args.seed,
+	)
+	logging.info(f"Starting fake Ollama server on {args.host}:{args.port} with {fake_settings}")
+	uvicorn.run(create_app(fake_settings), host=args.host, port=args.port)
@@ -0,0 +1,196 @@
+import json
+import math
+import time
+import random
+import asyncio
+import logging
+import argparse
+from typing import Dict, List, Optional, Tuple
+import httpx
+
+# --- Helper Functions ---
+def load_question_mix(filepath: str) -> Tuple[List[str], List[float]]:
+	"""
+	Loads the questions to replay and their relative weights.
+
+	A '.jsonl' file holds one {"question": ..., "weight": ...} object per line
+	(e.g. mined from query logs); any other file is read as one question per
+	line with equal weights.
+
+	ARGS:
+		filepath: str, the path to the question mix file.
+	RETURNS:
+		questions, weights: tuple[list[str], list[float]]
+	"""
+	questions, weights = [], []
+	with open(filepath, 'r') as f:
+		for line in f:
+			line = line.strip()
+			if not line:
+				continue
+			if filepath.endswith(".jsonl"):
+				record = json.loads(line)
+				questions.append(record["question"])
+				weights.append(float(record.get("weight", 1.0)))
+			else:
+				questions.append(line)
+				weights.append(1.0)
+	return questions, weights
+
+def positive_float(value: str) -> float:
+	"""
+	argparse type for options that must be greater than zero, such as '--rate'.
+	"""
+	try:
+		number = float(value)
+	except ValueError:
+		raise argparse.ArgumentTypeError(f"'{value}' is not a number")
+	if not (number > 0 and math.isfinite(number)):
+		raise argparse.ArgumentTypeError(f"must be a finite number greater than 0, got {value}")
+	return number
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+	"""
+	Nearest-rank percentile of an already sorted list.
+	"""
+	if not sorted_values:
+		return 0.0
+	rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+	return sorted_values[min(rank, len(sorted_values)) - 1]
+
+def summarize_results(results: List[Dict], duration: float) -> Dict:
+	"""
+	Aggregates per-request outcomes into a load test report.
+
+	ARGS:
+		results: list[dict], one {"status": ..., "latency": ...} record per arrival.
+		duration: float, the wall time of the run in seconds.
+	RETURNS:
+		report: dict, counts per outcome, achieved throughput and latency percentiles (ms).
+	"""
+	latencies = sorted(r["latency"] * 1000 for r in results if r["status"] == "ok")
+	outcomes: Dict[str, int] = {}
+	for r in results:
+		outcomes[r["status"]] = outcomes.get(r["status"], 0) + 1
+	return {
+		"arrivals": len(results),
+		"ok": outcomes.get("ok", 0),
+		"dropped": outcomes.get("dropped", 0),
+		"timeouts": outcomes.get("timeout", 0),
+		"errors": sum(n for status, n in outcomes.items() if status not in ("ok", "dropped", "timeout")),
+		"outcomes": outcomes,
+		"duration_s": round(duration, 3),
+		"throughput_rps": round(len(latencies) / duration, 3) if duration > 0 else 0.0,
+		"latency_ms": {
+			"p50": round(percentile(latencies, 50), 2),
+			"p90": round(percentile(latencies, 90), 2),
+			"p99": round(percentile(latencies, 99), 2),
+			"p99.9": round(percentile(latencies, 99.9), 2),
+			"max": round(latencies[-1], 2) if latencies else 0.0,
+		},
+	}
+
+async def _send_query(client: httpx.AsyncClient, url: str, question: str, scheduled_at: float, timeout: float) -> Dict:
+	"""
+	Sends one question and measures latency from its *scheduled* arrival time,
+	so a slow server cannot hide queueing delay (no coordinated omission).
+	"""
+	try:
+		response = await client.post(url, json={"question": question}, timeout=timeout)
+		status = "ok" if response.status_code == 200 else f"http_{response.status_code}"
+	except httpx.TimeoutException:
+		status = "timeout"
+	except httpx.HTTPError as e:
+		status = type(e).__name__
+	return {"status": status, "latency": time.perf_counter() - scheduled_at}
+
+# --- Main Logic ---
+async def run_load_test(
+	url: str,
+	questions: List[str],
+	weights: List[float],
+	rate: float,
+	duration: float,
+	timeout: float = 60.0,
+	max_in_flight: int = 256,
+	seed: Optional[int] = None,
+	client: Optional[httpx.AsyncClient] = None,
+) -> Dict:
+	"""
+	Replays a question mix against the '/query' endpoint as an open-loop
+	Poisson process: arrivals follow the target rate regardless of how fast
+	the server answers. Arrivals that find 'max_in_flight' requests outstanding
+	are dropped and counted instead of queued on the client.
+
+	ARGS:
+		url: str, the full URL of the query endpoint.
+		questions: list[str], the questions to sample from.
+		weights: list[float], relative sampling weight of each question.
+		rate: float, target arrival rate in requests per second.
+		duration: float, how long to generate arrivals, in seconds.
+		timeout: float, per-request timeout in seconds.
+		max_in_flight: int, outstanding request cap before arrivals are dropped.
+		seed: int, optional seed for reproducible arrival schedules.
+		client: httpx.AsyncClient, optional pre-configured client.
+	RETURNS:
+		report: dict, see summarize_results.
+	"""
+	if not (rate > 0 and math.isfinite(rate)):
+		raise ValueError(f"The arrival rate must be a finite number greater than 0, got {rate}.")
+	rng = random.Random(seed)
+	owns_client = client is None
+	if owns_client:
+		limits = httpx.Limits(max_connections=max_in_flight, max_keepalive_connections=max_in_flight)
+		client = httpx.AsyncClient(limits=limits)
+
+	results: List[Dict] = []
+	tasks = set()
+	start = time.perf_counter()
+	next_arrival = start
+	try:
+		while True:
+			next_arrival += rng.expovariate(rate)
+			if next_arrival - start > duration:
+				break
+			await asyncio.sleep(max(0.0, next_arrival - time.perf_counter()))
+			if len(tasks) >= max_in_flight:
+				results.append({"status": "dropped", "latency": 0.0})
+				continue
+			question = rng.choices(questions, weights=weights)[0]
+			task = asyncio.create_task(_send_query(client, url, question, next_arrival, timeout))
+			tasks.add(task)
+			task.add_done_callback(lambda t: (tasks.discard(t), results.append(t.result())))
+		if tasks:
+			await asyncio.gather(*tasks)
+	finally:
+		if owns_client:
+			await client.aclose()
+
+	return summarize_results(results, time.perf_counter() - start)
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+	arg_parser = argparse.ArgumentParser(description="Open-loop load generator for the Q&A bot '/query' endpoint.")
+	arg_parser.add_argument("--url", default="http://localhost:8000/query")
+	arg_parser.add_argument("--questions", required=True, help="Question mix: text (one per line) or .jsonl with question/weight.")
+	arg_parser.add_argument("--rate", type=positive_float, default=1.0, help="Target arrival rate (requests/s).")
+	arg_parser.add_argument("--duration", type=positive_float, default=60.0, help="Seconds to generate arrivals for.")
+	arg_parser.add_argument("--timeout", type=float, default=60.0)
+	arg_parser.add_argument("--max-in-flight", type=int, default=256)
+	arg_parser.add_argument("--seed", type=int, default=None)
+	arg_parser.add_argument("--output", default=None, help="Optional path to write the JSON report.")
+	return arg_parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+	args = parse_args()
+	logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+	mix_questions, mix_weights = load_question_mix(args.questions)
+	logging.info(f"Loaded {len(mix_questions)} questions. Running {args.rate} req/s for {args.duration}s against {args.url}")
+	report = asyncio.run(run_load_test(
+		args.url, mix_questions, mix_weights, args.rate, args.duration,
+		timeout=args.timeout, max_in_flight=args.max_in_flight, seed=args.seed
+	))
+	print(json.dumps(report, indent=2))
+	if args.output:
+		with open(args.output, 'w') as f:
+			json.dump(report, f, indent=2)
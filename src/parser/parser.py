@@ -1,14 +1,166 @@
 import os
+import re
+import json
 import logging
-from typing import List
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
-from src.config import PROCESSED_DATA_DIR, CHUNK_SIZE, CHUNK_OVERLAP
+from src.config import (
+	PROCESSED_DATA_DIR, CHUNK_SIZE, CHUNK_OVERLAP, CHUNKING_MODE, CHUNK_TOKEN_OVERLAP_RATIO, EMBEDDING_MODEL_NAME
+)
+from src.profiling import profiler
+from src.chunkstore.chunkstore import ChunkStoreWriter, remove_chunk_store
+
+# markers written by the scraper in front of the repo and of every page
+HEADER_PATTERN = re.compile(r"^--- Scraped content from (.+) ---$")
+PAGE_PATTERN = re.compile(r"^--- Page: (.+) ---$")
+
+# --- Helper Functions ---
+def model_files_dir(model_name: str) -> str:
+	"""
+	Resolves an embedding model name the way sentence-transformers does and
+	returns a local directory with its configuration and tokenizer files. For
+	a hub model only those small files are fetched (or read from the cache),
+	never the weights.
+	"""
+	if os.path.isdir(model_name):
+		return model_name
+	# imported here so character chunking doesn't pay for it
+	from huggingface_hub import snapshot_download
+	repo_id = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+	return snapshot_download(repo_id, allow_patterns=["*.json", "*.txt", "*.model"])
+
+def _read_json(filepath: str) -> Dict:
+	if not os.path.exists(filepath):
+		return {}
+	with open(filepath, 'r') as f:
+		return json.load(f)
+
+@lru_cache(maxsize=1)
+def load_tokenizer() -> Tuple[Any, int]:
+	"""
+	Loads the embedding model's tokenizer and its max_seq_length, the number
+	of tokens (special tokens included) the model embeds before truncating.
+	Only the tokenizer is loaded, not the model weights.
+	"""
+	from transformers import AutoConfig, AutoTokenizer
+	model_dir = model_files_dir(EMBEDDING_MODEL_NAME)
+	# the Transformer module of a sentence-transformers model may live in a subfolder
+	modules = _read_json(os.path.join(model_dir, "modules.json")) or [{"path": "", "type": "Transformer"}]
+	transformer = next((m for m in modules if m.get("type", "").endswith("Transformer")), modules[0])
+	transformer_dir = os.path.join(model_dir, transformer.get("path", ""))
+	tokenizer = AutoTokenizer.from_pretrained(transformer_dir)
+
+	max_seq_length = _read_json(os.path.join(transformer_dir, "sentence_bert_config.json")).get("max_seq_length")
+	if max_seq_length is None:
+		# what sentence-transformers falls back to without a configured length
+		config = AutoConfig.from_pretrained(transformer_dir)
+		max_seq_length = min(tokenizer.model_max_length, getattr(config, "max_position_embeddings", tokenizer.model_max_length))
+	return tokenizer, max_seq_length
+
+def token_budget() -> Tuple[int, int]:
+	"""
+	Derives the chunk size and overlap, in tokens, from the embedding model:
+	a chunk plus the special tokens the model adds must fit max_seq_length.
+	"""
+	tokenizer, max_seq_length = load_tokenizer()
+	chunk_tokens = max_seq_length - tokenizer.num_special_tokens_to_add()
+	return chunk_tokens, int(chunk_tokens * CHUNK_TOKEN_OVERLAP_RATIO)
+
+def token_lengths(chunks: List[str]) -> List[int]:
+	"""
+	Counts the tokens of each chunk the way the embedding model sees it,
+	special tokens included and nothing truncated.
+	"""
+	if not chunks:
+		return []
+	tokenizer, _ = load_tokenizer()
+	return [len(ids) for ids in tokenizer(chunks, add_special_tokens=True, verbose=False)["input_ids"]]
+
+def make_text_splitter(mode: Optional[str] = None) -> RecursiveCharacterTextSplitter:
+	"""
+	Builds the text splitter shared by all chunking entry points.
+
+	ARGS:
+		mode: str, 'characters' or 'tokens' (measured with the embedding model's
+			tokenizer); defaults to CHUNKING_MODE.
+	"""
+	mode = mode or CHUNKING_MODE
+	if mode == "tokens":
+		chunk_tokens, overlap_tokens = token_budget()
+		return RecursiveCharacterTextSplitter.from_huggingface_tokenizer(
+			load_tokenizer()[0],
+			chunk_size=chunk_tokens,
+			chunk_overlap=overlap_tokens,
+			add_start_index=False,
+		)
+	if mode != "characters":
+		raise ValueError(f"Unknown CHUNKING_MODE '{mode}'; use 'characters' or 'tokens'.")
+	return RecursiveCharacterTextSplitter(
+		chunk_size=CHUNK_SIZE,
+		chunk_overlap=CHUNK_OVERLAP,
+		add_start_index=False, # We don't need this for our use case
+	)
+
+def iter_pages(filepath: str) -> Iterator[Tuple[str, str]]:
+	"""
+	Reads a scraped file line by line and yields one page at a time, so memory
+	is bounded by the largest page rather than the whole repo. Text before the
+	first page marker is attributed to the repo URL from the header.
+
+	ARGS:
+		filepath: str, the path to a file written by the scraper.
+	YIELDS:
+		(page_url, page_text): tuple[str, str]
+	"""
+	page_url = ""
+	lines: List[str] = []
+	with open(filepath, 'r') as f:
+		for line in f:
+			stripped = line.rstrip('\n')
+			marker = PAGE_PATTERN.match(stripped) or HEADER_PATTERN.match(stripped)
+			if marker:
+				text = "".join(lines).strip()
+				if text:
+					yield page_url, text
+				lines = []
+				page_url = marker.group(1)
+			else:
+				lines.append(line)
+	text = "".join(lines).strip()
+	if text:
+		yield page_url, text
+
+def iter_page_chunks(filepath: str) -> Iterator[Tuple[str, Dict[str, str]]]:
+	"""
+	Streams a scraped file page by page and splits each page on its own, so no
+	chunk crosses a page boundary.
+
+	ARGS:
+		filepath: str, the path to a file written by the scraper.
+	YIELDS:
+		(chunk, metadata): tuple[str, dict], metadata holds the page URL as 'source'.
+	"""
+	text_splitter = make_text_splitter()
+	for page_url, page_text in iter_pages(filepath):
+		with profiler.stage("parser:split"):
+			page_chunks = text_splitter.split_text(page_text)
+		profiler.count(
+			pages_in=1,
+			bytes_in=len(page_text.encode('utf-8')),
+			chunks_out=len(page_chunks),
+			bytes_out=sum(len(chunk.encode('utf-8')) for chunk in page_chunks)
+		)
+		for chunk in page_chunks:
+			yield chunk, {"source": page_url}
 
 # --- Main Logic ---
 def process_and_chunk_file(filepath: str) -> List[str]:
 	"""
 	Loads a single file, cleans its contents, and splits it into chunks.
+	The whole file is held in memory and chunks may span pages; the ingestion
+	pipeline uses iter_page_chunks instead.
 
 	ARGS:
 		filepath: str, the path to the text file.
@@ -25,12 +177,15 @@ def process_and_chunk_file(filepath: str) -> List[str]:
 		if content_start != -1:
 			raw_text = raw_text[content_start+5:]
 
-		text_splitter = RecursiveCharacterTextSplitter(
-			chunk_size=CHUNK_SIZE,
-			chunk_overlap=CHUNK_OVERLAP,
-			add_start_index=False, # We don't need this for our use case
+		text_splitter = make_text_splitter()
+		with profiler.stage("parser:split"):
+			text_chunks = text_splitter.split_text(raw_text)
+		profiler.count(
+			files_in=1,
+			bytes_in=len(raw_text.encode('utf-8')),
+			chunks_out=len(text_chunks),
+			bytes_out=sum(len(chunk.encode('utf-8')) for chunk in text_chunks)
 		)
-		text_chunks = text_splitter.split_text(raw_text)
 
 		logging.info(f"Successfully chunked {filepath} into {len(text_chunks)} chunks.")
 		return text_chunks
@@ -39,6 +194,31 @@ def process_and_chunk_file(filepath: str) -> List[str]:
 		return []
 
 
+def write_page_chunks(filepath: str, output_prefix: str) -> int:
+	"""
+	Streams the chunks of one scraped file into a chunk store, keeping each
+	chunk's page URL as its metadata.
+
+	ARGS:
+		filepath: str, the path to a file written by the scraper.
+		output_prefix: str, the path prefix of the chunk store to write.
+	RETURNS:
+		chunk_count: int, the number of chunks written.
+	"""
+	logging.info(f"Processing and chunking file: {filepath}")
+	try:
+		with ChunkStoreWriter(output_prefix) as writer:
+			for chunk, metadata in iter_page_chunks(filepath):
+				writer.add(chunk, metadata)
+		profiler.count(files_in=1)
+	except Exception as e:
+		logging.error(f"Error processing file {filepath}: {e}")
+		return 0
+
+	if writer.count == 0:
+		remove_chunk_store(output_prefix)
+	return writer.count
+
 def parse_and_chunk_files(list_of_files: List[str]) -> str:
 	"""
 	Main entry point for the parser. It processes all files from the input list
@@ -53,13 +233,15 @@ def parse_and_chunk_files(list_of_files: List[str]) -> str:
 
 	for file_path in list_of_files:
 		if os.path.exists(file_path):
-			chunks = process_and_chunk_file(file_path)
-			if chunks:
-				base_filename = os.path.basename(file_path)
-				output_filepath = os.path.join(PROCESSED_DATA_DIR, f"processed_{base_filename}")
-				with open(output_filepath, 'w') as f:
-					f.write("\n---CHUNK---\n".join(chunks))
-				logging.info(f"Saved {len(chunks)} chunks to {output_filepath}")
+			base_filename = os.path.basename(file_path)
+			output_prefix = os.path.join(PROCESSED_DATA_DIR, f"processed_{os.path.splitext(base_filename)[0]}")
+			chunk_count = write_page_chunks(file_path, output_prefix)
+			if chunk_count:
+				logging.info(f"Saved {chunk_count} chunks to chunk store {output_prefix}")
+				# drop the text outputs of earlier runs so the vectorizer doesn't read both
+				for legacy_filepath in (os.path.join(PROCESSED_DATA_DIR, f"processed_{base_filename}"), output_prefix + ".jsonl"):
+					if os.path.exists(legacy_filepath):
+						os.remove(legacy_filepath)
 
 	logging.info(f"All parsing and chunking tasks complete. Output is in '{PROCESSED_DATA_DIR}'")
-	return str(PROCESSED_DATA_DIR)
\ No newline at end of file
+	return str(PROCESSED_DATA_DIR)
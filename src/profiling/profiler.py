@@ -0,0 +1,201 @@
+import os
+import sys
+import json
+import time
+import logging
+import cProfile
+import threading
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+	import resource
+except ImportError: # not available on Windows
+	resource = None
+
+from src.config import REPORTS_DIR
+
+# the profiler of the current run and the stack of stages the caller is inside of
+_active_profiler: ContextVar[Optional["PipelineProfiler"]] = ContextVar("active_profiler", default=None)
+_stage_stack: ContextVar[Tuple[Dict, ...]] = ContextVar("stage_stack", default=())
+
+# --- Helper Functions ---
+def peak_rss_mb() -> float:
+	"""
+	Returns the peak resident set size of this process so far, in MB.
+	"""
+	if resource is None:
+		return 0.0
+	peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	# ru_maxrss is reported in bytes on macOS and in kilobytes everywhere else
+	return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def _new_record(name: str) -> Dict:
+	return {
+		"name": name,
+		"calls": 0,
+		"wall_s": 0.0,
+		"cpu_s": 0.0,
+		# the process's RSS high-water mark when the stage last exited
+		"peak_rss_mb": 0.0,
+		"counters": {},
+	}
+
+# --- Main Logic ---
+class PipelineProfiler:
+	"""
+	Collects per-stage measurements for one ingestion run and writes them as a
+	JSON report. Stages with the same name accumulate into one record, so a
+	stage can be entered once per repo or once per batch. The same goes for
+	the cProfile of profile_stage: every entry is added to one profile, which
+	is dumped with the report.
+	"""
+
+	def __init__(self, profile_stage: Optional[str] = None, output_dir: str = str(REPORTS_DIR)):
+		"""
+		ARGS:
+			profile_stage: str, optional stage name to run under cProfile.
+			output_dir: str, the directory the report (and .prof dump) is written to.
+		"""
+		self.profile_stage = profile_stage
+		self.output_dir = output_dir
+		self.run_id = datetime.now().strftime("%Y%m%d-%H%M%S")
+		self.records: Dict[str, Dict] = {}
+		self._lock = threading.Lock()
+		self._started = time.perf_counter()
+		self._cprofile = cProfile.Profile() if profile_stage else None
+		# only one thread can run under the profiler at a time (Python 3.12+ refuses
+		# a second enable()), so concurrent entries of the profiled stage take turns
+		self._cprofile_lock = threading.RLock()
+		self._cprofile_depth = 0
+
+	@contextmanager
+	def profiling(self) -> Iterator[None]:
+		"""
+		Runs a block under the profile_stage cProfile, adding to what earlier
+		entries of the stage collected.
+		"""
+		with self._cprofile_lock:
+			# a stage nested in itself is already being profiled
+			self._cprofile_depth += 1
+			if self._cprofile_depth == 1:
+				self._cprofile.enable()
+			try:
+				yield
+			finally:
+				self._cprofile_depth -= 1
+				if self._cprofile_depth == 0:
+					self._cprofile.disable()
+
+	@contextmanager
+	def activate(self) -> Iterator["PipelineProfiler"]:
+		"""
+		Makes this profiler the target of stage() and count() in the current context.
+		"""
+		token = _active_profiler.set(self)
+		try:
+			yield self
+		finally:
+			_active_profiler.reset(token)
+
+	def record(self, name: str) -> Dict:
+		with self._lock:
+			if name not in self.records:
+				self.records[name] = _new_record(name)
+			return self.records[name]
+
+	def add(self, record: Dict, **values: float) -> None:
+		with self._lock:
+			for key, value in values.items():
+				record["counters"][key] = record["counters"].get(key, 0) + value
+
+	def report(self) -> Dict:
+		"""
+		Builds the report, deriving throughput from counters and wall time.
+		"""
+		stages: List[Dict] = []
+		with self._lock:
+			for record in self.records.values():
+				entry = dict(record, counters=dict(record["counters"]))
+				wall = record["wall_s"]
+				entry["throughput_per_s"] = {
+					key: round(value / wall, 3) for key, value in record["counters"].items() if wall > 0
+				}
+				stages.append(entry)
+		return {
+			"run_id": self.run_id,
+			"total_wall_s": round(time.perf_counter() - self._started, 3),
+			"peak_rss_mb": round(peak_rss_mb(), 1),
+			"stages": stages,
+		}
+
+	def write_report(self) -> str:
+		"""
+		Writes the report to '<output_dir>/ingest_report_<run_id>.json', and the
+		profile of profile_stage, if it ran, to '<output_dir>/ingest_<run_id>_<stage>.prof'.
+
+		RETURNS:
+			report_path: str, the path of the written report.
+		"""
+		os.makedirs(self.output_dir, exist_ok=True)
+		report_path = os.path.join(self.output_dir, f"ingest_report_{self.run_id}.json")
+		with open(report_path, 'w') as f:
+			json.dump(self.report(), f, indent=2)
+		logging.info(f"Ingestion profiling report written to {report_path}")
+
+		if self._cprofile is not None and self.profile_stage in self.records:
+			safe_name = self.profile_stage.replace(':', '_').replace('/', '_')
+			dump_path = os.path.join(self.output_dir, f"ingest_{self.run_id}_{safe_name}.prof")
+			with self._cprofile_lock:
+				self._cprofile.dump_stats(dump_path)
+			calls = self.records[self.profile_stage]["calls"]
+			logging.info(f"cProfile dump of {calls} entries of stage '{self.profile_stage}' written to {dump_path}")
+		return report_path
+
+@contextmanager
+def stage(name: str, per_thread: bool = False) -> Iterator[Optional[Dict]]:
+	"""
+	Measures a block of work as the named stage of the active profiler.
+	Does nothing when no profiler is active.
+
+	ARGS:
+		name: str, the stage name, e.g. 'parser' or 'scraper:zenml-io_zenml'.
+		per_thread: bool, measure CPU time of the calling thread only. Use this
+			for work that runs concurrently in a thread pool.
+	"""
+	profiler = _active_profiler.get()
+	if profiler is None:
+		yield None
+		return
+
+	record = profiler.record(name)
+	cpu_clock = time.thread_time if per_thread else time.process_time
+	profiling = profiler.profiling() if name == profiler.profile_stage else nullcontext()
+	token = _stage_stack.set(_stage_stack.get() + (record,))
+	with profiling:
+		wall_start, cpu_start = time.perf_counter(), cpu_clock()
+		try:
+			yield record
+		finally:
+			wall, cpu = time.perf_counter() - wall_start, cpu_clock() - cpu_start
+			peak = round(peak_rss_mb(), 1)
+			_stage_stack.reset(token)
+			with profiler._lock:
+				record["calls"] += 1
+				record["wall_s"] = round(record["wall_s"] + wall, 6)
+				record["cpu_s"] = round(record["cpu_s"] + cpu, 6)
+				record["peak_rss_mb"] = max(record["peak_rss_mb"], peak)
+
+def count(**values: float) -> None:
+	"""
+	Adds to the counters (items_in, bytes_out, ...) of every stage the caller is
+	currently inside of, so a per-repo count also rolls up into its parent stage.
+	Does nothing when no profiler is active.
+	"""
+	profiler = _active_profiler.get()
+	if profiler is None:
+		return
+	for record in _stage_stack.get():
+		profiler.add(record, **values)
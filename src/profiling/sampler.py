@@ -0,0 +1,185 @@
+import os
+import sys
+import hmac
+import time
+import random
+import logging
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Optional
+
+# requests sent with this header (any value) are profiled when request profiling is
+# on and the client may profile: it connects from this machine or sends the admin token
+PROFILE_HEADER = "X-Profile"
+PROFILE_HEADER_KEY = PROFILE_HEADER.lower().encode()
+PROFILE_TOKEN_HEADER = "X-Profile-Token"
+PROFILE_TOKEN_HEADER_KEY = PROFILE_TOKEN_HEADER.lower().encode()
+LOCAL_CLIENTS = {"127.0.0.1", "::1"}
+
+# leaf frames of threads that are blocked waiting for work, not running it
+IDLE_FRAMES = {
+	("threading.py", "wait"),
+	("selectors.py", "select"),
+	("thread.py", "_worker"),
+}
+
+# --- Helper Functions ---
+def frame_label(frame) -> str:
+	"""
+	Names a frame as 'module:qualified_function', without the ';' and spaces
+	that the folded stack format uses as separators.
+	"""
+	code = frame.f_code
+	module = frame.f_globals.get("__name__", os.path.basename(code.co_filename))
+	name = getattr(code, "co_qualname", code.co_name)
+	return f"{module}:{name}".replace(";", ",").replace(" ", "_")
+
+def fold_stack(frame, thread_name: str) -> str:
+	"""
+	Renders a thread's stack root-first as one line of Brendan Gregg's folded
+	format, with the thread name as the root frame.
+	"""
+	labels = []
+	while frame is not None:
+		labels.append(frame_label(frame))
+		frame = frame.f_back
+	labels.append(thread_name.replace(";", ",").replace(" ", "_"))
+	return ";".join(reversed(labels))
+
+def profile_path(output_dir: str, name: str) -> str:
+	"""
+	Builds a unique '<output_dir>/<timestamp>_<name>.folded' file name.
+	"""
+	safe_name = "".join(c if c.isalnum() or c in "-_" else "_" for c in name).strip("_") or "profile"
+	return os.path.join(output_dir, f"{datetime.now().strftime('%Y%m%dT%H%M%S%f')}_{safe_name}.folded")
+
+def may_profile(client_host: Optional[str], token: Optional[str], admin_token: str) -> bool:
+	"""
+	Decides whether a client may start a profile: always from this machine,
+	for example through 'kubectl port-forward', and from elsewhere only with
+	the admin token. Without a configured token only local clients may.
+	"""
+	if admin_token and token and hmac.compare_digest(token.encode(), admin_token.encode()):
+		return True
+	return client_host in LOCAL_CLIENTS
+
+def is_idle(frame) -> bool:
+	code = frame.f_code
+	return (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES
+
+# --- Main Logic ---
+class StackSampler:
+	"""
+	Statistical profiler: a background thread records the Python stack of every
+	other thread at a fixed interval. Unlike cProfile it costs nothing in the
+	profiled code, and nothing at all while no sampler is running, so it is
+	safe to turn on in a serving process. Counts are kept as folded stacks,
+	which flamegraph.pl, speedscope and inferno render directly.
+	"""
+
+	def __init__(self, interval_seconds: float = 0.005, include_idle: bool = False):
+		"""
+		ARGS:
+			interval_seconds: float, time between samples.
+			include_idle: bool, also count threads blocked waiting for work.
+		"""
+		self.interval_seconds = interval_seconds
+		self.include_idle = include_idle
+		self.stacks: Counter = Counter()
+		self.samples = 0
+		self.started_at: Optional[float] = None
+		self.duration_s = 0.0
+		self._stop = threading.Event()
+		self._thread: Optional[threading.Thread] = None
+
+	def start(self) -> "StackSampler":
+		self._stop.clear()
+		self.started_at = time.perf_counter()
+		self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+		self._thread.start()
+		return self
+
+	def stop(self) -> "StackSampler":
+		self._stop.set()
+		if self._thread is not None:
+			self._thread.join()
+			self._thread = None
+		self.duration_s = time.perf_counter() - self.started_at
+		return self
+
+	def __enter__(self) -> "StackSampler":
+		return self.start()
+
+	def __exit__(self, *exc_info) -> None:
+		self.stop()
+
+	def _run(self) -> None:
+		own_id = threading.get_ident()
+		while not self._stop.wait(self.interval_seconds):
+			thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+			for thread_id, frame in sys._current_frames().items():
+				if thread_id == own_id or (not self.include_idle and is_idle(frame)):
+					continue
+				self.stacks[fold_stack(frame, thread_names.get(thread_id, str(thread_id)))] += 1
+			self.samples += 1
+
+	def folded(self) -> str:
+		"""Returns the collected stacks as 'frame;frame;frame count' lines."""
+		return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+	def write_folded(self, path: str) -> str:
+		"""
+		Writes the folded stacks to path, creating its directory.
+		"""
+		os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+		with open(path, 'w') as f:
+			f.write(self.folded())
+		logging.info(f"Wrote {self.samples} stack samples over {self.duration_s:.2f}s to {path}")
+		return path
+
+class RequestProfilerMiddleware:
+	"""
+	ASGI middleware that samples the stacks of the whole process while a
+	request is served, for requests sent with PROFILE_HEADER by a client that
+	may_profile allows and a random sample_rate fraction of the rest. Only one
+	request is profiled at a time;
+	concurrent requests still show up in its samples under their own threads.
+	The profile's file name is returned in the 'X-Profile-File' header.
+	"""
+
+	def __init__(self, app, output_dir: str, sample_rate: float = 0.0, interval_seconds: float = 0.005, admin_token: str = ""):
+		self.app = app
+		self.output_dir = output_dir
+		self.sample_rate = sample_rate
+		self.interval_seconds = interval_seconds
+		self.admin_token = admin_token
+		self._lock = threading.Lock()
+
+	def _selected(self, scope) -> bool:
+		headers = dict(scope.get("headers", ()))
+		if PROFILE_HEADER_KEY in headers:
+			client = scope.get("client")
+			token = headers.get(PROFILE_TOKEN_HEADER_KEY, b"").decode("latin-1")
+			if may_profile(client[0] if client else None, token, self.admin_token):
+				return True
+		return self.sample_rate > 0 and random.random() < self.sample_rate
+
+	async def __call__(self, scope, receive, send):
+		if scope["type"] != "http" or not self._selected(scope) or not self._lock.acquire(blocking=False):
+			await self.app(scope, receive, send)
+			return
+
+		path = profile_path(self.output_dir, f"{scope['method']}{scope['path']}")
+		async def send_with_profile_header(message):
+			if message["type"] == "http.response.start":
+				message["headers"] = [*message.get("headers", []), (b"x-profile-file", os.path.basename(path).encode())]
+			await send(message)
+
+		sampler = StackSampler(self.interval_seconds).start()
+		try:
+			await self.app(scope, receive, send_with_profile_header)
+		finally:
+			sampler.stop()
+			self._lock.release()
+			sampler.write_folded(path)
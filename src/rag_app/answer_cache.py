@@ -0,0 +1,89 @@
+import os
+import re
+import json
+import hashlib
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+from src.rag_app.prompts import QA_PROMPT_TEMPLATE
+
+# answers generated with a different prompt are not reused
+PROMPT_VERSION = hashlib.sha256(QA_PROMPT_TEMPLATE.encode('utf-8')).hexdigest()[:12]
+# collection metadata key the vectorizer sets to a new value whenever it changes the collection's contents
+CONTENT_VERSION_KEY = "content_version"
+
+# --- Helper Functions ---
+def normalize_question(question: str) -> str:
+	"""
+	Builds the lookup key of a question: case, whitespace and trailing
+	punctuation differences map to the same snapshot entry.
+	"""
+	return re.sub(r"\s+", " ", question).strip().rstrip("?!. ").lower()
+
+def get_collection_version(collection: Any) -> str:
+	"""
+	Identifies the contents of a Chroma collection. Re-creating the collection,
+	adding chunks to it or re-ingesting changed documents changes the version;
+	the last one is only seen through the content version the vectorizer writes.
+	"""
+	version = f"{collection.name}:{collection.id}:{collection.count()}"
+	content_version = (collection.metadata or {}).get(CONTENT_VERSION_KEY)
+	return f"{version}:{content_version}" if content_version else version
+
+# --- Main Logic ---
+def write_snapshot(filepath: str, answers: List[Dict], collection_version: str) -> None:
+	"""
+	Writes precomputed answers to a snapshot file.
+
+	ARGS:
+		filepath: str, where to write the snapshot.
+		answers: list[dict], {"question", "answer", "source_documents"} records.
+		collection_version: str, the version of the collection the answers were retrieved from.
+	"""
+	snapshot = {
+		"collection_version": collection_version,
+		"prompt_version": PROMPT_VERSION,
+		"created_at": datetime.now(timezone.utc).isoformat(),
+		"answers": {normalize_question(a["question"]): a for a in answers},
+	}
+	os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+	tmp_path = filepath + ".tmp"
+	with open(tmp_path, 'w') as f:
+		json.dump(snapshot, f)
+	os.replace(tmp_path, filepath)
+	logging.info(f"Wrote {len(snapshot['answers'])} precomputed answers to {filepath}")
+
+def load_snapshot(filepath: str, collection_version: str) -> Dict[str, Dict]:
+	"""
+	Loads precomputed answers if the snapshot matches the serving collection.
+
+	ARGS:
+		filepath: str, the snapshot file.
+		collection_version: str, the version of the collection being served.
+	RETURNS:
+		answers: dict, normalized question -> answer record. Empty if the file is
+			missing or was built for another collection version or prompt.
+	"""
+	if not os.path.exists(filepath):
+		logging.info(f"No answer snapshot at {filepath}; starting with an empty answer cache.")
+		return {}
+	try:
+		with open(filepath, 'r') as f:
+			snapshot = json.load(f)
+	except (OSError, ValueError) as e:
+		logging.error(f"Could not read answer snapshot {filepath}: {e}")
+		return {}
+
+	if snapshot.get("collection_version") != collection_version:
+		logging.warning(
+			f"Ignoring answer snapshot {filepath}: built for collection version "
+			f"'{snapshot.get('collection_version')}', serving '{collection_version}'."
+		)
+		return {}
+	if snapshot.get("prompt_version") != PROMPT_VERSION:
+		logging.warning(f"Ignoring answer snapshot {filepath}: built with a different prompt template.")
+		return {}
+
+	logging.info(f"Loaded {len(snapshot['answers'])} precomputed answers from {filepath}")
+	return snapshot["answers"]
@@ -0,0 +1,166 @@
+import time
+import random
+import asyncio
+import logging
+from typing import Any, Callable, Optional, Tuple
+import httpx
+import chromadb
+from chromadb.config import Settings
+
+from src.config import (
+	DB_DIR, COLLECTION_NAME, CHROMA_MODE, CHROMA_HOST, CHROMA_PORT, CHROMA_SSL,
+	CHROMA_TIMEOUT_SECONDS, CHROMA_RETRIES, CHROMA_RETRY_BACKOFF_SECONDS, CHROMA_POOL_SIZE
+)
+
+# responses that mean the server is overloaded or restarting, not that the request is wrong
+TRANSIENT_STATUS_CODES = {429, 502, 503, 504}
+
+# --- Helper Functions ---
+def is_transient(error: BaseException) -> bool:
+	"""
+	Tells whether a failed Chroma call is worth retrying.
+	"""
+	if isinstance(error, (httpx.TransportError, TimeoutError)):
+		return True
+	if isinstance(error, httpx.HTTPStatusError):
+		return error.response.status_code in TRANSIENT_STATUS_CODES
+	return False
+
+def backoff_delay(attempt: int, backoff_seconds: float) -> float:
+	# exponential with jitter, so replicas retrying together do not hit the server in lockstep
+	return backoff_seconds * (2 ** attempt) * (0.5 + random.random() / 2)
+
+def call_with_retries(fn: Callable, *args, retries: int = CHROMA_RETRIES, backoff_seconds: float = CHROMA_RETRY_BACKOFF_SECONDS, **kwargs) -> Any:
+	"""
+	Calls fn, retrying transient failures with exponential backoff.
+	"""
+	for attempt in range(retries + 1):
+		try:
+			return fn(*args, **kwargs)
+		except Exception as e:
+			if attempt == retries or not is_transient(e):
+				raise
+			delay = backoff_delay(attempt, backoff_seconds)
+			logging.warning(f"Chroma call {getattr(fn, '__name__', fn)} failed ({e!r}); retrying in {delay:.2f}s")
+			time.sleep(delay)
+
+async def acall_with_retries(
+	fn: Callable,
+	*args,
+	timeout: float = CHROMA_TIMEOUT_SECONDS,
+	retries: int = CHROMA_RETRIES,
+	backoff_seconds: float = CHROMA_RETRY_BACKOFF_SECONDS,
+	**kwargs
+) -> Any:
+	"""
+	Awaits fn(*args, **kwargs) with a timeout per attempt, retrying transient
+	failures with exponential backoff. Cancellation is never retried.
+	"""
+	for attempt in range(retries + 1):
+		try:
+			return await asyncio.wait_for(fn(*args, **kwargs), timeout)
+		except Exception as e:
+			if attempt == retries or not is_transient(e):
+				raise
+			delay = backoff_delay(attempt, backoff_seconds)
+			logging.warning(f"Chroma call {getattr(fn, '__name__', fn)} failed ({e!r}); retrying in {delay:.2f}s")
+			await asyncio.sleep(delay)
+
+def http_settings(pool_size: int = CHROMA_POOL_SIZE) -> Settings:
+	"""
+	Client settings that keep a bounded pool of keep-alive connections to the server.
+	"""
+	return Settings(
+		chroma_http_max_connections=pool_size,
+		chroma_http_max_keepalive_connections=pool_size,
+		anonymized_telemetry=False
+	)
+
+def _set_request_timeout(client: Any, timeout: float) -> None:
+	# chromadb builds its httpx session with timeout=None and has no setting for it
+	session = getattr(getattr(client, "_server", None), "_session", None)
+	if isinstance(session, httpx.Client):
+		session.timeout = httpx.Timeout(timeout)
+	else:
+		logging.warning("Could not set a request timeout on the Chroma HTTP client.")
+
+class RetryingCollection:
+	"""
+	Chroma collection whose read calls are retried on transient failures.
+	Other attributes (name, id, metadata, ...) pass through unchanged.
+	"""
+
+	def __init__(self, collection: Any):
+		self._collection = collection
+
+	def __getattr__(self, name: str) -> Any:
+		return getattr(self._collection, name)
+
+	def query(self, **kwargs) -> Any:
+		return call_with_retries(self._collection.query, **kwargs)
+
+	def get(self, **kwargs) -> Any:
+		return call_with_retries(self._collection.get, **kwargs)
+
+	def count(self) -> int:
+		return call_with_retries(self._collection.count)
+
+class AsyncRetryingCollection:
+	"""
+	Async Chroma collection whose read calls have a timeout and are retried
+	on transient failures.
+	"""
+
+	def __init__(self, collection: Any):
+		self._collection = collection
+
+	def __getattr__(self, name: str) -> Any:
+		return getattr(self._collection, name)
+
+	async def query(self, **kwargs) -> Any:
+		return await acall_with_retries(self._collection.query, **kwargs)
+
+	async def get(self, **kwargs) -> Any:
+		return await acall_with_retries(self._collection.get, **kwargs)
+
+	async def count(self) -> int:
+		return await acall_with_retries(self._collection.count)
+
+# --- Main Logic ---
+def open_collection(name: str = COLLECTION_NAME, mode: str = CHROMA_MODE, db_dir: Optional[str] = None) -> Tuple[Any, Any]:
+	"""
+	Opens the serving collection, in-process or on a Chroma server.
+
+	ARGS:
+		name: str, the collection name.
+		mode: str, 'embedded' for a local directory, 'http' for the server at CHROMA_HOST:CHROMA_PORT.
+		db_dir: str, the directory of an embedded collection; defaults to DB_DIR.
+	RETURNS:
+		(client, collection): the Chroma client and the collection. In 'http' mode
+			the collection retries transient failures and requests time out.
+	"""
+	if mode == "embedded":
+		db_dir = str(db_dir or DB_DIR)
+		logging.info(f"Connecting to vector database as: {db_dir}")
+		client = chromadb.PersistentClient(path=db_dir)
+		return client, client.get_or_create_collection(name=name)
+	if mode != "http":
+		raise ValueError(f"Unknown CHROMA_MODE '{mode}'; use 'embedded' or 'http'.")
+
+	logging.info(f"Connecting to Chroma server at {CHROMA_HOST}:{CHROMA_PORT}")
+	client = call_with_retries(chromadb.HttpClient, host=CHROMA_HOST, port=CHROMA_PORT, ssl=CHROMA_SSL, settings=http_settings())
+	_set_request_timeout(client, CHROMA_TIMEOUT_SECONDS)
+	collection = call_with_retries(client.get_or_create_collection, name=name)
+	return client, RetryingCollection(collection)
+
+async def open_async_collection(name: str = COLLECTION_NAME) -> AsyncRetryingCollection:
+	"""
+	Opens the collection on the Chroma server through the async HTTP client.
+	The client keeps one connection pool per event loop, so each worker
+	process must call this from its own loop.
+	"""
+	client = await acall_with_retries(
+		chromadb.AsyncHttpClient, host=CHROMA_HOST, port=CHROMA_PORT, ssl=CHROMA_SSL, settings=http_settings()
+	)
+	collection = await acall_with_retries(client.get_or_create_collection, name=name)
+	return AsyncRetryingCollection(collection)
@@ -0,0 +1,85 @@
+import asyncio
+import logging
+from collections import Counter
+from typing import Any, Awaitable, Optional
+
+from src.config import QUERY_TIMEOUT_SECONDS, QUERY_MAX_TIMEOUT_SECONDS
+
+# clients may shorten (or, up to the maximum, extend) their deadline with this header, in seconds
+TIMEOUT_HEADER = "X-Request-Timeout"
+# how often an in-flight request checks whether its client is still connected
+DISCONNECT_POLL_SECONDS = 0.25
+
+# outcomes of pipeline queries in this process: completed, failed, expired, cancelled
+query_stats: Counter = Counter()
+
+class ClientDisconnected(Exception):
+	"""Raised when the client went away before its answer was ready."""
+
+# --- Helper Functions ---
+def parse_timeout(header_value: Optional[str]) -> float:
+	"""
+	Resolves a request's time budget from its timeout header.
+
+	ARGS:
+		header_value: str, the raw header value, or None if the header is absent.
+	RETURNS:
+		timeout: float, seconds, capped at QUERY_MAX_TIMEOUT_SECONDS.
+	RAISES:
+		ValueError: if the value is not a positive number.
+	"""
+	if header_value is None:
+		return QUERY_TIMEOUT_SECONDS
+	timeout = float(header_value)
+	if not timeout > 0:
+		raise ValueError(f"{TIMEOUT_HEADER} must be a positive number of seconds.")
+	return min(timeout, QUERY_MAX_TIMEOUT_SECONDS)
+
+async def wait_for_disconnect(request: Any) -> None:
+	"""
+	Returns once the client of a Starlette request has disconnected.
+	"""
+	while not await request.is_disconnected():
+		await asyncio.sleep(DISCONNECT_POLL_SECONDS)
+
+# --- Main Logic ---
+async def run_with_deadline(request: Any, work: Awaitable, timeout: float) -> Any:
+	"""
+	Awaits the work of a request unless its deadline passes or its client
+	disconnects first. In both cases the work is cancelled, which closes the
+	streaming connection to Ollama and stops the generation there.
+
+	ARGS:
+		request: starlette.requests.Request, the request being served.
+		work: Awaitable, the retrieval and generation to run.
+		timeout: float, seconds until the deadline.
+	RETURNS:
+		result: Any, the result of the work.
+	RAISES:
+		asyncio.TimeoutError: if the deadline passed.
+		ClientDisconnected: if the client disconnected.
+	"""
+	task = asyncio.ensure_future(work)
+	watcher = asyncio.ensure_future(wait_for_disconnect(request))
+	try:
+		done, _ = await asyncio.wait({task, watcher}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+	except asyncio.CancelledError:
+		task.cancel()
+		raise
+	finally:
+		watcher.cancel()
+	if task in done:
+		return task.result()
+
+	task.cancel()
+	try:
+		await task
+	except asyncio.CancelledError:
+		pass
+	except Exception as e:
+		logging.debug(f"Cancelled request work failed while stopping: {e}")
+	if watcher in done and not watcher.cancelled():
+		query_stats["cancelled"] += 1
+		raise ClientDisconnected()
+	query_stats["expired"] += 1
+	raise asyncio.TimeoutError()
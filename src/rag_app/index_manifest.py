@@ -0,0 +1,125 @@
+import os
+import json
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Callable, Dict, Optional
+
+# manifest entries that are paths, stored relative to the manifest's directory
+PATH_ENTRIES = ("db_dir", "chunk_store_dir", "answer_snapshot")
+
+# --- Helper Functions ---
+def read_manifest(filepath: str) -> Optional[Dict]:
+	"""
+	Reads the manifest naming the index version to serve.
+
+	RETURNS:
+		manifest: dict, {"version", "collection", "db_dir", ...} with absolute
+			paths, or None if the file is missing or unreadable.
+	"""
+	if not os.path.exists(filepath):
+		return None
+	try:
+		with open(filepath, 'r') as f:
+			manifest = json.load(f)
+	except (OSError, ValueError) as e:
+		logging.error(f"Could not read index manifest {filepath}: {e}")
+		return None
+	if not manifest.get("version") or not manifest.get("collection"):
+		logging.error(f"Index manifest {filepath} needs a 'version' and a 'collection'.")
+		return None
+	base_dir = os.path.dirname(os.path.abspath(filepath))
+	for key in PATH_ENTRIES:
+		if manifest.get(key):
+			manifest[key] = os.path.join(base_dir, manifest[key])
+	return manifest
+
+def write_manifest(filepath: str, version: str, collection: str, db_dir: Optional[str] = None, **extra) -> Dict:
+	"""
+	Publishes an index version. The manifest is replaced atomically, so a
+	watcher never reads a half-written one.
+
+	ARGS:
+		filepath: str, the manifest file.
+		version: str, a unique name for this index build.
+		collection: str, the collection to serve.
+		db_dir: str, the Chroma directory of an embedded index; None for a Chroma server.
+		extra: optional entries such as 'chunk_store_dir' or 'answer_snapshot'.
+			Paths are stored relative to the manifest, so the index directory can be moved or mounted elsewhere.
+	RETURNS:
+		manifest: dict, what was written.
+	"""
+	manifest = {
+		"version": version,
+		"collection": collection,
+		"db_dir": db_dir,
+		"published_at": datetime.now(timezone.utc).isoformat(),
+		**extra,
+	}
+	base_dir = os.path.dirname(os.path.abspath(filepath))
+	for key in PATH_ENTRIES:
+		if manifest.get(key):
+			manifest[key] = os.path.relpath(os.path.abspath(manifest[key]), base_dir)
+	os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+	tmp_path = filepath + ".tmp"
+	with open(tmp_path, 'w') as f:
+		json.dump(manifest, f, indent=2)
+	os.replace(tmp_path, filepath)
+	logging.info(f"Published index version '{version}' in {filepath}")
+	return manifest
+
+# --- Main Logic ---
+class IndexWatcher:
+	"""
+	Polls the index manifest from a background thread and hands every new
+	version to on_change, which loads and warms it and returns whether it
+	is now being served. A version that fails to load is not retried until
+	the manifest changes again.
+	"""
+
+	def __init__(self, manifest_path: str, interval_seconds: float, on_change: Callable[[Dict], bool], current_version: Optional[str] = None):
+		self.manifest_path = manifest_path
+		self.interval_seconds = interval_seconds
+		self.on_change = on_change
+		self.current_version = current_version
+		self._failed_version: Optional[str] = None
+		self._stop = threading.Event()
+		self._thread: Optional[threading.Thread] = None
+
+	def check(self) -> bool:
+		"""
+		Checks the manifest once.
+
+		RETURNS:
+			swapped: bool, True if a new version is now being served.
+		"""
+		manifest = read_manifest(self.manifest_path)
+		if manifest is None or manifest["version"] in (self.current_version, self._failed_version):
+			return False
+		logging.info(f"Found index version '{manifest['version']}', serving '{self.current_version}'")
+		try:
+			swapped = self.on_change(manifest)
+		except Exception as e:
+			logging.error(f"Could not switch to index version '{manifest['version']}': {e}", exc_info=True)
+			swapped = False
+		if swapped:
+			self.current_version = manifest["version"]
+		else:
+			self._failed_version = manifest["version"]
+		return swapped
+
+	def start(self) -> "IndexWatcher":
+		self._stop.clear()
+		self._thread = threading.Thread(target=self._run, name="index-watcher", daemon=True)
+		self._thread.start()
+		return self
+
+	def stop(self) -> None:
+		self._stop.set()
+		if self._thread is not None:
+			self._thread.join()
+			self._thread = None
+
+	def _run(self) -> None:
+		while not self._stop.wait(self.interval_seconds):
+			self.check()
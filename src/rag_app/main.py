@@ -1,17 +1,39 @@
 import os
+import json
+import time
+import asyncio
 import logging
-from fastapi import FastAPI, HTTPException
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-import chromadb
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from pydantic import BaseModel, Field
+from langchain_core.documents import Document
 from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_chroma import Chroma
 from langchain_ollama import OllamaLLM
 from langchain.prompts import PromptTemplate
 from langchain.chains import RetrievalQA
 
-from src.config import DB_DIR, COLLECTION_NAME, EMBEDDING_MODEL_NAME
+from src.config import (
+	COLLECTION_NAME, CHROMA_MODE, EMBEDDING_MODEL_NAME, CHUNK_STORE_DIR, ANSWER_SNAPSHOT_FILE,
+	RETRIEVER_K, BATCH_QUERY_PARALLELISM, BATCH_QUERY_MAX_QUESTIONS, PREFORK_ENV,
+	RETRIEVE_MAX_K, RETRIEVE_CACHE_SIZE, RETRIEVE_CACHE_TTL_SECONDS,
+	PROFILE_ENABLED, PROFILE_SAMPLE_RATE, PROFILE_INTERVAL_MS, PROFILE_DIR, PROFILE_TOKEN,
+	INDEX_MANIFEST_FILE, INDEX_WATCH_INTERVAL_SECONDS
+)
 from src.rag_app.prompts import QA_PROMPT_TEMPLATE
+from src.rag_app.retriever import CollectionRetriever, source_filter
+from src.rag_app.chroma_client import open_collection, open_async_collection
+from src.rag_app.index_manifest import IndexWatcher, read_manifest
+from src.rag_app.answer_cache import load_snapshot, get_collection_version, normalize_question
+from src.rag_app.result_cache import ResultCache
+from src.rag_app.deadlines import TIMEOUT_HEADER, ClientDisconnected, parse_timeout, run_with_deadline, query_stats
+from src.chunkstore.chunkstore import ChunkStoreCatalog
+from src.profiling.sampler import PROFILE_TOKEN_HEADER, StackSampler, RequestProfilerMiddleware, may_profile, profile_path
 
 # --- Configuration & Setup ---
 logging.basicConfig(
@@ -27,8 +49,59 @@ class QueryResponse(BaseModel):
 	answer: str
 	source_documents: list
 
+class BatchQueryRequest(BaseModel):
+	questions: List[str] = Field(..., min_length=1, max_length=BATCH_QUERY_MAX_QUESTIONS)
+	parallelism: Optional[int] = Field(None, ge=1, le=64)
+	stream: bool = False
+
+class BatchQueryResult(BaseModel):
+	index: int
+	question: str
+	answer: Optional[str] = None
+	source_documents: list = []
+	error: Optional[str] = None
+
+class BatchQueryResponse(BaseModel):
+	results: List[BatchQueryResult]
+
+class RetrieveRequest(BaseModel):
+	question: str
+	k: int = Field(RETRIEVER_K, ge=1, le=RETRIEVE_MAX_K)
+	sources: Optional[List[str]] = Field(None, min_length=1)
+
+class RetrievedChunk(BaseModel):
+	id: str
+	text: str
+	metadata: dict
+	distance: float
+
+class RetrieveResponse(BaseModel):
+	results: List[RetrievedChunk]
+	cached: bool
+
+class ProfileRequest(BaseModel):
+	seconds: float = Field(10.0, gt=0, le=300)
+
 # --- FastAPI Application ---
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+	"""
+	Runs in each worker's event loop once it starts serving: connects the
+	async collection and starts watching for newly published indexes.
+	"""
+	global serving_loop, index_watcher
+	serving_loop = asyncio.get_running_loop()
+	if pipeline is not None:
+		await connect_async_collection(pipeline)
+		if INDEX_WATCH_INTERVAL_SECONDS > 0:
+			index_watcher = IndexWatcher(
+				str(INDEX_MANIFEST_FILE), INDEX_WATCH_INTERVAL_SECONDS, swap_index, pipeline.index_version
+			).start()
+	yield
+	if index_watcher is not None:
+		index_watcher.stop()
+
+app = FastAPI(lifespan=lifespan)
 
 # --- Add CORS middleware ---
 app.add_middleware(
@@ -42,40 +115,181 @@ app.add_middleware(
 		"null"
 	],
 	allow_methods=["GET", "POST"],
-	allow_headers=["Content-Type"]
-	
+	allow_headers=["Content-Type", TIMEOUT_HEADER]
 )
 
+# not installed at all unless profiling is on, so it costs nothing otherwise
+if PROFILE_ENABLED:
+	app.add_middleware(
+		RequestProfilerMiddleware,
+		output_dir=str(PROFILE_DIR),
+		sample_rate=PROFILE_SAMPLE_RATE,
+		interval_seconds=PROFILE_INTERVAL_MS / 1000,
+		admin_token=PROFILE_TOKEN
+	)
+
 # --- RAG Components ---
-try:
-	# initialize db client and get collection
-	logging.info(f"Connecting to vector database as: {DB_DIR}")
-	client = chromadb.PersistentClient(path=str(DB_DIR))
+#define the prompt template
+prompt_template = QA_PROMPT_TEMPLATE
+QA_CHAIN_PROMPT = PromptTemplate(
+	input_variables=["context", "question"],
+	template=prompt_template
+)
+
+# chunk text by id, memory-mapped from the parser's chunk stores
+chunk_catalog = ChunkStoreCatalog(str(CHUNK_STORE_DIR))
+
+class PipelineState:
+	"""
+	Everything that belongs to one version of the index. Requests acquire the
+	current state once and use it to the end, so swapping in a new index never
+	changes the index under a request that is already in flight. A retired
+	state is closed when the last request using it releases it.
+	"""
+
+	def __init__(
+		self,
+		index_version: Optional[str],
+		client: Any,
+		collection: Any,
+		collection_version: str,
+		retriever: CollectionRetriever,
+		qa_chain: Any,
+		answer_snapshot: Dict[str, Dict],
+		chunk_catalog: ChunkStoreCatalog
+	):
+		self.index_version = index_version
+		self.client = client
+		self.collection = collection
+		# keys the answer snapshot and the /retrieve cache to this index's contents
+		self.collection_version = collection_version
+		self.retriever = retriever
+		self.qa_chain = qa_chain
+		self.answer_snapshot = answer_snapshot
+		self.chunk_catalog = chunk_catalog
+		self.users = 0
+		self.retired = False
+		self.closed = False
+		self._lock = threading.Lock()
+
+	def acquire(self) -> bool:
+		"""
+		Registers a request using this state.
+
+		RETURNS:
+			acquired: bool, False if the state was already closed.
+		"""
+		with self._lock:
+			if self.closed:
+				return False
+			self.users += 1
+			return True
+
+	def release(self) -> None:
+		with self._lock:
+			self.users -= 1
+			close = self.retired and self.users == 0 and not self.closed
+			self.closed = self.closed or close
+		if close:
+			self._close_index()
+
+	def retire(self) -> None:
+		"""Closes the state now if no request uses it, else when the last one releases it."""
+		with self._lock:
+			self.retired = True
+			close = self.users == 0 and not self.closed
+			self.closed = self.closed or close
+		if close:
+			self._close_index()
+
+	def close(self) -> None:
+		"""Closes a state that never served a request."""
+		with self._lock:
+			if self.closed:
+				return
+			self.closed = True
+		self._close_index()
+
+	def _close_index(self) -> None:
+		# Chroma clients before 1.1 have no close() and are released when collected
+		close = getattr(self.client, "close", None)
+		if close is not None:
+			close()
+		# the module-level catalog is shared by every state without a published one
+		if self.chunk_catalog is not None and self.chunk_catalog is not chunk_catalog:
+			self.chunk_catalog.close()
+		logging.info(f"Closed index version '{self.index_version}'")
+
+embedding_function = None
+llm = None
+# the state requests are served from; replaced as a whole when a new index is published
+pipeline: Optional[PipelineState] = None
+# /retrieve results by collection version, question, k and source filter
+retrieve_cache = ResultCache(RETRIEVE_CACHE_SIZE, RETRIEVE_CACHE_TTL_SECONDS)
+# the worker's event loop and index watcher, set while it serves
+serving_loop: Optional[asyncio.AbstractEventLoop] = None
+index_watcher: Optional[IndexWatcher] = None
+# held while POST /admin/profile samples the process
+admin_profile_lock = threading.Lock()
+
+def acquire_pipeline() -> Optional[PipelineState]:
+	"""
+	Returns the current state, acquired for one request, or None if the
+	pipeline is not available. The caller must release it.
+	"""
+	while True:
+		state = pipeline
+		# a state retired and closed between reading and acquiring it is skipped
+		if state is None or state.acquire():
+			return state
+
+@contextmanager
+def serving_pipeline() -> Iterator[PipelineState]:
+	"""
+	Holds the current state for the duration of a request.
+	"""
+	state = acquire_pipeline()
+	if state is None:
+		raise HTTPException(status_code=500, detail="RAG pipeline is not available.")
+	try:
+		yield state
+	finally:
+		state.release()
 
-	# initialize the embedding function
+def load_embedding_model() -> None:
+	"""
+	Loads the embedding model. The pre-fork server calls this once in the
+	parent process so all workers share the model weights copy-on-write.
+	"""
+	global embedding_function
 	logging.info(f"Loading embedding model: {EMBEDDING_MODEL_NAME}")
 	embedding_function = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL_NAME)
 
-	# create a LanChain vector store
-	vector_store = Chroma(
-		client=client,
-		collection_name = COLLECTION_NAME,
-		embedding_function=embedding_function
-	)
+def build_pipeline_state(manifest: Optional[Dict] = None) -> PipelineState:
+	"""
+	Opens one version of the index and builds its retriever and QA chain.
 
-	# create retriever from vector store
-	retriever = vector_store.as_retriever(search_kwargs={'k':5})
+	ARGS:
+		manifest: dict, the published index to open (see index_manifest). Without
+			one, COLLECTION_NAME is opened in DB_DIR or on the Chroma server.
+	RETURNS:
+		state: PipelineState, ready to serve.
+	"""
+	manifest = manifest or {}
+	# initialize db client and get collection, in-process or on the Chroma server
+	client, collection = open_collection(manifest.get("collection", COLLECTION_NAME), db_dir=manifest.get("db_dir"))
+	catalog = ChunkStoreCatalog(manifest["chunk_store_dir"]) if manifest.get("chunk_store_dir") else chunk_catalog
 
-	# initialize the llm
-	logging.info("Initializing the Ollama LLM")
-	ollama_base_url = os.getenv("OLLAMA_BASE_URL", "http://ollama-service:11434")
-	llm = OllamaLLM(model='llama3', base_url=ollama_base_url)
+	# answers precomputed offline for this exact collection version
+	collection_version = get_collection_version(collection)
+	answer_snapshot = load_snapshot(manifest.get("answer_snapshot") or str(ANSWER_SNAPSHOT_FILE), collection_version)
 
-	#define the prompt template
-	prompt_template = QA_PROMPT_TEMPLATE
-	QA_CHAIN_PROMPT = PromptTemplate(
-		input_variables=["context", "question"],
-		template=prompt_template
+	# create retriever from the collection
+	retriever = CollectionRetriever(
+		collection=collection,
+		embedding_function=embedding_function,
+		k=RETRIEVER_K,
+		chunk_catalog=catalog
 	)
 
 	# create the RetrievalQA chain
@@ -85,33 +299,335 @@ try:
 		chain_type_kwargs={'prompt': QA_CHAIN_PROMPT},
 		return_source_documents=True
 	)
-	logging.info("RAG pipeline initialized successfully.")
+	return PipelineState(manifest.get("version"), client, collection, collection_version, retriever, qa_chain, answer_snapshot, catalog)
 
-except Exception as e:
-	logging.error(f"Failed to initialize the RAG pipeline: {e}")
-	qa_chain = None
+def connect_pipeline() -> None:
+	"""
+	Initializes the LLM client and opens the published index version, or the
+	default collection if none was published. The ChromaDB client is not
+	fork-safe, so the pre-fork server runs this in each worker after forking.
+	"""
+	global llm, pipeline
+	# initialize the llm
+	logging.info("Initializing the Ollama LLM")
+	ollama_base_url = os.getenv("OLLAMA_BASE_URL", "http://ollama-service:11434")
+	llm = OllamaLLM(model='llama3', base_url=ollama_base_url)
+
+	pipeline = build_pipeline_state(read_manifest(str(INDEX_MANIFEST_FILE)))
+
+def init_pipeline(connect: bool = True) -> None:
+	"""
+	Initializes the RAG pipeline, loading the embedding model if it is not
+	loaded yet. Failures are logged and leave the pipeline unset.
+	"""
+	global pipeline
+	try:
+		if embedding_function is None:
+			load_embedding_model()
+		if connect:
+			connect_pipeline()
+			logging.info("RAG pipeline initialized successfully.")
+	except Exception as e:
+		logging.error(f"Failed to initialize the RAG pipeline: {e}")
+		pipeline = None
+
+# under the pre-fork server each worker connects after forking
+init_pipeline(connect=os.getenv(PREFORK_ENV) != "1")
+
+async def connect_async_collection(state: PipelineState) -> None:
+	"""
+	In 'http' mode, gives the retriever an async collection on this worker's
+	event loop, so /query awaits the Chroma server instead of holding a thread.
+	"""
+	if CHROMA_MODE != "http":
+		return
+	try:
+		state.retriever.async_collection = await open_async_collection(state.collection.name)
+	except Exception as e:
+		logging.error(f"Could not open the async Chroma collection, retrieval stays synchronous: {e}")
+
+def warm_up(state: PipelineState) -> None:
+	"""
+	Runs one retrieval against a freshly opened index, so loading its HNSW
+	index from disk happens before it takes traffic, not on a user's request.
+	"""
+	start = time.perf_counter()
+	state.retriever.retrieve_many(["warm up"], k=1)
+	logging.info(f"Warmed up index version '{state.index_version}' in {time.perf_counter() - start:.2f}s")
+
+def swap_index(manifest: Dict) -> bool:
+	"""
+	Opens and warms the index version of a manifest next to the one being
+	served, then makes it current with a single assignment. Requests in
+	flight finish on the old state, which is closed once the last of them
+	is done. Called by the index watcher thread.
+
+	ARGS:
+		manifest: dict, the newly published index.
+	RETURNS:
+		swapped: bool, True once the new version is being served.
+	"""
+	global pipeline
+	new_state = build_pipeline_state(manifest)
+	try:
+		# an empty collection is a failed build, never something to serve
+		if new_state.collection.count() == 0:
+			raise ValueError(f"Collection '{new_state.collection.name}' of index version '{new_state.index_version}' is empty.")
+		warm_up(new_state)
+		if serving_loop is not None:
+			asyncio.run_coroutine_threadsafe(connect_async_collection(new_state), serving_loop).result()
+	except Exception:
+		new_state.close()
+		raise
+
+	old_state, pipeline = pipeline, new_state
+	# entries of the old version can never be hit again
+	retrieve_cache.clear()
+	logging.info(f"Now serving index version '{new_state.index_version}' ({new_state.collection_version})")
+	if old_state is not None:
+		old_state.retire()
+	return True
+
+# --- Batch Helpers ---
+def retrieve_batch(questions: List[str], state: Optional[PipelineState] = None) -> List[List[Document]]:
+	"""
+	Embeds all questions in one encoder batch and retrieves their context
+	with a single multi-query call to the collection.
+
+	ARGS:
+		questions: list[str], the questions to retrieve context for.
+		state: PipelineState, the index to retrieve from; defaults to the current one.
+	RETURNS:
+		documents: list[list[Document]], the top-k documents per question, in order.
+	"""
+	state = state or pipeline
+	return [[doc for doc, _ in results] for results in state.retriever.retrieve_many(questions)]
+
+def generate_answer(question: str, documents: List[Document]) -> str:
+	"""
+	Runs the same 'stuff' prompt as the RetrievalQA chain for pre-retrieved documents.
+	"""
+	context = "\n\n".join(doc.page_content for doc in documents)
+	return llm.invoke(QA_CHAIN_PROMPT.format(context=context, question=question))
+
+def answer_with_documents(index: int, question: str, documents: List[Document]) -> Dict:
+	"""
+	Generates one answer and packages it as a batch result record. Failures are
+	reported in the record's 'error' field instead of being raised.
+	"""
+	try:
+		answer = generate_answer(question, documents)
+		return {
+			"index": index,
+			"question": question,
+			"answer": answer,
+			"source_documents": [doc.metadata.get('source', 'unknown') for doc in documents]
+		}
+	except Exception as e:
+		logging.error(f"Error answering batch question {index}: {e}", exc_info=True)
+		return {"index": index, "question": question, "error": "Failed to process the query."}
 
 # --- API Endpoints ---
 @app.post("/query", response_model=QueryResponse)
-def query_endpoint(query_request: QueryRequest):
+async def query_endpoint(query_request: QueryRequest, request: Request):
 	"""
 	Receives a question, processes it through the RAG pipeline, and returns the answer.
+	Retrieval and generation are cancelled when the request's deadline passes
+	or its client disconnects.
 	"""
-	if not qa_chain:
-		raise HTTPException(status_code=500, detail="RAG pipeline is not available.")
-	
+	# the whole request is served from this index version
+	with serving_pipeline() as state:
+		return await answer_query(state, query_request, request)
+
+async def answer_query(state: PipelineState, query_request: QueryRequest, request: Request):
+	cached = state.answer_snapshot.get(normalize_question(query_request.question))
+	if cached:
+		logging.info(f"Serving precomputed answer for: {query_request.question}")
+		return {"answer": cached["answer"], "source_documents": cached["source_documents"]}
+
+	try:
+		timeout = parse_timeout(request.headers.get(TIMEOUT_HEADER))
+	except ValueError:
+		raise HTTPException(status_code=400, detail=f"Invalid {TIMEOUT_HEADER} header.")
+
 	try:
 		logging.info(f"Received query: {query_request.question}")
-		result = qa_chain.invoke({"query": query_request.question})
+		result = await run_with_deadline(request, state.qa_chain.ainvoke({"query": query_request.question}), timeout)
+		query_stats["completed"] += 1
 
 		return{
 			"answer": result['result'],
 			"source_documents": [doc.metadata.get('source', 'unknown') for doc in result['source_documents']]
 		}
+	except asyncio.TimeoutError:
+		logging.warning(f"Query exceeded its {timeout}s deadline: {query_request.question}")
+		raise HTTPException(status_code=504, detail="Query deadline exceeded.")
+	except ClientDisconnected:
+		logging.info(f"Client disconnected, cancelled query: {query_request.question}")
+		# nobody reads this response; 499 marks it in the access log
+		return Response(status_code=499)
 	except Exception as e:
+		query_stats["failed"] += 1
 		logging.error(f"Error processing query: {e}", exc_info=True)
 		raise HTTPException(status_code=500, detail="Failed to process the query.")
 	
+@app.post("/query/batch", response_model=BatchQueryResponse)
+def batch_query_endpoint(batch_request: BatchQueryRequest, request: Request):
+	"""
+	Answers many questions at once: one embedding batch, one retrieval call and
+	generations run with bounded parallelism. Results come back in request
+	order, or as NDJSON lines in completion order when 'stream' is set. A
+	stream stops generating once its client disconnects.
+	"""
+	state = acquire_pipeline()
+	if state is None:
+		raise HTTPException(status_code=500, detail="RAG pipeline is not available.")
+	try:
+		response = answer_batch(state, batch_request, request)
+	except BaseException:
+		state.release()
+		raise
+	if isinstance(response, StreamingResponse):
+		# released once the stream is done, also if its client went away
+		response.background = BackgroundTask(state.release)
+	else:
+		state.release()
+	return response
+
+def answer_batch(state: PipelineState, batch_request: BatchQueryRequest, request: Request):
+	questions = batch_request.questions
+	parallelism = batch_request.parallelism or BATCH_QUERY_PARALLELISM
+	logging.info(f"Received batch of {len(questions)} queries (parallelism={parallelism})")
+
+	# precomputed answers are served as-is; only the rest are retrieved and generated
+	cached_results = []
+	misses = []
+	for i, question in enumerate(questions):
+		cached = state.answer_snapshot.get(normalize_question(question))
+		if cached:
+			cached_results.append({"index": i, "question": question, "answer": cached["answer"], "source_documents": cached["source_documents"]})
+		else:
+			misses.append(i)
+	try:
+		documents = retrieve_batch([questions[i] for i in misses], state) if misses else []
+	except Exception as e:
+		logging.error(f"Error retrieving context for batch: {e}", exc_info=True)
+		raise HTTPException(status_code=500, detail="Failed to process the query.")
+
+	if batch_request.stream:
+		async def stream_results():
+			for result in cached_results:
+				yield json.dumps(result) + "\n"
+			executor = ThreadPoolExecutor(max_workers=parallelism)
+			try:
+				futures = [asyncio.wrap_future(executor.submit(answer_with_documents, i, questions[i], docs)) for i, docs in zip(misses, documents)]
+				for future in asyncio.as_completed(futures):
+					result = await future
+					if await request.is_disconnected():
+						logging.info(f"Client disconnected, cancelled {len(misses)}-question batch")
+						return
+					yield json.dumps(result) + "\n"
+			finally:
+				# generations that have not started yet are dropped, running ones are not waited for
+				executor.shutdown(wait=False, cancel_futures=True)
+		return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+	with ThreadPoolExecutor(max_workers=parallelism) as executor:
+		generated = list(executor.map(answer_with_documents, misses, [questions[i] for i in misses], documents))
+	return {"results": sorted(cached_results + generated, key=lambda result: result["index"])}
+
+@app.post("/retrieve", response_model=RetrieveResponse)
+def retrieve_endpoint(retrieve_request: RetrieveRequest):
+	"""
+	Returns the top-k chunks for a question with their metadata and distance,
+	without generating an answer. 'sources' restricts retrieval to chunks whose
+	source URL is in the list. Repeated requests are served from the result cache.
+	"""
+	with serving_pipeline() as state:
+		return retrieve_chunks(state, retrieve_request)
+
+def retrieve_chunks(state: PipelineState, retrieve_request: RetrieveRequest):
+	sources = sorted(set(retrieve_request.sources)) if retrieve_request.sources else None
+	cache_key = (state.collection_version, normalize_question(retrieve_request.question), retrieve_request.k, tuple(sources or ()))
+	cached = retrieve_cache.get(cache_key)
+	if cached is not None:
+		return {"results": cached, "cached": True}
+
+	where = source_filter(sources) if sources else None
+	try:
+		matches = state.retriever.retrieve_many([retrieve_request.question], k=retrieve_request.k, where=where)[0]
+	except Exception as e:
+		logging.error(f"Error retrieving chunks: {e}", exc_info=True)
+		raise HTTPException(status_code=500, detail="Failed to retrieve chunks.")
+
+	results = [
+		{"id": doc.id, "text": doc.page_content, "metadata": doc.metadata, "distance": distance}
+		for doc, distance in matches
+	]
+	retrieve_cache.put(cache_key, results)
+	return {"results": results, "cached": False}
+
+@app.get("/chunks/{chunk_id}")
+def read_chunk(chunk_id: str):
+	"""
+	Returns the text and metadata of a chunk by its vector database id.
+	"""
+	state = acquire_pipeline()
+	try:
+		store, position = (state.chunk_catalog if state else chunk_catalog).lookup(chunk_id)
+		return {"id": chunk_id, "text": store.get(position), "metadata": store.metadata(position)}
+	except KeyError:
+		raise HTTPException(status_code=404, detail=f"Chunk '{chunk_id}' not found.")
+	finally:
+		if state is not None:
+			state.release()
+
+@app.get("/stats")
+def read_stats():
+	"""
+	Returns the index version being served, the outcome counters of /query
+	requests and the /retrieve cache counters of this process.
+	"""
+	state = pipeline
+	return {
+		"index": {
+			"version": state.index_version if state else None,
+			"collection_version": state.collection_version if state else None,
+		},
+		"queries": {outcome: query_stats[outcome] for outcome in ("completed", "failed", "expired", "cancelled")},
+		"retrieve_cache": {"hits": retrieve_cache.hits, "misses": retrieve_cache.misses, "size": len(retrieve_cache)},
+	}
+
+@app.post("/admin/profile")
+async def profile_endpoint(profile_request: ProfileRequest, request: Request):
+	"""
+	Samples the stacks of this worker process for the requested number of
+	seconds while it keeps serving, then writes them as a folded-stack file
+	and returns the hottest stacks. Only available when PROFILE_ENABLED is set,
+	to clients that may_profile allows, and to one caller at a time.
+	"""
+	if not PROFILE_ENABLED:
+		raise HTTPException(status_code=404, detail="Profiling is disabled.")
+	if not may_profile(request.client.host if request.client else None, request.headers.get(PROFILE_TOKEN_HEADER), PROFILE_TOKEN):
+		raise HTTPException(status_code=403, detail="Profiling is only allowed locally or with the profile token.")
+	if not admin_profile_lock.acquire(blocking=False):
+		raise HTTPException(status_code=409, detail="A profile is already being recorded.")
+	try:
+		sampler = StackSampler(PROFILE_INTERVAL_MS / 1000).start()
+		try:
+			await asyncio.sleep(profile_request.seconds)
+		finally:
+			sampler.stop()
+	finally:
+		admin_profile_lock.release()
+	path = sampler.write_folded(profile_path(str(PROFILE_DIR), f"process_{os.getpid()}"))
+	return {
+		"file": path,
+		"samples": sampler.samples,
+		"duration_s": round(sampler.duration_s, 3),
+		"top_stacks": [{"stack": stack, "count": count} for stack, count in sampler.stacks.most_common(10)],
+	}
+
 @app.get("/")
 def read_root():
 	return {"message": "MLOps Q&A Bot is running!"}
\ No newline at end of file
@@ -0,0 +1,50 @@
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+class ResultCache:
+	"""
+	Thread-safe LRU cache whose entries also expire after a fixed time. Keys
+	should include the collection version, so results retrieved from an older
+	index are never served once the index changes.
+	"""
+
+	def __init__(self, maxsize: int, ttl_seconds: float):
+		self.maxsize = maxsize
+		self.ttl_seconds = ttl_seconds
+		self.hits = 0
+		self.misses = 0
+		self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+		self._lock = threading.Lock()
+
+	def get(self, key: Hashable) -> Optional[Any]:
+		"""
+		Returns the cached value, or None if it is missing or expired.
+		"""
+		with self._lock:
+			entry = self._entries.get(key)
+			if entry is None or entry[0] < time.monotonic():
+				if entry is not None:
+					del self._entries[key]
+				self.misses += 1
+				return None
+			self._entries.move_to_end(key)
+			self.hits += 1
+			return entry[1]
+
+	def put(self, key: Hashable, value: Any) -> None:
+		if self.maxsize <= 0:
+			return
+		with self._lock:
+			self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+			self._entries.move_to_end(key)
+			while len(self._entries) > self.maxsize:
+				self._entries.popitem(last=False)
+
+	def clear(self) -> None:
+		with self._lock:
+			self._entries.clear()
+
+	def __len__(self) -> int:
+		return len(self._entries)
@@ -0,0 +1,133 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from src.config import RETRIEVER_K
+
+# Chroma metadata values are scalars, so every page a deduplicated chunk absorbed
+# is also stored as its own '<prefix><url>': True entry that filters can match
+DUPLICATE_SOURCE_PREFIX = "duplicate_source:"
+
+def source_filter(sources: List[str]) -> Dict:
+	"""
+	Builds a Chroma filter for chunks from any of the given page URLs, including
+	chunks that absorbed a duplicate from one of them.
+	"""
+	clauses = [{"source": sources[0]} if len(sources) == 1 else {"source": {"$in": sources}}]
+	clauses += [{DUPLICATE_SOURCE_PREFIX + source: True} for source in sources]
+	return {"$or": clauses}
+
+def public_metadata(metadata: Optional[Dict]) -> Dict:
+	"""Drops the filter-only duplicate source entries from a chunk's metadata."""
+	return {key: value for key, value in (metadata or {}).items() if not key.startswith(DUPLICATE_SOURCE_PREFIX)}
+
+class CollectionRetriever(BaseRetriever):
+	"""
+	Retriever over a raw Chroma collection. Unlike the LangChain Chroma wrapper
+	it answers many questions with one embedding batch and one query call, and
+	it fills in chunk text from the chunk stores when the collection was built
+	without documents. With an async_collection (a Chroma server), async
+	retrieval awaits the server instead of blocking a worker thread.
+	"""
+	collection: Any
+	embedding_function: Any
+	k: int = RETRIEVER_K
+	chunk_catalog: Optional[Any] = None
+	async_collection: Optional[Any] = None
+
+	def search_by_vectors(
+		self,
+		query_embeddings: List[List[float]],
+		k: Optional[int] = None,
+		where: Optional[Dict] = None
+	) -> List[List[Tuple[Document, float]]]:
+		"""
+		Runs one multi-query call and returns (document, distance) pairs per query.
+		"""
+		results = self.collection.query(
+			query_embeddings=query_embeddings,
+			n_results=k or self.k,
+			where=where,
+			include=["documents", "metadatas", "distances"]
+		)
+		return self._to_documents(results)
+
+	async def asearch_by_vectors(
+		self,
+		query_embeddings: List[List[float]],
+		k: Optional[int] = None,
+		where: Optional[Dict] = None
+	) -> List[List[Tuple[Document, float]]]:
+		"""
+		Async search_by_vectors over the async collection.
+		"""
+		results = await self.async_collection.query(
+			query_embeddings=query_embeddings,
+			n_results=k or self.k,
+			where=where,
+			include=["documents", "metadatas", "distances"]
+		)
+		return self._to_documents(results)
+
+	def _to_documents(self, results: Dict) -> List[List[Tuple[Document, float]]]:
+		return [
+			[
+				(Document(page_content=self._chunk_text(chunk_id, text), metadata=public_metadata(metadata), id=chunk_id), distance)
+				for chunk_id, text, metadata, distance in zip(ids, texts, metadatas, distances)
+			]
+			for ids, texts, metadatas, distances in zip(
+				results["ids"], results["documents"], results["metadatas"], results["distances"]
+			)
+		]
+
+	def retrieve_many(
+		self,
+		questions: List[str],
+		k: Optional[int] = None,
+		where: Optional[Dict] = None
+	) -> List[List[Tuple[Document, float]]]:
+		"""
+		Embeds all questions in one encoder batch and retrieves their context together.
+
+		ARGS:
+			questions: list[str], the questions to retrieve context for.
+			k: int, optional number of results per question (defaults to self.k).
+			where: dict, optional Chroma metadata filter.
+		RETURNS:
+			results: list[list[tuple[Document, float]]], (document, distance) pairs per question, in order.
+		"""
+		query_embeddings = self.embedding_function.embed_documents(questions)
+		return self.search_by_vectors(query_embeddings, k, where)
+
+	async def aretrieve_many(
+		self,
+		questions: List[str],
+		k: Optional[int] = None,
+		where: Optional[Dict] = None
+	) -> List[List[Tuple[Document, float]]]:
+		"""
+		Async retrieve_many: the embedding runs in a worker thread, the query
+		awaits the Chroma server if there is an async collection.
+		"""
+		if self.async_collection is None:
+			return await asyncio.to_thread(self.retrieve_many, questions, k, where)
+		query_embeddings = await self.embedding_function.aembed_documents(questions)
+		return await self.asearch_by_vectors(query_embeddings, k, where)
+
+	def _chunk_text(self, chunk_id: str, text: Optional[str]) -> str:
+		if text is not None or self.chunk_catalog is None:
+			return text or ""
+		try:
+			return self.chunk_catalog.get(chunk_id)
+		except KeyError:
+			logging.warning(f"Chunk {chunk_id} is not in the chunk store.")
+			return ""
+
+	def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+		return [doc for doc, _ in self.retrieve_many([query])[0]]
+
+	async def _aget_relevant_documents(self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun) -> List[Document]:
+		return [doc for doc, _ in (await self.aretrieve_many([query]))[0]]
@@ -0,0 +1,213 @@
+import os
+import gc
+import time
+import signal
+import socket
+import logging
+import argparse
+import threading
+from functools import partial
+from typing import Callable, Dict, Tuple
+
+import uvicorn
+
+from src.config import WEB_HOST, WEB_PORT, WEB_WORKERS, PREFORK_ENV
+
+# how often the supervisor checks for exited workers while a restart is pending
+REAP_INTERVAL_SECONDS = 0.5
+
+# --- Helper Functions ---
+def bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+	"""
+	Opens the listening socket in the parent so every worker accepts on it.
+	"""
+	family = socket.AF_INET6 if ":" in host else socket.AF_INET
+	sock = socket.socket(family, socket.SOCK_STREAM)
+	sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+	sock.bind((host, port))
+	sock.listen(backlog)
+	sock.set_inheritable(True)
+	return sock
+
+def serve_worker(worker_id: int, sock: socket.socket, workers: int) -> None:
+	"""
+	Runs one uvicorn server on the shared socket. The embedding model was
+	loaded before the fork; the vector database and LLM client are opened here.
+	"""
+	import torch
+	from src.rag_app import main as rag_app
+
+	# split the cores between workers instead of every worker using all of them
+	torch.set_num_threads(max(1, (os.cpu_count() or 1) // workers))
+	rag_app.init_pipeline()
+	logging.info(f"Worker {worker_id} (pid {os.getpid()}) is serving")
+	uvicorn.Server(uvicorn.Config(rag_app.app)).run(sockets=[sock])
+
+# --- Main Logic ---
+class PreforkSupervisor:
+	"""
+	Forks a fixed number of worker processes, restarts workers that exit
+	unexpectedly and forwards SIGTERM/SIGINT to all workers on shutdown.
+	A worker that keeps crashing soon after it starts (bad config, missing
+	index) is restarted with exponential backoff; after max_crash_restarts
+	such restarts in a row the supervisor shuts down and fails, so the
+	orchestrator sees the failure instead of a pod that never serves.
+	"""
+
+	def __init__(
+		self,
+		target: Callable[[int], None],
+		workers: int,
+		restart_delay: float = 1.0,
+		max_restart_delay: float = 30.0,
+		max_crash_restarts: int = 5,
+		min_uptime: float = 10.0
+	):
+		"""
+		ARGS:
+			target: callable, runs one worker given its worker id.
+			workers: int, the number of worker processes.
+			restart_delay: float, the delay before the first restart of a crashed worker.
+			max_restart_delay: float, the cap of the doubling delay.
+			max_crash_restarts: int, consecutive restarts of a worker that crashed within
+				min_uptime seconds of starting, before giving up.
+			min_uptime: float, a worker running at least this long is considered healthy.
+		"""
+		self.target = target
+		self.workers = workers
+		self.restart_delay = restart_delay
+		self.max_restart_delay = max_restart_delay
+		self.max_crash_restarts = max_crash_restarts
+		self.min_uptime = min_uptime
+		self.children: Dict[int, int] = {}   # pid -> worker id
+		self.started_at: Dict[int, float] = {}   # worker id -> start time
+		self.crashes: Dict[int, int] = {}   # worker id -> consecutive early crashes
+		self.stopping = False
+		# set by stop(); a pending restart waits on it instead of sleeping
+		self._stopped = threading.Event()
+		self.exit_code = 0
+
+	def spawn(self, worker_id: int) -> int:
+		pid = os.fork()
+		if pid == 0:
+			signal.signal(signal.SIGTERM, signal.SIG_DFL)
+			signal.signal(signal.SIGINT, signal.SIG_DFL)
+			exit_code = 0
+			try:
+				self.target(worker_id)
+			except BaseException:
+				logging.exception(f"Worker {worker_id} failed")
+				exit_code = 1
+			finally:
+				os._exit(exit_code)
+		self.children[pid] = worker_id
+		self.started_at[worker_id] = time.monotonic()
+		return pid
+
+	def backoff(self, crashes: int) -> float:
+		"""Returns the delay before restarting a worker after its n-th crash in a row."""
+		return min(self.restart_delay * (2 ** max(0, crashes - 1)), self.max_restart_delay)
+
+	def reap(self, block: bool) -> Tuple[int, int]:
+		"""
+		Collects one exited worker, waiting for it only if block is set.
+
+		RETURNS:
+			(pid, status): the exited worker, or (0, 0) if none has exited.
+		"""
+		try:
+			return os.wait() if block else os.waitpid(-1, os.WNOHANG)
+		except ChildProcessError:
+			return 0, 0
+
+	def handle_exit(self, pid: int, status: int, restarts: Dict[int, float]) -> None:
+		"""
+		Schedules the restart of an exited worker in restarts, or stops the
+		supervisor if the worker is crash-looping.
+		"""
+		worker_id = self.children.pop(pid, None)
+		if worker_id is None or self.stopping:
+			return
+		exit_code = os.waitstatus_to_exitcode(status)
+		if time.monotonic() - self.started_at[worker_id] < self.min_uptime:
+			self.crashes[worker_id] = self.crashes.get(worker_id, 0) + 1
+		else:
+			self.crashes[worker_id] = 1
+		if self.crashes[worker_id] > self.max_crash_restarts:
+			logging.error(
+				f"Worker {worker_id} (pid {pid}) exited with code {exit_code}, crashing within "
+				f"{self.min_uptime:.0f}s of starting {self.crashes[worker_id]} times in a row; shutting down"
+			)
+			self.exit_code = 1
+			self.stop()
+			return
+		delay = self.backoff(self.crashes[worker_id])
+		logging.warning(f"Worker {worker_id} (pid {pid}) exited with code {exit_code}; restarting it in {delay:.1f}s")
+		restarts[worker_id] = time.monotonic() + delay
+
+	def stop(self, signum: int = signal.SIGTERM, frame=None) -> None:
+		"""
+		Stops restarting workers and asks every running worker to shut down.
+		"""
+		self.stopping = True
+		self._stopped.set()
+		for pid in list(self.children):
+			try:
+				os.kill(pid, signal.SIGTERM)
+			except ProcessLookupError:
+				pass
+
+	def run(self) -> int:
+		"""
+		Starts the workers and supervises them until all have exited after stop().
+		Crashed workers wait out their backoff while the others keep being reaped,
+		and a stop() during a backoff takes effect at once.
+
+		RETURNS:
+			exit_code: int, 0 after a requested shutdown, 1 if a worker crash-looped.
+		"""
+		signal.signal(signal.SIGTERM, self.stop)
+		signal.signal(signal.SIGINT, self.stop)
+		for worker_id in range(self.workers):
+			self.spawn(worker_id)
+		restarts: Dict[int, float] = {}   # worker id -> when to restart it
+		while self.children or (restarts and not self._stopped.is_set()):
+			# with a restart pending, poll so its delay does not block reaping or stop()
+			pid, status = self.reap(block=not restarts)
+			if pid:
+				self.handle_exit(pid, status, restarts)
+			elif restarts:
+				due = min(restarts.values())
+				self._stopped.wait(min(max(0.0, due - time.monotonic()), REAP_INTERVAL_SECONDS))
+			else:
+				break
+			for worker_id, due in list(restarts.items()):
+				if self._stopped.is_set():
+					restarts.clear()
+				elif due <= time.monotonic():
+					del restarts[worker_id]
+					self.spawn(worker_id)
+		logging.info("All workers have exited.")
+		return self.exit_code
+
+def parse_args() -> argparse.Namespace:
+	arg_parser = argparse.ArgumentParser(description="Serve the Q&A bot with pre-forked workers sharing one embedding model.")
+	arg_parser.add_argument("--host", default=WEB_HOST)
+	arg_parser.add_argument("--port", type=int, default=WEB_PORT)
+	arg_parser.add_argument("--workers", type=int, default=WEB_WORKERS)
+	return arg_parser.parse_args()
+
+
+if __name__ == "__main__":
+	args = parse_args()
+	# importing the app in the parent loads only the embedding model (see PREFORK_ENV)
+	os.environ[PREFORK_ENV] = "1"
+	from src.rag_app import main as rag_app
+
+	listen_socket = bind_socket(args.host, args.port)
+	# move everything loaded so far out of the collector's reach, so garbage
+	# collection in the workers does not write to (and un-share) those pages
+	gc.collect()
+	gc.freeze()
+	logging.info(f"Starting {args.workers} workers on {args.host}:{args.port}")
+	raise SystemExit(PreforkSupervisor(partial(serve_worker, sock=listen_socket, workers=args.workers), args.workers).run())
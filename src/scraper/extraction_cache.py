@@ -0,0 +1,106 @@
+import os
+import sqlite3
+import logging
+from typing import Dict, List, Optional, Tuple
+import git
+
+from src.scraper.extractors import EXTRACTOR_VERSION
+
+# pending entries are committed once there are this many of them, or this much text
+FLUSH_ENTRIES = 256
+FLUSH_BYTES = 16 * 1024 * 1024
+
+# --- Helper Functions ---
+def list_blob_shas(repo_path: str) -> Dict[str, str]:
+	"""
+	Maps the tracked files of a repository to their git blob SHAs using
+	'git ls-files -s'. Returns an empty map if the path is not a git repository.
+
+	ARGS:
+		repo_path: str, the local path to the cloned repository.
+	RETURNS:
+		blob_shas: dict, repo-relative path -> blob SHA.
+	"""
+	try:
+		output = git.Repo(repo_path).git.ls_files("-s", "-z")
+	except (git.exc.InvalidGitRepositoryError, git.exc.NoSuchPathError, git.exc.GitCommandError) as e: # type: ignore
+		logging.warning(f"Cannot list git blobs of {repo_path}, extraction cache disabled for it: {e}")
+		return {}
+	blob_shas = {}
+	# each entry is '<mode> <sha> <stage>\t<path>'
+	for entry in output.split("\0"):
+		if not entry:
+			continue
+		info, _, path = entry.partition("\t")
+		blob_shas[path] = info.split()[1]
+	return blob_shas
+
+# --- Main Logic ---
+class ExtractionCache:
+	"""
+	SQLite cache of extracted page text keyed by git blob SHA, extractor and
+	extractor version. A blob's content never changes, so unchanged files are
+	never re-extracted. New entries are buffered and written in short
+	transactions of at most flush_entries entries or flush_bytes of text, so
+	the scraper's parallel repo workers don't hold the database write lock
+	while they extract, memory stays bounded on large repos, and a crash
+	loses at most one batch.
+	"""
+
+	def __init__(self, filepath: str, flush_entries: int = FLUSH_ENTRIES, flush_bytes: int = FLUSH_BYTES):
+		os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+		self.filepath = filepath
+		self._connection = sqlite3.connect(filepath, timeout=60)
+		self._connection.execute("PRAGMA journal_mode=WAL")
+		with self._connection:
+			self._connection.execute(
+				"CREATE TABLE IF NOT EXISTS extractions ("
+				"blob_sha TEXT NOT NULL, extractor TEXT NOT NULL, extractor_version TEXT NOT NULL, text TEXT NOT NULL, "
+				"PRIMARY KEY (blob_sha, extractor, extractor_version)) WITHOUT ROWID"
+			)
+			# entries of older extractor versions can never be hit again
+			self._connection.execute("DELETE FROM extractions WHERE extractor_version != ?", (EXTRACTOR_VERSION,))
+		self.flush_entries = flush_entries
+		self.flush_bytes = flush_bytes
+		self._pending: List[Tuple[str, str, str, str]] = []
+		self._pending_bytes = 0
+		self.hits = 0
+		self.misses = 0
+
+	def get(self, blob_sha: str, extractor: str) -> Optional[str]:
+		"""
+		Returns the cached text of a blob, or None (counted as a miss).
+		"""
+		row = self._connection.execute(
+			"SELECT text FROM extractions WHERE blob_sha = ? AND extractor = ? AND extractor_version = ?",
+			(blob_sha, extractor, EXTRACTOR_VERSION)
+		).fetchone()
+		if row is None:
+			self.misses += 1
+			return None
+		self.hits += 1
+		return row[0]
+
+	def put(self, blob_sha: str, extractor: str, text: str) -> None:
+		self._pending.append((blob_sha, extractor, EXTRACTOR_VERSION, text))
+		self._pending_bytes += len(text.encode('utf-8'))
+		if len(self._pending) >= self.flush_entries or self._pending_bytes >= self.flush_bytes:
+			self.flush()
+
+	def flush(self) -> None:
+		if not self._pending:
+			return
+		with self._connection:
+			self._connection.executemany("INSERT OR REPLACE INTO extractions VALUES (?, ?, ?, ?)", self._pending)
+		self._pending = []
+		self._pending_bytes = 0
+
+	def close(self) -> None:
+		self.flush()
+		self._connection.close()
+
+	def __enter__(self) -> "ExtractionCache":
+		return self
+
+	def __exit__(self, exc_type, exc, tb) -> None:
+		self.close()
@@ -0,0 +1,267 @@
+import os
+import re
+import hashlib
+from typing import Callable, List, Set, Tuple
+import trafilatura
+
+def extractor_version(source: bytes) -> str:
+	"""
+	Builds the extraction cache's version from the extractors' source code,
+	so any change to them invalidates cached text without a manual bump.
+	trafilatura upgrades change HTML output, so its version is included.
+	"""
+	return f"{hashlib.sha256(source).hexdigest()[:12]}+trafilatura-{trafilatura.__version__}"
+
+with open(__file__, 'rb') as _source:
+	# part of the extraction cache key
+	EXTRACTOR_VERSION = extractor_version(_source.read())
+
+# --- Markdown / MDX ---
+FRONT_MATTER_PATTERN = re.compile(r"\A(---|\+\+\+)[ \t]*\n.*?\n\1[ \t]*(?:\n|\Z)", re.DOTALL)
+CODE_FENCE_PATTERN = re.compile(r"^ {0,3}(`{3,}|~{3,})")
+HTML_COMMENT_PATTERN = re.compile(r"<!--.*?-->", re.DOTALL)
+MDX_COMMENT_PATTERN = re.compile(r"\{/\*.*?\*/\}", re.DOTALL)
+# HTML and JSX tags; their inner text is kept. Only known HTML elements and
+# closed or self-closing capitalised JSX components are stripped, so generic
+# types in prose like List<String> stay as they are.
+TAG_PATTERN = re.compile(r"<(/?)([A-Za-z][\w.:-]*)(?:\s+[^<>]*?)?(/?)>")
+HTML_ELEMENTS = frozenset("""
+	a abbr address area article aside audio b bdi bdo blockquote body br button canvas caption center
+	cite code col colgroup data datalist dd del details dfn dialog div dl dt em embed fieldset figcaption
+	figure font footer form h1 h2 h3 h4 h5 h6 head header hr html i iframe img input ins kbd label legend
+	li link main mark meta meter nav noscript object ol optgroup option output p picture pre progress q
+	s samp script section select small source span strike strong style sub summary sup svg table tbody
+	td template textarea tfoot th thead time title tr track tt u ul var video wbr
+""".split())
+IMAGE_PATTERN = re.compile(r"!\[([^\]]*)\]\([^)]*\)")
+LINK_PATTERN = re.compile(r"\[([^\]]+)\]\([^)]*\)")
+LINK_DEFINITION_PATTERN = re.compile(r"^ {0,3}\[[^\]]+\]:\s+\S.*$", re.MULTILINE)
+ESM_PATTERN = re.compile(r"^(?:import|export)\s")
+BLANK_LINES_PATTERN = re.compile(r"\n{3,}")
+# inline code spans (`...`, ``...``), kept verbatim like code blocks
+CODE_SPAN_PATTERN = re.compile(r"(?<!`)(`+)(?!`)(.+?)(?<!`)\1(?!`)")
+CODE_SPAN_PLACEHOLDER_PATTERN = re.compile(r"\x00(\d+)\x00")
+INDENTED_CODE_PATTERN = re.compile(r"^(?: {4}|\t)")
+
+# --- reStructuredText ---
+RST_DIRECTIVE_PATTERN = re.compile(r"^\.\.\s+(\|[^|]+\|\s+)?([\w:-]+)::(.*)$")
+RST_EXPLICIT_MARKUP_PATTERN = re.compile(r"^\.\.(?:\s|$)")
+RST_OPTION_PATTERN = re.compile(r"^:[\w -]+:(?:\s|$)")
+RST_ADORNMENT_PATTERN = re.compile(r"^([=\-~^\"'`#*+:.!$%&,;<>?@_|/\\])\1{2,}\s*$")
+RST_ROLE_PATTERN = re.compile(r":[\w:+-]+:`([^`<]*?)\s*(?:<[^>`]*>)?`")
+RST_LINK_PATTERN = re.compile(r"`([^`<]+?)\s*<[^>`]+>`__?")
+RST_REFERENCE_PATTERN = re.compile(r"`([^`]+)`__?")
+RST_LITERAL_PATTERN = re.compile(r"``([^`]+)``")
+# directives whose body is code, emitted verbatim without their language argument
+RST_CODE_DIRECTIVES = {"code", "code-block", "sourcecode", "doctest", "testcode", "ipython", "math"}
+# directives without prose worth embedding
+RST_SKIPPED_DIRECTIVES = {
+	"image", "figure", "toctree", "include", "literalinclude", "raw", "contents", "meta", "highlight",
+	"index", "automodule", "autoclass", "autofunction", "automethod", "autodata", "autosummary",
+	"currentmodule", "module", "sectionauthor", "raw-html", "mermaid", "graphviz",
+}
+
+# --- Helper Functions ---
+def _collapse_blank_lines(text: str) -> str:
+	lines = [line.rstrip() for line in text.split("\n")]
+	return BLANK_LINES_PATTERN.sub("\n\n", "\n".join(lines)).strip()
+
+def _strip_esm(prose: str) -> str:
+	"""
+	Drops MDX import/export statements, including exports spanning several lines.
+	"""
+	kept = []
+	depth = 0
+	for line in prose.split("\n"):
+		if depth > 0 or ESM_PATTERN.match(line):
+			depth = max(0, depth + line.count("{") + line.count("[") - line.count("}") - line.count("]"))
+			continue
+		kept.append(line)
+	return "\n".join(kept)
+
+def _clean_markdown_prose(prose: str, mdx: bool, tag_names: Tuple[Set[str], Set[str]]) -> str:
+	# set code spans aside so placeholders like `<name>` are not taken for tags
+	code_spans: List[str] = []
+	def protect(match: re.Match) -> str:
+		code_spans.append(match.group(0))
+		return f"\x00{len(code_spans) - 1}\x00"
+	prose = CODE_SPAN_PATTERN.sub(protect, prose)
+
+	prose = HTML_COMMENT_PATTERN.sub("", prose)
+	if mdx:
+		prose = MDX_COMMENT_PATTERN.sub("", prose)
+		prose = _strip_esm(prose)
+	prose = _strip_tags(prose, tag_names)
+	prose = IMAGE_PATTERN.sub(r"\1", prose)
+	prose = LINK_PATTERN.sub(r"\1", prose)
+	prose = LINK_DEFINITION_PATTERN.sub("", prose)
+	return CODE_SPAN_PLACEHOLDER_PATTERN.sub(lambda m: code_spans[int(m.group(1))], prose)
+
+def _tag_names(prose_parts: List[str]) -> Tuple[Set[str], Set[str]]:
+	# the names of the opening and closing tags of a page, outside code, so a
+	# component opened before a code block is matched by its close after it
+	opened, closed = set(), set()
+	for prose in prose_parts:
+		for match in TAG_PATTERN.finditer(CODE_SPAN_PATTERN.sub("", prose)):
+			(closed if match.group(1) else opened).add(match.group(2))
+	return opened, closed
+
+def _strip_tags(prose: str, tag_names: Tuple[Set[str], Set[str]]) -> str:
+	opened, closed = tag_names
+	def strip(match: re.Match) -> str:
+		closing, name, self_closing = match.groups()
+		if name.lower() in HTML_ELEMENTS:
+			return ""
+		if name[0].isupper() and (self_closing or name in (opened if closing else closed)):
+			return ""
+		return match.group(0)
+	return TAG_PATTERN.sub(strip, prose)
+
+def _clean_rst_inline(line: str) -> str:
+	# roles, references and literals all need a backtick; most lines have none
+	if "`" in line:
+		line = _clean_rst_markup(line)
+	# 'Example::' introduces a literal block; the marker itself is not content
+	if line.endswith("::"):
+		line = line[:-2].rstrip() + (":" if not line[:-2].endswith(" ") else "")
+	return line
+
+def _clean_rst_markup(line: str) -> str:
+	line = RST_ROLE_PATTERN.sub(lambda m: m.group(1).lstrip("~!"), line)
+	line = RST_LINK_PATTERN.sub(r"\1", line)
+	line = RST_LITERAL_PATTERN.sub(r"\1", line)
+	return RST_REFERENCE_PATTERN.sub(r"\1", line)
+
+def _indented_block(lines: List[str], start: int) -> int:
+	"""
+	Returns the index of the first line after the indented block starting at 'start'.
+	"""
+	end = start
+	while end < len(lines) and (not lines[end].strip() or lines[end][:1].isspace()):
+		end += 1
+	# trailing blank lines belong to the surrounding text
+	while end > start and not lines[end - 1].strip():
+		end -= 1
+	return end
+
+def _dedent(lines: List[str]) -> List[str]:
+	indents = [len(line) - len(line.lstrip()) for line in lines if line.strip()]
+	width = min(indents) if indents else 0
+	return [line[width:] for line in lines]
+
+def _extract_rst_lines(lines: List[str]) -> List[str]:
+	output = []
+	i = 0
+	while i < len(lines):
+		line = lines[i]
+		if RST_ADORNMENT_PATTERN.match(line):
+			i += 1
+			continue
+		directive = RST_DIRECTIVE_PATTERN.match(line)
+		if directive or RST_EXPLICIT_MARKUP_PATTERN.match(line):
+			end = _indented_block(lines, i + 1)
+			body = _dedent(lines[i + 1:end])
+			i = end
+			# comments, link targets and substitution definitions carry no content
+			if not directive or directive.group(1) or directive.group(2) in RST_SKIPPED_DIRECTIVES:
+				continue
+			while body and RST_OPTION_PATTERN.match(body[0]):
+				body.pop(0)
+			name, argument = directive.group(2), directive.group(3).strip()
+			if name in RST_CODE_DIRECTIVES:
+				output.extend(body)
+			else:
+				if argument:
+					output.append(_clean_rst_inline(argument))
+				output.extend(_extract_rst_lines(body))
+			output.append("")
+			continue
+		output.append(_clean_rst_inline(line))
+		i += 1
+		# a paragraph ending in '::' is followed by a literal block
+		if line.rstrip().endswith("::"):
+			start = i
+			while start < len(lines) and not lines[start].strip():
+				start += 1
+			if start < len(lines) and lines[start][:1].isspace():
+				end = _indented_block(lines, start)
+				output.extend(lines[i:end])
+				i = end
+	return output
+
+# --- Main Logic ---
+def extract_markdown(content: str, mdx: bool = False) -> str:
+	"""
+	Extracts the text of a Markdown page: front matter, HTML comments, tags
+	and link targets are removed while code blocks (fenced or indented) and
+	inline code spans are kept verbatim.
+	With mdx=True, import/export statements and {/* */} comments are removed too.
+	"""
+	content = FRONT_MATTER_PATTERN.sub("", content.lstrip("\ufeff"))
+	# (is_prose, text) pairs; prose is cleaned once the whole page has been read
+	parts: List[Tuple[bool, str]] = []
+	prose: List[str] = []
+	fence = None
+	indented = False
+	for line in content.split("\n"):
+		marker = CODE_FENCE_PATTERN.match(line)
+		# an indented code block starts after a blank line and runs until a non-blank, unindented line
+		if fence is None and (indented or not prose or not prose[-1].strip()) and INDENTED_CODE_PATTERN.match(line) and line.strip():
+			if not indented:
+				parts.append((True, "\n".join(prose)))
+				prose = []
+				indented = True
+			parts.append((False, line))
+			continue
+		if indented and not line.strip():
+			parts.append((False, line))
+			continue
+		indented = False
+		if fence is None and marker:
+			parts.append((True, "\n".join(prose)))
+			prose = []
+			fence = marker.group(1)
+			parts.append((False, line))
+		elif fence is not None:
+			parts.append((False, line))
+			if marker and marker.group(1)[0] == fence[0] and len(marker.group(1)) >= len(fence) and not line.strip().strip(fence[0]):
+				fence = None
+		else:
+			prose.append(line)
+	parts.append((True, "\n".join(prose)))
+	tag_names = _tag_names([text for is_prose, text in parts if is_prose])
+	return _collapse_blank_lines("\n".join(
+		_clean_markdown_prose(text, mdx, tag_names) if is_prose else text for is_prose, text in parts
+	))
+
+def extract_mdx(content: str) -> str:
+	return extract_markdown(content, mdx=True)
+
+def extract_rst(content: str) -> str:
+	"""
+	Extracts the text of a reStructuredText page: section adornments, comments,
+	link targets and non-prose directives are removed, admonition and other
+	directive bodies are kept, code blocks are kept verbatim and roles and
+	references are reduced to their text.
+	"""
+	lines = content.lstrip("\ufeff").expandtabs(8).split("\n")
+	return _collapse_blank_lines("\n".join(_extract_rst_lines(lines)))
+
+def extract_html(content: str) -> str:
+	"""
+	Extracts the main text of an HTML page with trafilatura's boilerplate removal.
+	"""
+	return trafilatura.extract(content, include_comments=False, include_tables=False) or ''
+
+EXTRACTORS = {
+	".md": extract_markdown,
+	".mdx": extract_mdx,
+	".rst": extract_rst,
+	".html": extract_html,
+}
+
+def get_extractor(filepath: str) -> Callable[[str], str]:
+	"""
+	Picks the extractor for a file by its extension; unknown formats go through trafilatura.
+	"""
+	return EXTRACTORS.get(os.path.splitext(filepath)[1].lower(), extract_html)
@@ -1,11 +1,13 @@
 import os
 import git
-import trafilatura
 from urllib.parse import urlparse
 import logging
 import re
-from typing import Annotated
-from src.config import SCRAPED_DATA_DIR, CLONED_REPOS_DIR
+from typing import Annotated, Optional
+from src.config import SCRAPED_DATA_DIR, CLONED_REPOS_DIR, EXTRACTION_CACHE_ENABLED, EXTRACTION_CACHE_FILE
+from src.profiling import profiler
+from src.scraper.extractors import get_extractor
+from src.scraper.extraction_cache import ExtractionCache, list_blob_shas
 
 # --- Helper Functions ---
 
@@ -49,18 +51,36 @@ def is_doc_file(filepath: str) -> bool:
 
 def extract_text_from_file(filepath: str) ->str:
 	"""
-	Extracts text from a single file using trafilatura.
+	Extracts text from a single file with the extractor for its format.
+	Markdown, MDX and reStructuredText are handled by lightweight markup
+	extractors; HTML goes through trafilatura.
 	"""
 	try:
 		with open(filepath, 'r') as f:
 			content = f.read()
-		# use trafilatura to extract the main text from the file's content
-		text = trafilatura.extract(content, include_comments=False, include_tables=False)
+		profiler.count(files_in=1, bytes_in=len(content.encode('utf-8')))
+		text = get_extractor(filepath)(content)
 		return text or ''
 	except Exception as e:
 		logging.error(f"Error extracting text from {filepath}: {e}")
 		return ''
 
+def extract_with_cache(filepath: str, blob_sha: Optional[str], cache: Optional[ExtractionCache]) -> str:
+	"""
+	Returns the cached text of an unchanged file, or extracts it and caches
+	the result. Files without a blob SHA (untracked) are always extracted.
+	Empty results are not cached, since they may come from a read error.
+	"""
+	if cache is None or blob_sha is None:
+		return extract_text_from_file(filepath)
+	extractor = get_extractor(filepath).__name__
+	text = cache.get(blob_sha, extractor)
+	if text is None:
+		text = extract_text_from_file(filepath)
+		if text:
+			cache.put(blob_sha, extractor, text)
+	return text
+
 def process_cloned_repo(repo_path: str, base_url: str, output_file: str) -> None:
 	"""
 	Processed a cloned repository, extracts text from documentation files,
@@ -76,21 +96,36 @@ def process_cloned_repo(repo_path: str, base_url: str, output_file: str) -> None
 	with open(output_file, 'w') as f:
 		f.write(f"--- Scraped content from {base_url} ---\n")
 
-	for root, _, files in os.walk(repo_path):
-		for file in files:
-			if is_doc_file(file):
-				file_path = os.path.join(root, file)
-				# exclude .git from processing
-				if ".git" in file_path:
-					continue
-				logging.info(f"\tProcessing: {file_path}")
-				text = extract_text_from_file(file_path)
-				if text:
-					with open(output_file, 'a') as f:
-						relative_path = os.path.relpath(file_path, repo_path)
-						original_repo_url = get_base_repo_url(base_url)
-						f.write(f"\n\n--- Page: {original_repo_url}/blob/main/{relative_path} ---\n\n")
-						f.write(text)
+	# unchanged files are looked up by their git blob SHA instead of being re-extracted
+	blob_shas = list_blob_shas(repo_path) if EXTRACTION_CACHE_ENABLED else {}
+	cache = ExtractionCache(str(EXTRACTION_CACHE_FILE)) if blob_shas else None
+	try:
+		for root, _, files in os.walk(repo_path):
+			for file in files:
+				if is_doc_file(file):
+					file_path = os.path.join(root, file)
+					# exclude .git from processing
+					if ".git" in file_path:
+						continue
+					logging.info(f"\tProcessing: {file_path}")
+					relative_path = os.path.relpath(file_path, repo_path)
+					with profiler.stage("scraper:extract", per_thread=True):
+						text = extract_with_cache(file_path, blob_shas.get(relative_path), cache)
+					if text:
+						profiler.count(pages_out=1, bytes_out=len(text.encode('utf-8')))
+						with open(output_file, 'a') as f:
+							original_repo_url = get_base_repo_url(base_url)
+							f.write(f"\n\n--- Page: {original_repo_url}/blob/main/{relative_path} ---\n\n")
+							f.write(text)
+	finally:
+		if cache is not None:
+			cache.close()
+			lookups = cache.hits + cache.misses
+			profiler.count(cache_hits=cache.hits, cache_misses=cache.misses)
+			logging.info(
+				f"Extraction cache for {base_url}: {cache.hits} hits, {cache.misses} misses "
+				f"({round(100 * cache.hits / lookups, 1) if lookups else 0.0}% hit rate)"
+			)
 	
 	logging.info(f"Finished processing repository for {base_url}.")
 
@@ -112,13 +147,14 @@ def scrape_single_repo(repo_url: str) -> Annotated[str, "scraped_file_path"]:
 	clone_path = os.path.join(CLONED_REPOS_DIR, repo_name_for_dir)
 
 	try:
-		if not os.path.exists(clone_path):
-			logging.info(f"Cloning {clone_url} into {clone_path}")
-			git.Repo.clone_from(clone_url, clone_path)
-		else:
-			logging.info(f"Repository {repo_name_for_dir} already cloned. Pulling latest changes.")
-			repo = git.Repo(clone_path)
-			repo.remotes.origin.pull()
+		with profiler.stage("scraper:git", per_thread=True):
+			if not os.path.exists(clone_path):
+				logging.info(f"Cloning {clone_url} into {clone_path}")
+				git.Repo.clone_from(clone_url, clone_path)
+			else:
+				logging.info(f"Repository {repo_name_for_dir} already cloned. Pulling latest changes.")
+				repo = git.Repo(clone_path)
+				repo.remotes.origin.pull()
 	except git.exc.GitCommandError as e: # type: ignore
 		logging.error(f"Error cloning or pulling repository {repo_url}: e")
 		return ""
@@ -0,0 +1,144 @@
+import os
+import json
+import hashlib
+import logging
+from typing import Dict, Optional, Set
+
+# --- Helper Functions ---
+def fingerprint_inputs(processed_data_dir: str) -> Dict[str, list]:
+	"""
+	Identifies the contents of the processed data directory by the size and
+	modification time of its files. A resumed run must see the same inputs.
+	"""
+	if not os.path.isdir(processed_data_dir):
+		return {}
+	return {
+		entry.name: [entry.stat().st_size, entry.stat().st_mtime_ns]
+		for entry in sorted(os.scandir(processed_data_dir), key=lambda e: e.name)
+		if entry.is_file()
+	}
+
+def run_header(processed_data_dir: str, **settings) -> Dict:
+	"""
+	Describes a vectorization run: where its inputs are, what they look like,
+	and the settings that decide which ids and vectors it writes.
+	"""
+	return {
+		"processed_data_dir": os.path.abspath(processed_data_dir),
+		**settings,
+		"inputs": fingerprint_inputs(processed_data_dir),
+	}
+
+def run_version(header: Dict) -> str:
+	"""
+	Names the contents a run writes: runs over the same inputs with the same
+	settings, such as a run and its resumption, share a version.
+	"""
+	return hashlib.sha256(json.dumps(header, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+def _read_records(filepath: str) -> list:
+	records = []
+	with open(filepath, 'r') as f:
+		for line in f:
+			try:
+				records.append(json.loads(line))
+			except ValueError:
+				# a crash can leave the last line half-written
+				logging.warning(f"Ignoring a truncated record at the end of {filepath}")
+				break
+	return records
+
+def unfinished_run(filepath: str) -> Optional[Dict]:
+	"""
+	Returns the header of the journaled run if it was interrupted, else None.
+	"""
+	if not os.path.exists(filepath):
+		return None
+	records = _read_records(filepath)
+	if not records or records[0].get("type") != "run" or records[-1].get("type") == "complete":
+		return None
+	return records[0]
+
+# --- Main Logic ---
+class VectorizeJournal:
+	"""
+	Append-only progress journal of a vectorization run. Every line is one
+	JSON record, flushed and fsynced before the run moves on:
+	  {"type": "run", ...}            the run's settings and input fingerprint
+	  {"type": "batch", file, batch}  a batch of a file is in the collection
+	  {"type": "file", file, chunks}  every batch of a file is in the collection
+	  {"type": "complete"}            the run finished
+	"""
+
+	def __init__(self, filepath: str):
+		self.filepath = filepath
+		self.completed_files: Set[str] = set()
+		self.completed_batches: Dict[str, Set[int]] = {}
+		self._file = None
+
+	def open(self, header: Dict, resume: bool = False) -> bool:
+		"""
+		Continues the journaled run if resume is set and it was interrupted
+		with the same header, otherwise starts a new journal.
+
+		ARGS:
+			header: dict, the run's settings and input fingerprint.
+			resume: bool, whether to continue an earlier run.
+		RETURNS:
+			resumed: bool, True if progress of an earlier run was loaded.
+		"""
+		header = {"type": "run", **header}
+		resumed = False
+		if resume and os.path.exists(self.filepath):
+			records = _read_records(self.filepath)
+			if records and records[-1].get("type") == "complete":
+				logging.info(f"The journaled run in {self.filepath} finished; starting a new run.")
+			elif records and records[0] == header:
+				for record in records[1:]:
+					if record["type"] == "batch":
+						self.completed_batches.setdefault(record["file"], set()).add(record["batch"])
+					elif record["type"] == "file":
+						self.completed_files.add(record["file"])
+				resumed = True
+				logging.info(
+					f"Resuming vectorization from {self.filepath}: {len(self.completed_files)} files and "
+					f"{sum(len(b) for b in self.completed_batches.values())} batches are already stored."
+				)
+			else:
+				logging.warning(f"The journaled run in {self.filepath} used other settings or inputs; starting over.")
+
+		os.makedirs(os.path.dirname(self.filepath) or ".", exist_ok=True)
+		if resumed:
+			# rewrite without a possibly truncated last line before appending
+			with open(self.filepath + ".tmp", 'w') as f:
+				f.writelines(json.dumps(record) + "\n" for record in records)
+			os.replace(self.filepath + ".tmp", self.filepath)
+			self._file = open(self.filepath, 'a')
+		else:
+			self._file = open(self.filepath, 'w')
+			self._append(header)
+		return resumed
+
+	def _append(self, record: Dict) -> None:
+		self._file.write(json.dumps(record) + "\n")
+		self._file.flush()
+		os.fsync(self._file.fileno())
+
+	def is_batch_done(self, file_key: str, batch: int) -> bool:
+		return batch in self.completed_batches.get(file_key, ())
+
+	def record_batch(self, file_key: str, batch: int, count: int) -> None:
+		self.completed_batches.setdefault(file_key, set()).add(batch)
+		self._append({"type": "batch", "file": file_key, "batch": batch, "count": count})
+
+	def record_file(self, file_key: str, chunks: int) -> None:
+		self.completed_files.add(file_key)
+		self._append({"type": "file", "file": file_key, "chunks": chunks})
+
+	def record_complete(self) -> None:
+		self._append({"type": "complete"})
+
+	def close(self) -> None:
+		if self._file is not None:
+			self._file.close()
+			self._file = None
@@ -0,0 +1,163 @@
+import json
+import logging
+from typing import Dict, Iterator, Optional
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import chromadb
+
+from src.config import DB_DIR, COLLECTION_NAME, EMBEDDING_MODEL_NAME, VECTORIZE_BATCH_SIZE
+from src.vectorizer.vectorizer import hnsw_metadata
+
+# key of the export's own description in the Parquet file metadata
+EXPORT_METADATA_KEY = b"mlops_qa_bot.export"
+# format of the exported file; bump when the columns change
+EXPORT_FORMAT_VERSION = 1
+
+# --- Helper Functions ---
+def export_schema(dimension: int) -> pa.Schema:
+	"""
+	Columns of an embedding export. Chunk metadata keys differ between chunks,
+	so each row's metadata is kept as one JSON string instead of a column per key.
+	"""
+	return pa.schema([
+		pa.field("id", pa.string(), nullable=False),
+		pa.field("document", pa.string()),
+		pa.field("metadata", pa.string()),
+		pa.field("embedding", pa.list_(pa.float32(), dimension), nullable=False),
+	])
+
+def _to_record_batch(page: Dict, schema: pa.Schema) -> pa.RecordBatch:
+	embeddings = np.asarray(page["embeddings"], dtype=np.float32)
+	documents = page.get("documents") or [None] * len(page["ids"])
+	metadatas = page.get("metadatas") or [None] * len(page["ids"])
+	return pa.RecordBatch.from_arrays([
+		pa.array(page["ids"], pa.string()),
+		pa.array(documents, pa.string()),
+		pa.array([json.dumps(m) if m is not None else None for m in metadatas], pa.string()),
+		pa.FixedSizeListArray.from_arrays(pa.array(embeddings.ravel(), pa.float32()), embeddings.shape[1]),
+	], schema=schema)
+
+def read_export_metadata(input_path: str) -> Dict:
+	"""
+	Returns what an export was made from: collection, embedding model, HNSW
+	metadata, row count and embedding dimension.
+	"""
+	metadata = pq.read_schema(input_path).metadata or {}
+	if EXPORT_METADATA_KEY not in metadata:
+		raise ValueError(f"{input_path} is not an embedding export.")
+	return json.loads(metadata[EXPORT_METADATA_KEY])
+
+def iter_export_batches(input_path: str, batch_size: int) -> Iterator[Dict]:
+	"""
+	Streams an export in batches of Chroma-ready columns, with the embeddings
+	as one float32 matrix per batch.
+	"""
+	for record_batch in pq.ParquetFile(input_path).iter_batches(batch_size=batch_size):
+		embedding_column = record_batch.column("embedding")
+		yield {
+			"ids": record_batch.column("id").to_pylist(),
+			"documents": record_batch.column("document").to_pylist(),
+			"metadatas": [json.loads(m) if m is not None else None for m in record_batch.column("metadata").to_pylist()],
+			# fixed-size lists flatten into one contiguous buffer, so this is a reshape, not a copy per row
+			"embeddings": embedding_column.flatten().to_numpy(zero_copy_only=False).reshape(len(record_batch), embedding_column.type.list_size),
+		}
+
+# --- Main Logic ---
+def export_collection(
+	output_path: str,
+	db_dir: str = str(DB_DIR),
+	collection_name: str = COLLECTION_NAME,
+	batch_size: int = VECTORIZE_BATCH_SIZE
+) -> Dict:
+	"""
+	Writes the ids, documents, metadata and embeddings of a collection to a
+	Parquet file, one row group per page read from Chroma.
+
+	ARGS:
+		output_path: str, the Parquet file to write.
+		db_dir: str, the Chroma directory to read.
+		collection_name: str, the collection to export.
+		batch_size: int, rows read from Chroma and written per row group.
+	RETURNS:
+		export_metadata: dict, the description stored with the file.
+	"""
+	collection = chromadb.PersistentClient(path=db_dir).get_collection(collection_name)
+	total = collection.count()
+	writer = None
+	exported = 0
+	try:
+		for offset in range(0, total, batch_size):
+			page = collection.get(include=["embeddings", "documents", "metadatas"], limit=batch_size, offset=offset)
+			if not page["ids"]:
+				break
+			if writer is None:
+				dimension = len(page["embeddings"][0])
+				export_metadata = {
+					"format_version": EXPORT_FORMAT_VERSION,
+					"collection": collection_name,
+					"embedding_model": EMBEDDING_MODEL_NAME,
+					"collection_metadata": collection.metadata or {},
+					"count": total,
+					"dimension": dimension,
+				}
+				schema = export_schema(dimension).with_metadata({EXPORT_METADATA_KEY: json.dumps(export_metadata)})
+				writer = pq.ParquetWriter(output_path, schema, compression="zstd")
+			writer.write_batch(_to_record_batch(page, schema))
+			exported += len(page["ids"])
+			logging.info(f"Exported {exported} of {total} embeddings")
+	finally:
+		if writer is not None:
+			writer.close()
+	if writer is None:
+		raise ValueError(f"Collection '{collection_name}' is empty; nothing to export.")
+	return export_metadata
+
+def import_collection(
+	input_path: str,
+	db_dir: str = str(DB_DIR),
+	collection_name: Optional[str] = None,
+	batch_size: int = VECTORIZE_BATCH_SIZE,
+	replace: bool = False
+) -> int:
+	"""
+	Rebuilds a collection from an export without running the embedding model.
+	The collection is created with the HNSW parameters configured now, not the
+	ones of the exported collection, so an import is also how the index is
+	rebuilt with new parameters or on a new Chroma version.
+
+	ARGS:
+		input_path: str, the Parquet file written by export_collection.
+		db_dir: str, the Chroma directory to write.
+		collection_name: str, the collection to create; defaults to the exported one.
+		batch_size: int, rows upserted per call, capped at Chroma's maximum batch size.
+		replace: bool, delete an existing collection of that name first.
+	RETURNS:
+		imported: int, the number of rows written.
+	"""
+	export_metadata = read_export_metadata(input_path)
+	collection_name = collection_name or export_metadata["collection"]
+	if export_metadata["embedding_model"] != EMBEDDING_MODEL_NAME:
+		logging.warning(
+			f"The export was embedded with {export_metadata['embedding_model']} but the app embeds questions with "
+			f"{EMBEDDING_MODEL_NAME}; retrieval will not work until they match."
+		)
+
+	client = chromadb.PersistentClient(path=db_dir)
+	if replace and collection_name in [c.name for c in client.list_collections()]:
+		client.delete_collection(collection_name)
+	# fails if the collection exists, rather than mixing two corpora
+	collection = client.create_collection(name=collection_name, metadata=hnsw_metadata())
+
+	imported = 0
+	for batch in iter_export_batches(input_path, min(batch_size, client.get_max_batch_size())):
+		collection.add(
+			ids=batch["ids"],
+			embeddings=batch["embeddings"],
+			documents=batch["documents"] if any(d is not None for d in batch["documents"]) else None,
+			# Chroma takes None for a row without metadata but rejects an empty dict
+			metadatas=[metadata or None for metadata in batch["metadatas"]]
+		)
+		imported += len(batch["ids"])
+		logging.info(f"Imported {imported} of {export_metadata['count']} embeddings into '{collection_name}'")
+	return imported
@@ -1,9 +1,18 @@
 import os
+import json
 import logging
 import chromadb
 from sentence_transformers import SentenceTransformer
-from typing import List
-from src.config import EMBEDDING_MODEL_NAME, DB_DIR, COLLECTION_NAME
+from typing import Dict, Iterable, Iterator, List, Tuple
+from src.config import (
+	EMBEDDING_MODEL_NAME, DB_DIR, COLLECTION_NAME, CHROMA_STORE_DOCUMENTS, VECTORIZE_BATCH_SIZE,
+	HNSW_SPACE, HNSW_M, HNSW_CONSTRUCTION_EF, HNSW_SEARCH_EF, HNSW_NUM_THREADS, VECTORIZE_JOURNAL_FILE
+)
+from src.profiling import profiler
+from src.chunkstore.chunkstore import ChunkStore, DATA_SUFFIX, INDEX_SUFFIX, META_SUFFIX
+from src.vectorizer.journal import VectorizeJournal, run_header, run_version
+from src.rag_app.answer_cache import CONTENT_VERSION_KEY
+from src.rag_app.retriever import DUPLICATE_SOURCE_PREFIX
 
 def read_chunks_from_file(filepath: str) -> List[str]:
 	"""
@@ -15,60 +24,241 @@ def read_chunks_from_file(filepath: str) -> List[str]:
 	chunks = content.split("\n---CHUNK---\n")
 	return [stripped for chunk in chunks if (stripped := chunk.strip())]
 
-def vectorize_and_store(processed_data_dir: str):
+def read_chunk_records_from_file(filepath: str) -> List[Tuple[str, Dict[str, str]]]:
+	"""
+	Reads processed chunks and their metadata from a JSON Lines file written by
+	the streaming parser.
+	"""
+	records = []
+	with open(filepath, 'r') as f:
+		for line in f:
+			if line.strip():
+				record = json.loads(line)
+				text = record.pop("text").strip()
+				if text:
+					records.append((text, record))
+	return records
+
+def iter_batches(items: Iterable, batch_size: int) -> Iterator[List]:
+	"""
+	Groups a stream of items into lists of at most batch_size.
+	"""
+	batch = []
+	for item in items:
+		batch.append(item)
+		if len(batch) == batch_size:
+			yield batch
+			batch = []
+	if batch:
+		yield batch
+
+def to_chroma_metadata(metadata: Dict) -> Dict:
+	"""
+	Chroma metadata values must be scalars, so lists (e.g. the page URLs a
+	deduplicated chunk absorbed) are stored newline-separated. Each absorbed
+	page URL also gets a 'duplicate_source:<url>' entry, so a source filter
+	finds the chunk under every page it came from.
+	"""
+	chroma_metadata = {key: "\n".join(value) if isinstance(value, list) else value for key, value in metadata.items()}
+	for source in metadata.get("duplicate_sources", ()):
+		chroma_metadata[DUPLICATE_SOURCE_PREFIX + source] = True
+	return chroma_metadata
+
+# HNSW parameters fixed when a collection is created, by their Chroma metadata and configuration names
+BUILD_PARAMETERS = {"hnsw:space": "space", "hnsw:M": "max_neighbors", "hnsw:construction_ef": "ef_construction"}
+
+def hnsw_metadata(
+	space: str = HNSW_SPACE,
+	m: int = HNSW_M,
+	construction_ef: int = HNSW_CONSTRUCTION_EF,
+	search_ef: int = HNSW_SEARCH_EF,
+	num_threads: int = HNSW_NUM_THREADS
+) -> Dict:
+	"""
+	Builds the collection metadata that configures Chroma's HNSW index.
+	"""
+	return {
+		"hnsw:space": space,
+		"hnsw:M": m,
+		"hnsw:construction_ef": construction_ef,
+		"hnsw:search_ef": search_ef,
+		"hnsw:num_threads": num_threads,
+	}
+
+def built_index_parameters(collection) -> Dict:
+	"""
+	Returns the space, M and construction_ef an existing collection's index was
+	built with. These are fixed at creation; a different value needs a rebuild.
+	"""
+	configuration = getattr(collection, "configuration", None)
+	hnsw = configuration.get("hnsw") if isinstance(configuration, dict) else None
+	metadata = collection.metadata or {}
+	return {
+		key: hnsw[name] if isinstance(hnsw, dict) and name in hnsw else metadata.get(key)
+		for key, name in BUILD_PARAMETERS.items()
+	}
+
+def _update_metadata(collection, **values) -> None:
+	# modify() replaces the whole metadata and refuses 'hnsw:space' even when
+	# unchanged; the space is kept in the collection's configuration
+	metadata = {key: value for key, value in (collection.metadata or {}).items() if key != "hnsw:space"}
+	collection.modify(metadata={**metadata, **values})
+
+def apply_search_parameters(collection, search_ef: int = HNSW_SEARCH_EF, num_threads: int = HNSW_NUM_THREADS) -> None:
+	"""
+	Applies the HNSW parameters that can change after the collection was
+	created, so an existing collection follows the current configuration.
+	"""
+	collection.modify(configuration={"hnsw": {"ef_search": search_ef, "num_threads": num_threads}})
+	_update_metadata(collection, **{"hnsw:search_ef": search_ef, "hnsw:num_threads": num_threads})
+
+def set_content_version(collection, content_version: str) -> None:
+	"""
+	Records which run wrote the collection, so answers and results cached for
+	its earlier contents are not served once the documents change.
+	"""
+	_update_metadata(collection, **{CONTENT_VERSION_KEY: content_version})
+
+def _iter_store_chunks(processed_data_dir: str, store_name: str) -> Iterator[Tuple[str, str, Dict[str, str]]]:
+	with ChunkStore(os.path.join(processed_data_dir, store_name)) as store:
+		profiler.count(files_in=1)
+		for i in range(len(store)):
+			yield f"{store_name}-{i}", store.get(i), to_chroma_metadata({**store.metadata(i), "file": store_name})
+
+def _iter_file_chunks(filepath: str, filename: str) -> Iterator[Tuple[str, str, Dict[str, str]]]:
+	if filename.endswith(".jsonl"):
+		# page-aware chunks carry their page URL as the source
+		records = [(chunk, {**metadata, "file": filename}) for chunk, metadata in read_chunk_records_from_file(filepath)]
+	else:
+		records = [(chunk, {"source": filename}) for chunk in read_chunks_from_file(filepath)]
+	profiler.count(files_in=1)
+	for i, (chunk, metadata) in enumerate(records):
+		yield f"{filename}-{i}", chunk, metadata
+
+def iter_processed_files(processed_data_dir: str) -> Iterator[Tuple[str, Iterator[Tuple[str, str, Dict[str, str]]]]]:
+	"""
+	Lists the processed files in a stable order with a lazy stream of each
+	file's chunks: chunk stores are read through their memory-mapped index,
+	older JSON Lines and '---CHUNK---' text files are still accepted.
+
+	ARGS:
+		processed_data_dir: str, the directory containing the processed chunks.
+	YIELDS:
+		(file_key, chunks): tuple[str, Iterator], the store or file name and its
+			(chunk_id, chunk, metadata) tuples. Nothing is read until chunks is consumed.
+	"""
+	for filename in sorted(os.listdir(processed_data_dir)):
+		filepath = os.path.join(processed_data_dir, filename)
+		if filename.endswith(INDEX_SUFFIX):
+			store_name = filename[:-len(INDEX_SUFFIX)]
+			yield store_name, _iter_store_chunks(processed_data_dir, store_name)
+		elif filename.endswith((DATA_SUFFIX, META_SUFFIX)):
+			continue
+		elif os.path.isfile(filepath):
+			yield filename, _iter_file_chunks(filepath, filename)
+
+def iter_processed_chunks(processed_data_dir: str) -> Iterator[Tuple[str, str, Dict[str, str]]]:
+	"""
+	Streams every chunk in the processed data directory without loading whole files.
+
+	YIELDS:
+		(chunk_id, chunk, metadata): tuple[str, str, dict]
+	"""
+	for _, chunks in iter_processed_files(processed_data_dir):
+		yield from chunks
+
+def vectorize_and_store(processed_data_dir: str, resume: bool = False):
 	"""
 	Main function to vectorize processed data and store it in ChromaDB.
-	This version processes data in batches to avoid exceeding ChromaDB's limits.
+	This version streams each processed file in batches to avoid exceeding
+	ChromaDB's limits and to keep memory bounded by the batch size. Progress is
+	journaled per file and batch, so an interrupted run can be resumed without
+	re-encoding the batches it already stored.
 
 	ARGS:
 		processed_data_dir: str, the directory containing the chunked text files.
+		resume: bool, continue the journaled run if it used the same inputs and settings.
 	"""
 	logging.info('Starting vectorization and storage process...')
 	
 	#1. Load the embeddings model
 	logging.info(f"Loading embedding model: {EMBEDDING_MODEL_NAME}")
-	model = SentenceTransformer(EMBEDDING_MODEL_NAME)
+	with profiler.stage("vectorizer:load_model"):
+		model = SentenceTransformer(EMBEDDING_MODEL_NAME)
 
 	#2. Initialize ChromaDB client
 	client = chromadb.PersistentClient(path=DB_DIR)
-	collection = client.get_or_create_collection(name=COLLECTION_NAME)
+	index_metadata = hnsw_metadata()
+	collection = client.get_or_create_collection(name=COLLECTION_NAME, metadata=index_metadata)
+	# an existing collection keeps the index parameters it was built with...
+	built = built_index_parameters(collection)
+	mismatched = {key: index_metadata[key] for key, value in built.items() if value is not None and value != index_metadata[key]}
+	if mismatched:
+		logging.warning(
+			f"Collection '{COLLECTION_NAME}' was built with different HNSW parameters than configured {mismatched}; "
+			f"delete {DB_DIR} to rebuild it with the new ones."
+		)
+	# ...but takes the search parameters, which can change at any time
+	apply_search_parameters(collection)
 
-	#3. Read all chunks from all processed files
-	all_chunks = []
-	all_metadata = []
-	all_ids = []
+	#3. Open the progress journal, continuing an interrupted run if asked to
+	journal = VectorizeJournal(str(VECTORIZE_JOURNAL_FILE))
+	header = run_header(
+		processed_data_dir,
+		db_dir=str(DB_DIR),
+		collection=COLLECTION_NAME,
+		embedding_model=EMBEDDING_MODEL_NAME,
+		batch_size=VECTORIZE_BATCH_SIZE
+	)
+	journal.open(header, resume=resume)
+	# before the first write, so a collection a run has started to change never passes for the old one
+	set_content_version(collection, run_version(header))
 
-	for filename in os.listdir(processed_data_dir):
-		filepath = os.path.join(processed_data_dir, filename)
-		if os.path.isfile(filepath):
-			chunks = read_chunks_from_file(filepath)
-			for i, chunk in enumerate(chunks):
-				all_chunks.append(chunk)
-				all_metadata.append({"source": filename})
-				all_ids.append(f"{filename}-{i}")
-
-	if not all_chunks:
+	#4. Stream chunks file by file and embed them in batches
+	total_chunks = 0
+	skipped_chunks = 0
+	skipped_files = 0
+	try:
+		for file_key, chunks in iter_processed_files(processed_data_dir):
+			if file_key in journal.completed_files:
+				logging.info(f"Skipping {file_key}: already vectorized.")
+				skipped_files += 1
+				continue
+			file_chunks = 0
+			for batch_number, batch in enumerate(iter_batches(chunks, VECTORIZE_BATCH_SIZE)):
+				file_chunks += len(batch)
+				if journal.is_batch_done(file_key, batch_number):
+					skipped_chunks += len(batch)
+					continue
+				batch_ids, batch_chunks, batch_metadatas = (list(column) for column in zip(*batch))
+				profiler.count(chunks_in=len(batch_chunks), bytes_in=sum(len(c.encode('utf-8')) for c in batch_chunks))
+				#5. Generate embeddings for the batch
+				with profiler.stage("vectorizer:encode"):
+					batch_embeddings = model.encode(batch_chunks, show_progress_bar=True)
+
+				logging.info(f"Adding batch {batch_number} of {file_key} with {len(batch_chunks)} documents to ChromaDB.")
+				#6. upsert the batch, so a batch stored just before a crash can be written again
+				with profiler.stage("vectorizer:add"):
+					collection.upsert(
+					embeddings=batch_embeddings.tolist(),
+					# without documents Chroma keeps only vectors; the app reads text from the chunk store
+					documents=batch_chunks if CHROMA_STORE_DOCUMENTS else None,
+					metadatas=batch_metadatas,
+					ids=batch_ids
+					)
+				journal.record_batch(file_key, batch_number, len(batch_chunks))
+				profiler.count(vectors_out=len(batch_chunks))
+				total_chunks += len(batch_chunks)
+			journal.record_file(file_key, file_chunks)
+		journal.record_complete()
+	finally:
+		journal.close()
+
+	if skipped_files or skipped_chunks:
+		logging.info(f"Resumed run skipped {skipped_files} stored files and {skipped_chunks} stored chunks of partially stored files.")
+	if not (total_chunks or skipped_files or skipped_chunks):
 		logging.warning("No chunks found to vectorize. Exiting.")
 		return
 
-	#4. Generate embeddings in batches (more efficient)
-	batch_size = 4000
-	for i in range(0, len(all_chunks), batch_size):
-		end_i = min(i + batch_size, len(all_chunks))
-
-		batch_chunks = all_chunks[i: end_i]
-		batch_embeddings = model.encode(batch_chunks, show_progress_bar=True)
-		batch_metadatas = all_metadata[i:end_i]
-		batch_ids = all_ids[i:end_i]
-
-		logging.info(f"Adding batch {i//batch_size + 1} with {len(batch_chunks)} documents to ChromaDB.")
-		#5. add the batch to the collection
-		collection.add(
-		embeddings=batch_embeddings.tolist(),
-		documents=batch_chunks,
-		metadatas=batch_metadatas,
-		ids=batch_ids
-		)
-
-	logging.info(f"Successfully vectorized and stored {len(all_chunks)} documents in collection '{COLLECTION_NAME}")
-	logging.info(f"Vector database persisted at: {DB_DIR}")
\ No newline at end of file
+	logging.info(f"Successfully vectorized and stored {total_chunks} documents in collection '{COLLECTION_NAME}")
+	logging.info(f"Vector database persisted at: {DB_DIR}")
@@ -0,0 +1,61 @@
+import json
+import pytest
+from unittest.mock import MagicMock
+
+from src.rag_app import answer_cache
+
+ANSWERS = [{"question": "What is ZenML?", "answer": "A pipeline tool.", "source_documents": ["https://a/zenml.md"]}]
+
+@pytest.mark.parametrize(
+	"question, expected",
+	[
+		("What is ZenML?", "what is zenml"),
+		("  what   is\tzenml ", "what is zenml"),
+		("WHAT IS ZENML?!", "what is zenml"),
+	]
+)
+def test_normalize_question(question, expected):
+	assert answer_cache.normalize_question(question) == expected
+
+def test_get_collection_version():
+	collection = MagicMock()
+	collection.name = "mlops_docs"
+	collection.id = "1234"
+	collection.count.return_value = 42
+	collection.metadata = {}
+	assert answer_cache.get_collection_version(collection) == "mlops_docs:1234:42"
+	collection.metadata = {answer_cache.CONTENT_VERSION_KEY: "abc"}
+	assert answer_cache.get_collection_version(collection) == "mlops_docs:1234:42:abc"
+
+def test_snapshot_round_trip(tmp_path):
+	"""
+	Tests that a snapshot loads back for the collection version it was built for.
+	"""
+	snapshot_file = str(tmp_path / "snapshots" / "answers.json")
+	answer_cache.write_snapshot(snapshot_file, ANSWERS, "v1")
+
+	answers = answer_cache.load_snapshot(snapshot_file, "v1")
+
+	assert answers == {"what is zenml": ANSWERS[0]}
+
+def test_snapshot_invalidated_by_collection_version(tmp_path, caplog):
+	snapshot_file = str(tmp_path / "answers.json")
+	answer_cache.write_snapshot(snapshot_file, ANSWERS, "v1")
+
+	assert answer_cache.load_snapshot(snapshot_file, "v2") == {}
+	assert "built for collection version 'v1', serving 'v2'" in caplog.text
+
+def test_snapshot_invalidated_by_prompt_change(tmp_path):
+	snapshot_file = tmp_path / "answers.json"
+	answer_cache.write_snapshot(str(snapshot_file), ANSWERS, "v1")
+	snapshot = json.loads(snapshot_file.read_text())
+	snapshot["prompt_version"] = "old"
+	snapshot_file.write_text(json.dumps(snapshot))
+
+	assert answer_cache.load_snapshot(str(snapshot_file), "v1") == {}
+
+def test_missing_or_corrupt_snapshot(tmp_path):
+	assert answer_cache.load_snapshot(str(tmp_path / "missing.json"), "v1") == {}
+	corrupt = tmp_path / "corrupt.json"
+	corrupt.write_text("{not json")
+	assert answer_cache.load_snapshot(str(corrupt), "v1") == {}
@@ -0,0 +1,101 @@
+import time
+import socket
+import asyncio
+import shutil
+import subprocess
+import httpx
+import pytest
+import chromadb
+from unittest.mock import MagicMock, patch
+
+from src.rag_app import chroma_client
+from src.rag_app.retriever import CollectionRetriever
+
+def test_call_with_retries_retries_transient_failures():
+	fn = MagicMock(side_effect=[httpx.ConnectError("refused"), TimeoutError(), "ok"])
+	assert chroma_client.call_with_retries(fn, retries=2, backoff_seconds=0) == "ok"
+	assert fn.call_count == 3
+
+def test_call_with_retries_raises_other_errors_at_once():
+	fn = MagicMock(side_effect=ValueError("bad where filter"))
+	with pytest.raises(ValueError):
+		chroma_client.call_with_retries(fn, retries=3, backoff_seconds=0)
+	assert fn.call_count == 1
+
+def test_is_transient_status_codes():
+	def status_error(code):
+		return httpx.HTTPStatusError("error", request=httpx.Request("GET", "http://chroma"), response=httpx.Response(code))
+	assert chroma_client.is_transient(status_error(503))
+	assert not chroma_client.is_transient(status_error(400))
+
+def test_acall_with_retries_times_out_slow_attempts():
+	attempts = []
+	async def query():
+		attempts.append(1)
+		if len(attempts) == 1:
+			await asyncio.sleep(10)
+		return "ok"
+	assert asyncio.run(chroma_client.acall_with_retries(query, timeout=0.05, retries=1, backoff_seconds=0)) == "ok"
+	assert len(attempts) == 2
+
+def test_open_collection_rejects_unknown_mode():
+	with pytest.raises(ValueError):
+		chroma_client.open_collection("docs", mode="grpc")
+
+# --- Against a local Chroma server ---
+def free_port() -> int:
+	with socket.socket() as s:
+		s.bind(("localhost", 0))
+		return s.getsockname()[1]
+
+@pytest.fixture(scope="module")
+def chroma_server(tmp_path_factory):
+	"""
+	Starts 'chroma run' on a free port for the tests of this module.
+	"""
+	if shutil.which("chroma") is None:
+		pytest.skip("The chroma CLI is not installed.")
+	port = free_port()
+	process = subprocess.Popen(
+		["chroma", "run", "--path", str(tmp_path_factory.mktemp("chroma_server")), "--port", str(port)],
+		stdout=subprocess.DEVNULL,
+		stderr=subprocess.DEVNULL
+	)
+	try:
+		for _ in range(60):
+			try:
+				chromadb.HttpClient(host="localhost", port=port).heartbeat()
+				break
+			except Exception:
+				time.sleep(0.5)
+		else:
+			pytest.skip("The Chroma server did not start.")
+		yield port
+	finally:
+		process.terminate()
+		process.wait(timeout=30)
+
+def test_http_mode_retrieves_sync_and_async(chroma_server):
+	server = chromadb.HttpClient(host="localhost", port=chroma_server)
+	server.get_or_create_collection("http_docs").add(
+		ids=["repo-0", "repo-1"],
+		embeddings=[[1.0, 0.0], [0.0, 1.0]],
+		documents=["about zenml", "about dvc"],
+		metadatas=[{"source": "https://a/zenml.md"}, {"source": "https://a/dvc.md"}]
+	)
+
+	with patch('src.rag_app.chroma_client.CHROMA_HOST', "localhost"), patch('src.rag_app.chroma_client.CHROMA_PORT', chroma_server):
+		_, collection = chroma_client.open_collection("http_docs", mode="http")
+		embedding_function = MagicMock()
+		embedding_function.embed_documents.return_value = [[0.0, 1.0]]
+		retriever = CollectionRetriever(collection=collection, embedding_function=embedding_function, k=1)
+		assert collection.count() == 2
+		assert retriever.retrieve_many(["dvc?"])[0][0][0].page_content == "about dvc"
+
+		async def retrieve_async():
+			retriever.async_collection = await chroma_client.open_async_collection("http_docs")
+			embedding_function.aembed_documents = MagicMock(side_effect=lambda questions: asyncio.sleep(0, [[1.0, 0.0]]))
+			return await retriever.ainvoke("zenml?")
+		documents = asyncio.run(retrieve_async())
+
+	assert [(doc.id, doc.page_content, doc.metadata) for doc in documents] == [("repo-0", "about zenml", {"source": "https://a/zenml.md"})]
@@ -0,0 +1,90 @@
+import os
+import pytest
+
+from src.chunkstore.chunkstore import (
+	ChunkStore, ChunkStoreWriter, ChunkStoreCatalog,
+	is_chunk_store, list_chunk_stores, INDEX_SUFFIX
+)
+
+def write_store(path_prefix, chunks):
+	with ChunkStoreWriter(path_prefix) as writer:
+		for text, metadata in chunks:
+			writer.add(text, metadata)
+
+def test_round_trip(tmp_path):
+	"""
+	Tests that chunks and metadata read back exactly, including non-ASCII text.
+	"""
+	prefix = str(tmp_path / "processed_repo")
+	chunks = [
+		("first chunk", {"source": "https://a/index.md"}),
+		("zweiter Abschnitt – ümlaut", {"source": "https://a/index.md"}),
+		("", {"source": "https://a/empty.md"}),
+		("third", {"source": "https://a/guide.md"}),
+	]
+	write_store(prefix, chunks)
+
+	with ChunkStore(prefix) as store:
+		assert len(store) == 4
+		assert list(store) == chunks
+		assert store.get(1) == "zweiter Abschnitt – ümlaut"
+		assert bytes(store.get_bytes(1)).decode('utf-8') == "zweiter Abschnitt – ümlaut"
+		assert store.metadata(3) == {"source": "https://a/guide.md"}
+		with pytest.raises(IndexError):
+			store.get(4)
+
+def test_index_is_fixed_width_and_metadata_deduplicated(tmp_path):
+	"""
+	Tests the on-disk layout: a 16-byte header plus 16 bytes per chunk, and one
+	metadata entry per distinct page.
+	"""
+	prefix = str(tmp_path / "processed_repo")
+	write_store(prefix, [("a", {"source": "p1"}), ("b", {"source": "p1"}), ("c", {"source": "p2"})])
+
+	assert os.path.getsize(prefix + INDEX_SUFFIX) == 16 + 3 * 16
+	with open(prefix + ".meta.json") as f:
+		assert f.read() == '[{"source": "p1"}, {"source": "p2"}]'
+
+def test_writer_abort_leaves_no_store(tmp_path):
+	"""
+	Tests that a failure while writing never leaves a partial store behind.
+	"""
+	prefix = str(tmp_path / "processed_repo")
+	with pytest.raises(RuntimeError):
+		with ChunkStoreWriter(prefix) as writer:
+			writer.add("a", {})
+			raise RuntimeError("boom")
+
+	assert not is_chunk_store(prefix)
+	assert os.listdir(tmp_path) == []
+
+def test_empty_store(tmp_path):
+	prefix = str(tmp_path / "processed_empty")
+	write_store(prefix, [])
+	with ChunkStore(prefix) as store:
+		assert len(store) == 0
+		assert list(store) == []
+
+def test_rejects_foreign_index(tmp_path):
+	prefix = str(tmp_path / "processed_repo")
+	write_store(prefix, [("a", {})])
+	with open(prefix + INDEX_SUFFIX, 'r+b') as f:
+		f.write(b"NOTANIDX")
+	with pytest.raises(ValueError):
+		ChunkStore(prefix)
+
+def test_catalog_resolves_vectorizer_ids(tmp_path):
+	"""
+	Tests lookups by '<store>-<position>' id and rejection of unknown ids.
+	"""
+	write_store(str(tmp_path / "processed_a-b"), [("zero", {}), ("one", {})])
+	write_store(str(tmp_path / "processed_c"), [("only", {})])
+	catalog = ChunkStoreCatalog(str(tmp_path))
+
+	assert list_chunk_stores(str(tmp_path)) == ["processed_a-b", "processed_c"]
+	assert catalog.get("processed_a-b-1") == "one"
+	assert catalog.get("processed_c-0") == "only"
+	for bad_id in ("processed_c-1", "processed_x-0", "processed_c", "../processed_c-0"):
+		with pytest.raises(KeyError):
+			catalog.get(bad_id)
+	catalog.close()
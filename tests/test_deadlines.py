@@ -0,0 +1,65 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+
+from src.rag_app import deadlines
+from src.rag_app.deadlines import ClientDisconnected, parse_timeout, run_with_deadline
+
+class FakeRequest:
+	"""Stands in for a Starlette request whose client leaves after a few polls."""
+
+	def __init__(self, disconnect_after_polls=None):
+		self.polls = 0
+		self.disconnect_after_polls = disconnect_after_polls
+
+	async def is_disconnected(self):
+		self.polls += 1
+		return self.disconnect_after_polls is not None and self.polls > self.disconnect_after_polls
+
+def test_parse_timeout():
+	"""
+	Tests the default, an explicit value, the cap and invalid values.
+	"""
+	with patch.object(deadlines, 'QUERY_TIMEOUT_SECONDS', 30.0), patch.object(deadlines, 'QUERY_MAX_TIMEOUT_SECONDS', 60.0):
+		assert parse_timeout(None) == 30.0
+		assert parse_timeout("2.5") == 2.5
+		assert parse_timeout("600") == 60.0
+		for invalid in ("0", "-1", "soon", "nan"):
+			with pytest.raises(ValueError):
+				parse_timeout(invalid)
+
+def test_run_with_deadline_returns_result():
+	async def work():
+		await asyncio.sleep(0.01)
+		return "answer"
+	assert asyncio.run(run_with_deadline(FakeRequest(), work(), timeout=5)) == "answer"
+
+@patch.object(deadlines, 'DISCONNECT_POLL_SECONDS', 0.01)
+def test_run_with_deadline_cancels_work_when_client_disconnects():
+	"""
+	Tests that the in-flight work is cancelled as soon as the client leaves.
+	"""
+	cancelled = asyncio.Event()
+	async def generation():
+		try:
+			await asyncio.sleep(10)
+		except asyncio.CancelledError:
+			cancelled.set()
+			raise
+
+	async def scenario():
+		with pytest.raises(ClientDisconnected):
+			await run_with_deadline(FakeRequest(disconnect_after_polls=2), generation(), timeout=5)
+		return cancelled.is_set()
+
+	cancelled_before = deadlines.query_stats["cancelled"]
+	assert asyncio.run(scenario())
+	assert deadlines.query_stats["cancelled"] == cancelled_before + 1
+
+def test_run_with_deadline_expires():
+	async def generation():
+		await asyncio.sleep(10)
+	expired_before = deadlines.query_stats["expired"]
+	with pytest.raises(asyncio.TimeoutError):
+		asyncio.run(run_with_deadline(FakeRequest(), generation(), timeout=0.05))
+	assert deadlines.query_stats["expired"] == expired_before + 1
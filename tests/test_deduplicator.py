@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from src.deduplicator import deduplicator
+from src.chunkstore.chunkstore import ChunkStore, ChunkStoreWriter
+
+BASE_TEXT = (
+	"To install the client run pip install zenml and then initialize a repository "
+	"with zenml init before registering a stack with an orchestrator and an artifact store "
+	"so that every pipeline run is tracked and reproducible across environments"
+)
+
+def write_store(path_prefix, chunks):
+	with ChunkStoreWriter(path_prefix) as writer:
+		for text, source in chunks:
+			writer.add(text, {"source": source})
+
+def test_normalize_text():
+	assert deduplicator.normalize_text("  Hello\n\tWorld  ") == "hello world"
+
+@pytest.mark.parametrize("threshold", [0.5, 0.7, 0.85, 0.95])
+def test_lsh_bands_midpoint_near_threshold(threshold):
+	bands, rows = deduplicator.lsh_bands(threshold, 128)
+	assert bands * rows <= 128
+	assert abs((1 / bands) ** (1 / rows) - threshold) < 0.05
+
+def test_minhash_estimates_jaccard():
+	"""
+	Tests that signature agreement tracks the Jaccard similarity of the shingle sets.
+	"""
+	permutations = deduplicator.make_permutations(256)
+	a = np.arange(0, 100, dtype=np.uint64)
+	b = np.arange(50, 150, dtype=np.uint64)  # Jaccard = 50 / 150
+	sig_a = deduplicator.minhash_signature(a, permutations)
+	sig_b = deduplicator.minhash_signature(b, permutations)
+
+	assert np.array_equal(sig_a, deduplicator.minhash_signature(a, permutations))
+	assert abs(np.mean(sig_a == sig_b) - 1 / 3) < 0.1
+
+def test_near_duplicate_index():
+	permutations = deduplicator.make_permutations(128)
+	index = deduplicator.NearDuplicateIndex(threshold=0.8, num_perm=128)
+	signature = lambda text: deduplicator.minhash_signature(deduplicator.shingle_hashes(text, 3), permutations)
+	text = deduplicator.normalize_text(BASE_TEXT)
+
+	assert index.find_or_add((0, 0), signature(text)) is None
+	assert index.find_or_add((0, 1), signature(text + " today")) == (0, 0)
+	assert index.find_or_add((0, 2), signature("a completely different page about kubernetes pods and services")) is None
+
+def test_deduplicate_chunk_stores(tmp_path):
+	"""
+	Tests exact and near duplicates across stores: the first occurrence survives
+	and records every page it absorbed.
+	"""
+	write_store(str(tmp_path / "processed_a"), [
+		(BASE_TEXT, "https://a/install.md"),
+		("Unique content about MLflow model registry stages.", "https://a/mlflow.md"),
+	])
+	write_store(str(tmp_path / "processed_b"), [
+		(BASE_TEXT.upper(), "https://b/v1/install.md"),
+		(BASE_TEXT + " today.", "https://b/v2/install.md"),
+		("Another unique chunk about DVC remotes.", "https://b/dvc.md"),
+	])
+
+	report = deduplicator.deduplicate_chunk_stores(str(tmp_path), threshold=0.8, shingle_size=3)
+
+	assert report["chunks_in"] == 5
+	assert report["chunks_out"] == 3
+	assert report["exact_duplicates"] == 1
+	assert report["near_duplicates"] == 1
+	assert report["removed_pct"] == 40.0
+	with ChunkStore(str(tmp_path / "processed_a")) as store:
+		assert store.get(0) == BASE_TEXT
+		assert store.metadata(0) == {
+			"source": "https://a/install.md",
+			"duplicate_sources": ["https://b/v1/install.md", "https://b/v2/install.md"]
+		}
+		assert store.metadata(1) == {"source": "https://a/mlflow.md"}
+	with ChunkStore(str(tmp_path / "processed_b")) as store:
+		assert list(store) == [("Another unique chunk about DVC remotes.", {"source": "https://b/dvc.md"})]
+
+def test_exact_copy_of_a_near_duplicate_keeps_its_source(tmp_path):
+	"""
+	Tests that an exact copy of a dropped near duplicate is credited to the surviving chunk.
+	"""
+	write_store(str(tmp_path / "processed_a"), [
+		(BASE_TEXT, "a"),
+		(BASE_TEXT + " today.", "b"),
+		(BASE_TEXT + " today.", "c"),
+	])
+
+	report = deduplicator.deduplicate_chunk_stores(str(tmp_path), threshold=0.8, shingle_size=3)
+
+	assert report["near_duplicates"] == 1 and report["exact_duplicates"] == 1
+	with ChunkStore(str(tmp_path / "processed_a")) as store:
+		assert list(store) == [(BASE_TEXT, {"source": "a", "duplicate_sources": ["b", "c"]})]
@@ -0,0 +1,101 @@
+import git
+from unittest.mock import patch
+
+from src.scraper import scraper, extraction_cache, extractors
+from src.scraper.extraction_cache import ExtractionCache, list_blob_shas
+
+def make_repo(path, files):
+	repo = git.Repo.init(path)
+	for name, content in files.items():
+		filepath = path / name
+		filepath.parent.mkdir(parents=True, exist_ok=True)
+		filepath.write_text(content)
+	repo.index.add(list(files))
+	return repo
+
+def test_list_blob_shas_matches_git_hash_object(tmp_path):
+	"""
+	Tests that tracked files map to the SHA git stores their content under.
+	"""
+	repo = make_repo(tmp_path, {"README.md": "# Hello\n", "docs/guide.rst": "Guide\n=====\n"})
+	blob_shas = list_blob_shas(str(tmp_path))
+	assert blob_shas == {
+		"README.md": repo.git.hash_object("README.md"),
+		"docs/guide.rst": repo.git.hash_object("docs/guide.rst"),
+	}
+
+def test_list_blob_shas_outside_git_repo(tmp_path):
+	"""
+	Tests that a directory that is not a repository disables the cache.
+	"""
+	assert list_blob_shas(str(tmp_path / "missing")) == {}
+
+def test_extraction_cache_persists_flushed_entries(tmp_path):
+	"""
+	Tests hit/miss counting and that entries survive reopening the cache.
+	"""
+	cache_file = str(tmp_path / "cache" / "extraction.sqlite")
+	with ExtractionCache(cache_file) as cache:
+		assert cache.get("abc", "extract_markdown") is None
+		cache.put("abc", "extract_markdown", "text")
+	assert (cache.hits, cache.misses) == (0, 1)
+
+	with ExtractionCache(cache_file) as cache:
+		assert cache.get("abc", "extract_markdown") == "text"
+		assert cache.get("abc", "extract_rst") is None
+	assert (cache.hits, cache.misses) == (1, 1)
+
+def test_extraction_cache_drops_other_extractor_versions(tmp_path):
+	"""
+	Tests that changing the extractor version invalidates cached text.
+	"""
+	cache_file = str(tmp_path / "extraction.sqlite")
+	with ExtractionCache(cache_file) as cache:
+		cache.put("abc", "extract_markdown", "old text")
+	with patch.object(extraction_cache, "EXTRACTOR_VERSION", "2"):
+		with ExtractionCache(cache_file) as cache:
+			assert cache.get("abc", "extract_markdown") is None
+
+def test_extraction_cache_commits_in_bounded_batches(tmp_path):
+	"""
+	Tests that entries are committed while the cache is open, by count and by size.
+	"""
+	cache_file = str(tmp_path / "extraction.sqlite")
+	with ExtractionCache(cache_file, flush_entries=2, flush_bytes=10) as cache:
+		cache.put("a", "extract_markdown", "one")
+		with ExtractionCache(cache_file) as reader:
+			assert reader.get("a", "extract_markdown") is None
+		cache.put("b", "extract_markdown", "two")
+		cache.put("c", "extract_markdown", "a long page of text")
+		with ExtractionCache(cache_file) as reader:
+			assert [reader.get(sha, "extract_markdown") for sha in "abc"] == ["one", "two", "a long page of text"]
+
+def test_extractor_version_follows_the_extractor_source():
+	"""
+	Tests that any change to the extractors' code changes the cache version.
+	"""
+	with open(extractors.__file__, 'rb') as f:
+		source = f.read()
+	assert extractors.EXTRACTOR_VERSION == extractors.extractor_version(source)
+	assert extractors.extractor_version(source + b"\n# changed") != extractors.EXTRACTOR_VERSION
+
+def test_process_cloned_repo_reuses_text_of_unchanged_files(tmp_path):
+	"""
+	Tests that a second run only extracts the file whose blob changed.
+	"""
+	repo_path = tmp_path / "repo"
+	repo_path.mkdir()
+	repo = make_repo(repo_path, {"a.md": "# A\n", "b.md": "# B\n"})
+	output_file = str(tmp_path / "out.txt")
+	with patch.object(scraper, "EXTRACTION_CACHE_FILE", tmp_path / "extraction.sqlite"):
+		scraper.process_cloned_repo(str(repo_path), "https://github.com/test/repo", output_file)
+
+		(repo_path / "b.md").write_text("# B changed\n")
+		repo.index.add(["b.md"])
+		with patch.object(scraper, "extract_text_from_file", wraps=scraper.extract_text_from_file) as mock_extract:
+			scraper.process_cloned_repo(str(repo_path), "https://github.com/test/repo", output_file)
+
+	mock_extract.assert_called_once_with(str(repo_path / "b.md"))
+	with open(output_file) as f:
+		output = f.read()
+	assert "# A" in output and "# B changed" in output
@@ -0,0 +1,100 @@
+from unittest.mock import patch
+
+from src.scraper import extractors
+
+def test_extract_markdown_strips_front_matter_comments_and_link_targets():
+	"""
+	Tests that markup noise is removed while the readable text stays.
+	"""
+	content = (
+		"---\ntitle: Pipelines\n---\n"
+		"# Pipelines <!-- draft -->\n\n"
+		"Read the [docs](https://docs.zenml.io) and look at ![the DAG](dag.png).\n\n"
+		"<details><summary>More</summary>Hidden text</details>\n\n\n\n"
+		"[docs]: https://docs.zenml.io\n"
+	)
+	text = extractors.extract_markdown(content)
+	assert text == "# Pipelines\n\nRead the docs and look at the DAG.\n\nMoreHidden text"
+
+def test_extract_markdown_keeps_code_blocks_verbatim():
+	"""
+	Tests that tags and links inside fenced code are not touched.
+	"""
+	content = "Run:\n\n```html\n<b>[bold](x)</b>\n```\n\n~~~\n<!-- kept -->\n~~~\n"
+	text = extractors.extract_markdown(content)
+	assert "```html\n<b>[bold](x)</b>\n```" in text
+	assert "~~~\n<!-- kept -->\n~~~" in text
+
+def test_extract_markdown_keeps_inline_code_verbatim():
+	"""
+	Tests that placeholders and links inside inline code spans are not taken for markup.
+	"""
+	assert extractors.extract_markdown("Run `dvc remote add <name> <url>` first.") == "Run `dvc remote add <name> <url>` first."
+	assert extractors.extract_markdown("Write ``[x](y)`` or `[x](y)`, not [x](y).") == "Write ``[x](y)`` or `[x](y)`, not x."
+
+def test_extract_markdown_keeps_indented_code_verbatim():
+	content = "Example <b>markup</b>:\n\n    <b>indented code</b>\n\n    [x](y)\n\nBack to <i>prose</i>."
+	text = extractors.extract_markdown(content)
+	assert text == "Example markup:\n\n    <b>indented code</b>\n\n    [x](y)\n\nBack to prose."
+
+def test_extract_markdown_keeps_generic_types_in_prose():
+	"""
+	Tests that only HTML elements and closed or self-closing components are taken for tags.
+	"""
+	content = "A generic List<String> or Map<K, V> and a <span>styled</span> word.\n\n<Note>\n\n    code\n\nInside.\n</Note>"
+	text = extractors.extract_markdown(content)
+	assert text == "A generic List<String> or Map<K, V> and a styled word.\n\n    code\n\nInside."
+	assert extractors.extract_mdx("Returns Optional<Model>.\n\n<Callout />") == "Returns Optional<Model>."
+
+def test_extract_mdx_strips_esm_and_jsx():
+	"""
+	Tests that MDX imports, exports, JSX components and comments are removed.
+	"""
+	content = (
+		"import Tabs from '@theme/Tabs';\n"
+		"export const meta = {\n  sidebar: 'docs',\n};\n\n"
+		"{/* internal note */}\n"
+		"<Tabs>\n<TabItem value=\"cli\" label=\"CLI\">\n\nUse `dvc push`.\n\n</TabItem>\n</Tabs>\n"
+		"<Callout type=\"info\" />\n"
+	)
+	assert extractors.extract_mdx(content) == "Use `dvc push`."
+
+def test_extract_rst_handles_directives_and_roles():
+	"""
+	Tests section adornments, roles, references, admonitions and skipped directives.
+	"""
+	content = (
+		".. _intro:\n\n"
+		"=====\nIntro\n=====\n\n"
+		"Call :func:`~mlflow.log_param` or see `the guide <https://mlflow.org>`_ and ``mlflow ui``.\n\n"
+		".. note::\n   :class: tip\n\n   Runs are grouped in experiments.\n\n"
+		".. image:: arch.png\n   :alt: architecture\n\n"
+		".. toctree::\n   :maxdepth: 1\n\n   tracking\n\n"
+		".. |version| replace:: 2.0\n\n"
+		".. this is a comment\n"
+	)
+	text = extractors.extract_rst(content)
+	assert text == (
+		"Intro\n\n"
+		"Call mlflow.log_param or see the guide and mlflow ui.\n\n"
+		"Runs are grouped in experiments."
+	)
+
+def test_extract_rst_keeps_code_blocks_verbatim():
+	"""
+	Tests that code directive bodies and literal blocks keep their markup.
+	"""
+	content = "Example::\n\n    x = :not_a_role:`y`\n\n.. code-block:: python\n\n   print(``raw``)\n"
+	text = extractors.extract_rst(content)
+	assert text == "Example:\n\n    x = :not_a_role:`y`\n\nprint(``raw``)"
+
+@patch("trafilatura.extract", return_value="html text")
+def test_get_extractor_dispatches_by_extension(mock_trafilatura):
+	"""
+	Tests that only HTML (and unknown formats) go through trafilatura.
+	"""
+	assert extractors.get_extractor("docs/Index.MD") is extractors.extract_markdown
+	assert extractors.get_extractor("docs/page.mdx") is extractors.extract_mdx
+	assert extractors.get_extractor("docs/page.rst") is extractors.extract_rst
+	assert extractors.get_extractor("docs/page.html")("<p>x</p>") == "html text"
+	mock_trafilatura.assert_called_once_with("<p>x</p>", include_comments=False, include_tables=False)
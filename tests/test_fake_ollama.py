@@ -0,0 +1,79 @@
+import json
+import pytest
+from fastapi.testclient import TestClient
+
+from src.loadtest.fake_ollama import FakeOllamaSettings, create_app
+
+def make_client(**overrides):
+	settings = FakeOllamaSettings(ttft_ms=0, ttft_jitter_ms=0, tokens_per_sec=0, response_tokens=5, seed=0)
+	for key, value in overrides.items():
+		setattr(settings, key, value)
+	return TestClient(create_app(settings))
+
+def test_read_root():
+	"""
+	Tests the readiness endpoint used by the k8s probe and the integration fixture.
+	"""
+	response = make_client().get('/')
+	assert response.status_code == 200
+	assert response.text == "Ollama is running"
+
+def test_generate_streaming():
+	"""
+	Tests that a streamed generation yields token records followed by a 'done' record.
+	"""
+	client = make_client()
+	response = client.post('/api/generate', json={'model': 'llama3', 'prompt': 'what is zenml'})
+	assert response.status_code == 200
+	records = [json.loads(line) for line in response.text.splitlines()]
+
+	assert len(records) == 6
+	assert all(not r['done'] for r in records[:-1])
+	assert records[-1]['done'] is True
+	assert records[-1]['eval_count'] == 5
+	assert "".join(r['response'] for r in records) == "what is zenml what is "
+	assert client.get('/fake/stats').json()['completed'] == 1
+
+def test_generate_non_streaming():
+	"""
+	Tests that 'stream': false returns a single aggregated response.
+	"""
+	response = make_client().post('/api/generate', json={'model': 'llama3', 'prompt': 'hi', 'stream': False})
+	assert response.status_code == 200
+	assert response.json()['response'] == "hi hi hi hi hi "
+	assert response.json()['done'] is True
+
+def test_chat_non_streaming():
+	"""
+	Tests the chat API shape.
+	"""
+	body = {'model': 'llama3', 'messages': [{'role': 'user', 'content': 'hello'}], 'stream': False}
+	response = make_client(response_tokens=2).post('/api/chat', json=body)
+	assert response.status_code == 200
+	assert response.json()['message'] == {'role': 'assistant', 'content': 'hello hello '}
+
+@pytest.mark.parametrize(
+	"overrides, model, expected_status",
+	[
+		({'error_rate': 1.0}, 'llama3', 500),
+		({}, 'mistral', 404),
+	]
+)
+def test_generate_errors(overrides, model, expected_status):
+	"""
+	Tests injected failures and unknown models.
+	"""
+	client = make_client(**overrides)
+	response = client.post('/api/generate', json={'model': model, 'prompt': 'hi'})
+	assert response.status_code == expected_status
+	assert 'error' in response.json()
+
+def test_generate_midstream_error():
+	"""
+	Tests that a mid-stream failure ends the stream with an error record.
+	"""
+	client = make_client(midstream_error_rate=1.0)
+	response = client.post('/api/generate', json={'model': 'llama3', 'prompt': 'hi'})
+	last = json.loads(response.text.splitlines()[-1])
+	assert last == {'error': 'injected mid-stream failure'}
+	assert client.get('/fake/stats').json()['errors'] == 1
@@ -0,0 +1,61 @@
+import json
+from unittest.mock import MagicMock
+
+from src.rag_app.index_manifest import IndexWatcher, read_manifest, write_manifest
+
+def test_manifest_round_trip_with_relative_paths(tmp_path):
+	"""
+	Tests that paths are stored relative to the manifest and read back absolute.
+	"""
+	manifest_path = tmp_path / "indexes" / "manifest.json"
+	db_dir = tmp_path / "indexes" / "v1" / "chroma_db"
+
+	write_manifest(str(manifest_path), "v1", "docs", str(db_dir), count=3)
+
+	stored = json.loads(manifest_path.read_text())
+	assert stored["db_dir"] == "v1/chroma_db"
+	manifest = read_manifest(str(manifest_path))
+	assert manifest["version"] == "v1"
+	assert manifest["db_dir"] == str(db_dir)
+	assert manifest["count"] == 3
+
+def test_read_manifest_rejects_missing_and_incomplete_files(tmp_path):
+	manifest_path = tmp_path / "manifest.json"
+	assert read_manifest(str(manifest_path)) is None
+	manifest_path.write_text('{"version": "v1"}')
+	assert read_manifest(str(manifest_path)) is None
+	manifest_path.write_text('{"version": ')
+	assert read_manifest(str(manifest_path)) is None
+
+def test_watcher_swaps_to_new_versions_only(tmp_path):
+	manifest_path = str(tmp_path / "manifest.json")
+	on_change = MagicMock(return_value=True)
+	watcher = IndexWatcher(manifest_path, 30, on_change, current_version="v1")
+
+	write_manifest(manifest_path, "v1", "docs")
+	assert watcher.check() is False
+	write_manifest(manifest_path, "v2", "docs")
+	assert watcher.check() is True
+	assert watcher.check() is False
+
+	on_change.assert_called_once()
+	assert on_change.call_args.args[0]["version"] == "v2"
+	assert watcher.current_version == "v2"
+
+def test_watcher_does_not_retry_a_failed_version(tmp_path):
+	"""
+	Tests that a version that fails to load is skipped until another is published.
+	"""
+	manifest_path = str(tmp_path / "manifest.json")
+	on_change = MagicMock(side_effect=[RuntimeError("empty collection"), True])
+	watcher = IndexWatcher(manifest_path, 30, on_change, current_version="v1")
+
+	write_manifest(manifest_path, "v2", "docs")
+	assert watcher.check() is False
+	assert watcher.check() is False
+	assert watcher.current_version == "v1"
+
+	write_manifest(manifest_path, "v3", "docs")
+	assert watcher.check() is True
+	assert watcher.current_version == "v3"
+	assert on_change.call_count == 2
@@ -0,0 +1,55 @@
+import json
+
+from src.vectorizer.journal import VectorizeJournal, fingerprint_inputs, run_header, unfinished_run
+
+def test_journal_resumes_recorded_progress(tmp_path):
+	journal_path = str(tmp_path / "journal.jsonl")
+	journal = VectorizeJournal(journal_path)
+	assert journal.open({"batch_size": 2}) is False
+	journal.record_batch("repo_a", 0, 2)
+	journal.record_batch("repo_a", 1, 1)
+	journal.record_file("repo_a", 3)
+	journal.record_batch("repo_b", 0, 2)
+	journal.close()
+	assert unfinished_run(journal_path) == {"type": "run", "batch_size": 2}
+
+	resumed = VectorizeJournal(journal_path)
+	assert resumed.open({"batch_size": 2}, resume=True) is True
+	assert resumed.completed_files == {"repo_a"}
+	assert resumed.is_batch_done("repo_b", 0) and not resumed.is_batch_done("repo_b", 1)
+	resumed.record_complete()
+	resumed.close()
+	assert unfinished_run(journal_path) is None
+
+def test_journal_starts_over_when_settings_differ(tmp_path):
+	journal_path = str(tmp_path / "journal.jsonl")
+	journal = VectorizeJournal(journal_path)
+	journal.open({"batch_size": 2})
+	journal.record_file("repo_a", 3)
+	journal.close()
+
+	restarted = VectorizeJournal(journal_path)
+	assert restarted.open({"batch_size": 4}, resume=True) is False
+	restarted.close()
+	assert restarted.completed_files == set()
+	with open(journal_path) as f:
+		assert [json.loads(line) for line in f] == [{"type": "run", "batch_size": 4}]
+
+def test_journal_ignores_a_truncated_last_record(tmp_path):
+	journal_path = tmp_path / "journal.jsonl"
+	journal_path.write_text('{"type": "run"}\n{"type": "file", "file": "repo_a", "chunks": 3}\n{"type": "fi')
+
+	journal = VectorizeJournal(str(journal_path))
+	assert journal.open({}, resume=True) is True
+	journal.record_file("repo_b", 1)
+	journal.close()
+
+	assert journal.completed_files == {"repo_a", "repo_b"}
+	assert all(json.loads(line) for line in journal_path.read_text().splitlines())
+
+def test_run_header_fingerprints_inputs(tmp_path):
+	(tmp_path / "repo_a.idx").write_bytes(b"1234")
+	header = run_header(str(tmp_path), batch_size=2)
+	assert header["processed_data_dir"] == str(tmp_path)
+	assert header["inputs"]["repo_a.idx"][0] == 4
+	assert fingerprint_inputs(str(tmp_path / "missing")) == {}
@@ -0,0 +1,110 @@
+import json
+import asyncio
+import pytest
+import httpx
+
+from src.loadtest import load_generator
+
+@pytest.mark.parametrize(
+	"values, pct, expected",
+	[
+		([], 99, 0.0),
+		([5.0], 50, 5.0),
+		([1.0, 2.0, 3.0, 4.0], 50, 2.0),
+		([float(i) for i in range(1, 101)], 99, 99.0),
+		([float(i) for i in range(1, 101)], 99.9, 100.0),
+	]
+)
+def test_percentile(values, pct, expected):
+	assert load_generator.percentile(values, pct) == expected
+
+def test_summarize_results():
+	"""
+	Tests that outcomes are bucketed and only successful requests feed the latency percentiles.
+	"""
+	results = [
+		{"status": "ok", "latency": 0.1},
+		{"status": "ok", "latency": 0.3},
+		{"status": "dropped", "latency": 0.0},
+		{"status": "timeout", "latency": 5.0},
+		{"status": "http_500", "latency": 0.2},
+	]
+	report = load_generator.summarize_results(results, duration=2.0)
+
+	assert report["arrivals"] == 5
+	assert report["ok"] == 2
+	assert report["dropped"] == 1
+	assert report["timeouts"] == 1
+	assert report["errors"] == 1
+	assert report["throughput_rps"] == 1.0
+	assert report["latency_ms"]["max"] == 300.0
+
+def test_load_question_mix(tmp_path):
+	"""
+	Tests both the plain text and the weighted JSONL question formats.
+	"""
+	text_file = tmp_path / "questions.txt"
+	text_file.write_text("What is ZenML?\n\nWhat is DVC?\n")
+	assert load_generator.load_question_mix(str(text_file)) == (["What is ZenML?", "What is DVC?"], [1.0, 1.0])
+
+	jsonl_file = tmp_path / "questions.jsonl"
+	jsonl_file.write_text(json.dumps({"question": "q1", "weight": 3}) + "\n" + json.dumps({"question": "q2"}) + "\n")
+	assert load_generator.load_question_mix(str(jsonl_file)) == (["q1", "q2"], [3.0, 1.0])
+
+def test_run_load_test_against_mock_transport():
+	"""
+	Tests an open-loop run against a mocked '/query' endpoint that fails half the questions.
+	"""
+	seen = []
+
+	def handler(request: httpx.Request) -> httpx.Response:
+		question = json.loads(request.content)["question"]
+		seen.append(question)
+		return httpx.Response(200 if question == "good" else 500, json={})
+
+	async def run():
+		async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+			return await load_generator.run_load_test(
+				"http://test/query", ["good", "bad"], [1.0, 1.0],
+				rate=200.0, duration=0.25, seed=1, client=client
+			)
+
+	report = asyncio.run(run())
+
+	assert report["arrivals"] == len(seen) > 0
+	assert report["ok"] == seen.count("good")
+	assert report["outcomes"].get("http_500", 0) == seen.count("bad")
+	assert report["dropped"] == 0
+
+def test_run_load_test_drops_when_saturated():
+	"""
+	Tests that arrivals beyond max_in_flight are dropped rather than queued.
+	"""
+	async def slow_handler(request: httpx.Request) -> httpx.Response:
+		await asyncio.sleep(0.5)
+		return httpx.Response(200, json={})
+
+	async def run():
+		async with httpx.AsyncClient(transport=httpx.MockTransport(slow_handler)) as client:
+			return await load_generator.run_load_test(
+				"http://test/query", ["q"], [1.0],
+				rate=200.0, duration=0.2, max_in_flight=2, seed=1, client=client
+			)
+
+	report = asyncio.run(run())
+
+	assert report["ok"] == 2
+	assert report["dropped"] == report["arrivals"] - 2
+
+@pytest.mark.parametrize("rate", ["0", "-1", "nan", "inf", "fast"])
+def test_parse_args_rejects_non_positive_rates(rate, capsys):
+	with pytest.raises(SystemExit):
+		load_generator.parse_args(["--questions", "q.txt", "--rate", rate])
+	assert "--rate" in capsys.readouterr().err
+
+def test_run_load_test_rejects_non_positive_rates():
+	"""
+	Tests that a zero rate fails up front instead of dividing by zero mid-run.
+	"""
+	with pytest.raises(ValueError):
+		asyncio.run(load_generator.run_load_test("http://test/query", ["q"], [1.0], rate=0.0, duration=1.0))
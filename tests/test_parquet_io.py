@@ -0,0 +1,66 @@
+import chromadb
+import numpy as np
+import pytest
+
+from src.vectorizer import parquet_io
+from src.vectorizer.vectorizer import hnsw_metadata
+
+def test_export_and_import_round_trip(tmp_path):
+	"""
+	Tests that an export rebuilds an identical collection under the configured
+	HNSW parameters, in batches smaller than the collection.
+	"""
+	source_dir, target_dir = str(tmp_path / "source"), str(tmp_path / "target")
+	embeddings = np.random.default_rng(0).random((7, 4), dtype=np.float32)
+	source = chromadb.PersistentClient(path=source_dir).create_collection("docs", metadata=hnsw_metadata(m=8))
+	source.add(
+		ids=[f"repo-{i}" for i in range(7)],
+		embeddings=embeddings.tolist(),
+		documents=[f"chunk {i}" for i in range(7)],
+		metadatas=[{"source": f"https://a/page{i}.md", "file": "repo"} for i in range(7)]
+	)
+	export_path = str(tmp_path / "docs.parquet")
+
+	export_metadata = parquet_io.export_collection(export_path, source_dir, "docs", batch_size=3)
+	imported = parquet_io.import_collection(export_path, target_dir, batch_size=3)
+
+	assert export_metadata["count"] == 7 and export_metadata["dimension"] == 4
+	assert parquet_io.read_export_metadata(export_path)["collection_metadata"]["hnsw:M"] == 8
+	assert imported == 7
+	target = chromadb.PersistentClient(path=target_dir).get_collection("docs")
+	assert target.metadata == hnsw_metadata()
+	rows = target.get(ids=["repo-5"], include=["embeddings", "documents", "metadatas"])
+	assert rows["documents"] == ["chunk 5"]
+	assert rows["metadatas"] == [{"source": "https://a/page5.md", "file": "repo"}]
+	np.testing.assert_array_equal(rows["embeddings"][0], embeddings[5])
+
+def test_import_refuses_an_existing_collection_unless_replaced(tmp_path):
+	db_dir = str(tmp_path / "db")
+	collection = chromadb.PersistentClient(path=db_dir).create_collection("docs")
+	collection.add(ids=["a", "b"], embeddings=[[0.1, 0.2], [0.3, 0.4]])
+	export_path = str(tmp_path / "docs.parquet")
+	parquet_io.export_collection(export_path, db_dir, "docs")
+
+	with pytest.raises(Exception):
+		parquet_io.import_collection(export_path, db_dir)
+	assert parquet_io.import_collection(export_path, db_dir, replace=True) == 2
+
+def test_round_trip_keeps_metadata_of_mixed_rows(tmp_path):
+	"""
+	Tests that rows without metadata do not drop the metadata of the rest of their batch.
+	"""
+	source_dir, target_dir = str(tmp_path / "source"), str(tmp_path / "target")
+	source = chromadb.PersistentClient(path=source_dir).create_collection("docs")
+	source.add(ids=["a", "b", "c"], embeddings=[[0.1, 0.2], [0.3, 0.4], [0.5, 0.6]], metadatas=[{"source": "s"}, None, {"source": "t"}])
+	export_path = str(tmp_path / "docs.parquet")
+	parquet_io.export_collection(export_path, source_dir, "docs")
+
+	parquet_io.import_collection(export_path, target_dir)
+
+	rows = chromadb.PersistentClient(path=target_dir).get_collection("docs").get(ids=["a", "b", "c"], include=["metadatas"])
+	assert dict(zip(rows["ids"], rows["metadatas"])) == {"a": {"source": "s"}, "b": None, "c": {"source": "t"}}
+
+def test_export_keeps_empty_metadata_apart_from_missing_metadata():
+	page = {"ids": ["a", "b"], "embeddings": [[0.1], [0.2]], "metadatas": [{}, None]}
+	record_batch = parquet_io._to_record_batch(page, parquet_io.export_schema(1))
+	assert record_batch.column("metadata").to_pylist() == ["{}", None]
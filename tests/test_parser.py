@@ -1,9 +1,11 @@
 import pytest
 import os
+import json
 from unittest.mock import patch, mock_open
 
 from src.parser import parser
 from src.config import PROCESSED_DATA_DIR
+from src.chunkstore.chunkstore import ChunkStore
 
 @patch('src.parser.parser.RecursiveCharacterTextSplitter')
 @patch('src.parser.parser.logging')
@@ -45,45 +47,129 @@ def test_process_and_chunk_file_file_not_found(mock_logging, mock_open_func):
 	mock_logging.error.assert_called_once_with(f"Error processing file {test_filepath}: {error_message}")
 
 
+SCRAPED_CONTENT = (
+	"--- Scraped content from https://github.com/test/repo ---\n"
+	"\n\n--- Page: https://github.com/test/repo/blob/main/index.md ---\n\n"
+	"Welcome to the docs.\nSecond line."
+	"\n\n--- Page: https://github.com/test/repo/blob/main/empty.md ---\n\n"
+	"\n\n--- Page: https://github.com/test/repo/blob/main/guide.md ---\n\n"
+	"Install with pip."
+)
+
+def test_iter_pages(tmp_path):
+	"""
+	Tests that pages are split on the scraper's markers and empty pages are skipped.
+	"""
+	scraped_file = tmp_path / "test_repo.txt"
+	scraped_file.write_text(SCRAPED_CONTENT)
+
+	pages = list(parser.iter_pages(str(scraped_file)))
+
+	assert pages == [
+		("https://github.com/test/repo/blob/main/index.md", "Welcome to the docs.\nSecond line."),
+		("https://github.com/test/repo/blob/main/guide.md", "Install with pip."),
+	]
+
+@patch('src.parser.parser.CHUNK_OVERLAP', 0)
+@patch('src.parser.parser.CHUNK_SIZE', 20)
+def test_iter_page_chunks_do_not_cross_pages(tmp_path):
+	"""
+	Tests that every chunk comes from exactly one page and carries its URL.
+	"""
+	scraped_file = tmp_path / "test_repo.txt"
+	scraped_file.write_text(SCRAPED_CONTENT)
+
+	chunks = list(parser.iter_page_chunks(str(scraped_file)))
+
+	assert chunks == [
+		("Welcome to the docs.", {"source": "https://github.com/test/repo/blob/main/index.md"}),
+		("Second line.", {"source": "https://github.com/test/repo/blob/main/index.md"}),
+		("Install with pip.", {"source": "https://github.com/test/repo/blob/main/guide.md"}),
+	]
+
 @patch('src.parser.parser.logging')
-@patch('src.parser.parser.open', new_callable=mock_open)
-@patch('src.parser.parser.process_and_chunk_file')
-@patch('os.path.basename')
-@patch('os.path.exists')
-@patch('os.makedirs')
-def test_parse_and_chunk_files(
-	mock_makedirs,
-	mock_exists,
-	mock_basename,
-	mock_process,
-	mock_open_func,
-	mock_logging):
+def test_parse_and_chunk_files(mock_logging, tmp_path):
 	"""
 	Tests the main entry point, parse_and_chunk_files, for a successful scenario.
 	"""
-	input_files = ["/path/to/file1.txt", "/path/to/file2.txt"]
-	chunks_map = {
-		"/path/to/file1.txt": ["chunk1", "chunk2"],
-		"/path/to/file2.txt": ["chunk3"]
-	}
-	out_fnames = ["processed_file1.txt", "processed_file2.txt"]
-	written_data = ["chunk1\n---CHUNK---\nchunk2", "chunk3"]
+	scraped_file = tmp_path / "test_repo.txt"
+	scraped_file.write_text(SCRAPED_CONTENT)
+	empty_file = tmp_path / "empty_repo.txt"
+	empty_file.write_text("--- Scraped content from https://github.com/test/empty ---\n")
+	output_dir = tmp_path / "processed"
+	output_dir.mkdir()
+	legacy_output = output_dir / "processed_test_repo.txt"
+	legacy_output.write_text("old chunk")
 
-	mock_exists.return_value = True
-	mock_process.side_effect = lambda f: chunks_map.get(f, [])
-	mock_basename.side_effect = lambda p: p.split('/')[-1]
+	with patch('src.parser.parser.PROCESSED_DATA_DIR', str(output_dir)):
+		result_dir = parser.parse_and_chunk_files([str(scraped_file), str(empty_file), str(tmp_path / "missing.txt")])
 
-	result_dir = parser.parse_and_chunk_files(input_files)
+	assert sorted(os.listdir(output_dir)) == ["processed_test_repo.chunks", "processed_test_repo.idx", "processed_test_repo.meta.json"]
+	with ChunkStore(str(output_dir / "processed_test_repo")) as store:
+		assert list(store) == [
+			("Welcome to the docs.\nSecond line.", {"source": "https://github.com/test/repo/blob/main/index.md"}),
+			("Install with pip.", {"source": "https://github.com/test/repo/blob/main/guide.md"}),
+		]
+	mock_logging.info.assert_called_with(f"All parsing and chunking tasks complete. Output is in '{output_dir}'")
+	assert result_dir == str(output_dir)
+
+def make_word_tokenizer():
+	"""
+	A whitespace word-level tokenizer with BERT-style special tokens, standing
+	in for the embedding model's tokenizer.
+	"""
+	from tokenizers import Tokenizer, models, pre_tokenizers, processors
+	from transformers import PreTrainedTokenizerFast
+	vocab = {"[UNK]": 0, "[CLS]": 1, "[SEP]": 2}
+	tokenizer = Tokenizer(models.WordLevel(vocab, unk_token="[UNK]"))
+	tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+	tokenizer.post_processor = processors.TemplateProcessing(
+		single="[CLS] $A [SEP]", special_tokens=[("[CLS]", 1), ("[SEP]", 2)]
+	)
+	return PreTrainedTokenizerFast(tokenizer_object=tokenizer, unk_token="[UNK]", cls_token="[CLS]", sep_token="[SEP]")
+
+@patch('src.parser.parser.CHUNK_TOKEN_OVERLAP_RATIO', 0.25)
+@patch('src.parser.parser.load_tokenizer', return_value=(make_word_tokenizer(), 10))
+def test_token_chunking_fits_max_seq_length(mock_load_tokenizer):
+	"""
+	Tests that token mode sizes chunks so that, with special tokens, none is
+	longer than max_seq_length and nothing is truncated.
+	"""
+	assert parser.token_budget() == (8, 2)
+	text = " ".join(f"word{i}" for i in range(40))
+
+	chunks = parser.make_text_splitter("tokens").split_text(text)
+
+	assert len(chunks) > 4
+	assert all(length <= 10 for length in parser.token_lengths(chunks))
+	assert parser.token_lengths([text]) == [42]
+
+@pytest.mark.parametrize("sentence_bert_config, expected", [({"max_seq_length": 12}, 12), ({}, 64)])
+def test_load_tokenizer_reads_only_tokenizer_and_config(tmp_path, sentence_bert_config, expected):
+	"""
+	Tests that the tokenizer and max_seq_length come from the model's files,
+	falling back to the position embeddings like sentence-transformers does.
+	"""
+	from transformers import BertConfig
+	(tmp_path / "0_Transformer").mkdir()
+	(tmp_path / "modules.json").write_text(json.dumps([
+		{"idx": 0, "name": "0", "path": "0_Transformer", "type": "sentence_transformers.models.Transformer"},
+		{"idx": 1, "name": "1", "path": "1_Pooling", "type": "sentence_transformers.models.Pooling"},
+	]))
+	make_word_tokenizer().save_pretrained(str(tmp_path / "0_Transformer"))
+	BertConfig(max_position_embeddings=64).save_pretrained(str(tmp_path / "0_Transformer"))
+	(tmp_path / "0_Transformer" / "sentence_bert_config.json").write_text(json.dumps(sentence_bert_config))
 
-	mock_makedirs.assert_called_once_with(PROCESSED_DATA_DIR, exist_ok=True)
-	assert mock_process.call_count == 2
-	assert mock_open_func.call_count == 2
+	parser.load_tokenizer.cache_clear()
+	try:
+		with patch('src.parser.parser.EMBEDDING_MODEL_NAME', str(tmp_path)):
+			tokenizer, max_seq_length = parser.load_tokenizer()
+	finally:
+		parser.load_tokenizer.cache_clear()
 
-	for i, fname in enumerate(out_fnames):
-		expected_path = os.path.join(PROCESSED_DATA_DIR, fname)
-		mock_open_func.assert_any_call(expected_path, 'w')
-		handle = mock_open_func()
-		handle.write.assert_any_call(written_data[i])
+	assert max_seq_length == expected
+	assert tokenizer("word0 word1")["input_ids"] == [1, 0, 0, 2]
 
-	mock_logging.info.assert_called_with(f"All parsing and chunking tasks complete. Output is in '{PROCESSED_DATA_DIR}'")
-	assert str(result_dir) == str(PROCESSED_DATA_DIR)
\ No newline at end of file
+def test_make_text_splitter_rejects_unknown_mode():
+	with pytest.raises(ValueError):
+		parser.make_text_splitter("sentences")
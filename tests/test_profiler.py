@@ -0,0 +1,120 @@
+import os
+import json
+import pstats
+import threading
+import contextvars
+
+from src.profiling import profiler
+from src.profiling.profiler import PipelineProfiler
+
+def test_stage_and_count_are_noops_without_active_profiler():
+	"""
+	Tests that instrumented code runs unchanged outside a profiled run.
+	"""
+	with profiler.stage("parser") as record:
+		profiler.count(files_in=1)
+	assert record is None
+
+def test_stage_records_and_rolls_up_counters(tmp_path):
+	"""
+	Tests that nested stages accumulate timings and counters roll up to parents.
+	"""
+	pipeline_profiler = PipelineProfiler(output_dir=str(tmp_path))
+	with pipeline_profiler.activate():
+		with profiler.stage("vectorizer"):
+			for _ in range(3):
+				with profiler.stage("vectorizer:encode"):
+					profiler.count(chunks_in=10, bytes_in=100)
+
+	report = pipeline_profiler.report()
+	stages = {s["name"]: s for s in report["stages"]}
+
+	assert stages["vectorizer:encode"]["calls"] == 3
+	assert stages["vectorizer:encode"]["counters"] == {"chunks_in": 30, "bytes_in": 300}
+	assert stages["vectorizer"]["counters"] == {"chunks_in": 30, "bytes_in": 300}
+	assert stages["vectorizer"]["wall_s"] >= stages["vectorizer:encode"]["wall_s"]
+	assert report["peak_rss_mb"] > 0
+	assert 0 < stages["vectorizer:encode"]["peak_rss_mb"] <= stages["vectorizer"]["peak_rss_mb"] <= report["peak_rss_mb"]
+	assert set(stages["vectorizer"]["throughput_per_s"]) == {"chunks_in", "bytes_in"}
+
+def test_counts_from_worker_threads_reach_parent_stage(tmp_path):
+	"""
+	Tests the copy_context() pattern used by the scraper thread pool.
+	"""
+	pipeline_profiler = PipelineProfiler(output_dir=str(tmp_path))
+
+	def work(name):
+		with profiler.stage(f"scraper:{name}", per_thread=True):
+			profiler.count(pages_out=2)
+
+	with pipeline_profiler.activate():
+		with profiler.stage("scraper"):
+			threads = [threading.Thread(target=contextvars.copy_context().run, args=(work, n)) for n in ("a", "b")]
+			for t in threads:
+				t.start()
+			for t in threads:
+				t.join()
+
+	stages = {s["name"]: s for s in pipeline_profiler.report()["stages"]}
+	assert stages["scraper"]["counters"] == {"pages_out": 4}
+	assert stages["scraper:a"]["counters"] == {"pages_out": 2}
+
+def test_write_report_and_cprofile_dump(tmp_path):
+	"""
+	Tests the JSON report and the optional cProfile dump of the chosen stage.
+	"""
+	pipeline_profiler = PipelineProfiler(profile_stage="parser", output_dir=str(tmp_path))
+	with pipeline_profiler.activate():
+		with profiler.stage("parser"):
+			sum(range(1000))
+		with profiler.stage("vectorizer"):
+			pass
+
+	report_path = pipeline_profiler.write_report()
+
+	with open(report_path) as f:
+		report = json.load(f)
+	assert [s["name"] for s in report["stages"]] == ["parser", "vectorizer"]
+	dumps = [name for name in os.listdir(tmp_path) if name.endswith(".prof")]
+	assert dumps == [f"ingest_{pipeline_profiler.run_id}_parser.prof"]
+
+def test_cprofile_collects_every_entry_of_the_stage(tmp_path):
+	"""
+	Tests that a stage entered many times, also from concurrent threads, is
+	profiled into a single dump covering all of its entries.
+	"""
+	def extract_page():
+		sum(range(100))
+
+	def work():
+		for _ in range(5):
+			with profiler.stage("scraper:extract", per_thread=True):
+				extract_page()
+
+	pipeline_profiler = PipelineProfiler(profile_stage="scraper:extract", output_dir=str(tmp_path))
+	with pipeline_profiler.activate():
+		threads = [threading.Thread(target=contextvars.copy_context().run, args=(work,)) for _ in range(4)]
+		for t in threads:
+			t.start()
+		for t in threads:
+			t.join()
+	pipeline_profiler.write_report()
+
+	stats = pstats.Stats(str(tmp_path / f"ingest_{pipeline_profiler.run_id}_scraper_extract.prof"))
+	calls = {func[2]: stat[1] for func, stat in stats.stats.items()}
+	assert calls["extract_page"] == 20
+
+def test_stage_records_the_rss_high_water_mark_it_reached(tmp_path):
+	"""
+	Tests that a stage that allocates shows a higher peak RSS than the stage before it.
+	"""
+	pipeline_profiler = PipelineProfiler(output_dir=str(tmp_path))
+	with pipeline_profiler.activate():
+		with profiler.stage("parser"):
+			pass
+		with profiler.stage("vectorizer"):
+			block = b"x" * (256 * 1024 * 1024)
+			del block
+
+	stages = {s["name"]: s for s in pipeline_profiler.report()["stages"]}
+	assert stages["vectorizer"]["peak_rss_mb"] - stages["parser"]["peak_rss_mb"] >= 200
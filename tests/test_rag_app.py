@@ -1,10 +1,23 @@
+import os
+import json
+import time
+import asyncio
+import threading
 from fastapi.testclient import TestClient
-from unittest.mock import patch
+from unittest.mock import patch, AsyncMock, MagicMock
 import pytest
+from langchain_core.documents import Document
 
-from src.rag_app.main import app
+from src.chunkstore.chunkstore import ChunkStoreWriter, ChunkStoreCatalog
+from src.rag_app.result_cache import ResultCache
+from src.rag_app import main
+from src.rag_app.main import app, PipelineState, swap_index
 client = TestClient(app)
 
+def make_pipeline(answer_snapshot=None, chunk_catalog=None, version="v1"):
+	"""A pipeline state with a mocked retriever and QA chain."""
+	return PipelineState(version, None, None, f"docs:{version}:2", MagicMock(), MagicMock(), answer_snapshot or {}, chunk_catalog)
+
 def test_read_root():
 	"""
 	Test the root endpoint to ensure the service is running.
@@ -13,11 +26,11 @@ def test_read_root():
 	assert response.status_code == 200
 	assert response.json() == {"message": "MLOps Q&A Bot is running!"}
 
-@patch('src.rag_app.main.qa_chain')
-def test_query_endpoint_success(mock_qa_chain):
+@patch('src.rag_app.main.pipeline', new_callable=make_pipeline)
+def test_query_endpoint_success(mock_pipeline):
 	"""
 	Test the /query endpoint for a successful response.
-	It mocks the qa_chain to avoid calling the actual LLM.
+	It mocks the pipeline's qa_chain to avoid calling the actual LLM.
 	"""
 	# configure the mock object
 	mock_result = {
@@ -26,7 +39,7 @@ def test_query_endpoint_success(mock_qa_chain):
 			type('obj', (object,), {'metadata': {'source': 'doc1.html'}})()
 		]
 	}
-	mock_qa_chain.invoke.return_value = mock_result
+	mock_pipeline.qa_chain.ainvoke = AsyncMock(return_value=mock_result)
 
 	# make api request 
 	question = 'What is ZenML?'
@@ -39,9 +52,9 @@ def test_query_endpoint_success(mock_qa_chain):
 	assert response_data['source_documents'] == ['doc1.html']
 
 	# verify the mock was called correctly
-	mock_qa_chain.invoke.assert_called_once_with({'query': question})
+	mock_pipeline.qa_chain.ainvoke.assert_awaited_once_with({'query': question})
 
-@patch('src.rag_app.main.qa_chain', None)
+@patch('src.rag_app.main.pipeline', None)
 def test_query_endpoint_chain_unavailable():
 	"""
 	Tests the /query endpoint for the case where the RAG chain fails to initialize.
@@ -51,4 +64,310 @@ def test_query_endpoint_chain_unavailable():
 
 	# assert results
 	assert response.status_code == 500
-	assert response.json() == {'detail': "RAG pipeline is not available."}
\ No newline at end of file
+	assert response.json() == {'detail': "RAG pipeline is not available."}
+
+@patch('src.rag_app.main.pipeline', new_callable=make_pipeline)
+def test_query_endpoint_deadline_exceeded(mock_pipeline):
+	"""
+	Tests that a generation outliving the request's deadline is cancelled and counted.
+	"""
+	cancelled = []
+	async def slow_generation(inputs):
+		try:
+			await asyncio.sleep(10)
+		except asyncio.CancelledError:
+			cancelled.append(inputs)
+			raise
+	mock_pipeline.qa_chain.ainvoke = AsyncMock(side_effect=slow_generation)
+	expired_before = client.get('/stats').json()['queries']['expired']
+
+	response = client.post('/query', json={'question': 'Slow?'}, headers={'X-Request-Timeout': '0.2'})
+
+	assert response.status_code == 504
+	assert response.json() == {'detail': "Query deadline exceeded."}
+	assert cancelled == [{'query': 'Slow?'}]
+	assert client.get('/stats').json()['queries']['expired'] == expired_before + 1
+
+@patch('src.rag_app.main.pipeline', new_callable=make_pipeline)
+def test_query_endpoint_rejects_invalid_timeout_header(mock_pipeline):
+	response = client.post('/query', json={'question': 'q'}, headers={'X-Request-Timeout': '-1'})
+	assert response.status_code == 400
+	mock_pipeline.qa_chain.ainvoke.assert_not_called()
+
+def make_documents(sources):
+	return [Document(page_content=f"content of {s}", metadata={'source': s}) for s in sources]
+
+@patch('src.rag_app.main.llm')
+@patch('src.rag_app.main.pipeline', new_callable=make_pipeline)
+def test_batch_query_endpoint_success(mock_pipeline, mock_llm):
+	"""
+	Tests that the batch endpoint retrieves once for all questions and answers in request order.
+	"""
+	questions = ['What is ZenML?', 'What is DVC?']
+	zenml_docs, dvc_docs = make_documents(['zenml.txt']), make_documents(['dvc.txt'])
+	mock_pipeline.retriever.retrieve_many.return_value = [[(zenml_docs[0], 0.1)], [(dvc_docs[0], 0.2)]]
+	mock_llm.invoke.side_effect = lambda prompt: "ZenML answer" if "zenml.txt" in prompt else "DVC answer"
+
+	response = client.post('/query/batch', json={'questions': questions, 'parallelism': 2})
+
+	assert response.status_code == 200
+	results = response.json()['results']
+	assert [r['answer'] for r in results] == ["ZenML answer", "DVC answer"]
+	assert [r['source_documents'] for r in results] == [['zenml.txt'], ['dvc.txt']]
+	assert [r['index'] for r in results] == [0, 1]
+	mock_pipeline.retriever.retrieve_many.assert_called_once_with(questions)
+	assert mock_llm.invoke.call_count == 2
+	mock_pipeline.qa_chain.invoke.assert_not_called()
+
+@patch('src.rag_app.main.generate_answer')
+@patch('src.rag_app.main.retrieve_batch')
+@patch('src.rag_app.main.pipeline', new_callable=make_pipeline)
+def test_batch_query_endpoint_stream(mock_pipeline, mock_retrieve, mock_generate):
+	"""
+	Tests NDJSON streaming, including a question whose generation fails.
+	"""
+	mock_retrieve.return_value = [make_documents(['a.txt']), make_documents(['b.txt'])]
+	def generate(question, documents):
+		if question == 'bad':
+			raise RuntimeError("llm down")
+		return f"answer to {question}"
+	mock_generate.side_effect = generate
+
+	response = client.post('/query/batch', json={'questions': ['good', 'bad'], 'stream': True})
+
+	assert response.status_code == 200
+	assert response.headers['content-type'].startswith('application/x-ndjson')
+	lines = sorted((json.loads(line) for line in response.text.splitlines()), key=lambda r: r['index'])
+	assert lines[0]['answer'] == "answer to good"
+	assert lines[0]['source_documents'] == ['a.txt']
+	assert lines[1]['error'] == "Failed to process the query."
+
+@patch('src.rag_app.main.generate_answer')
+@patch('src.rag_app.main.retrieve_batch')
+def test_batch_stream_stops_generating_when_client_disconnects(mock_retrieve, mock_generate):
+	"""
+	Tests that a streamed batch drops the generations its client will not read.
+	"""
+	mock_retrieve.return_value = [make_documents(['a.txt']), make_documents(['b.txt']), make_documents(['c.txt'])]
+	release = threading.Event()
+	def generate(question, documents):
+		if question == 'second':
+			release.wait(5)
+		return f"answer to {question}"
+	mock_generate.side_effect = generate
+	request = MagicMock()
+	request.is_disconnected = AsyncMock(return_value=True)
+	batch_request = main.BatchQueryRequest(questions=['first', 'second', 'third'], parallelism=1, stream=True)
+
+	async def consume(response):
+		return [line async for line in response.body_iterator]
+
+	response = main.answer_batch(make_pipeline(), batch_request, request)
+	assert asyncio.run(consume(response)) == []
+	release.set()
+	time.sleep(0.2)
+
+	# 'second' may have started before the disconnect; 'third' never does
+	generated = [call.args[0] for call in mock_generate.call_args_list]
+	assert generated[0] == 'first' and 'third' not in generated
+
+@patch('src.rag_app.main.pipeline', None)
+def test_batch_query_endpoint_chain_unavailable():
+	response = client.post('/query/batch', json={'questions': ['q']})
+	assert response.status_code == 500
+	assert response.json() == {'detail': "RAG pipeline is not available."}
+
+@patch('src.rag_app.main.pipeline', new_callable=make_pipeline)
+def test_batch_query_endpoint_rejects_empty_batch(mock_pipeline):
+	response = client.post('/query/batch', json={'questions': []})
+	assert response.status_code == 422
+
+
+def test_read_chunk(tmp_path):
+	"""
+	Tests fetching chunk text by its vector database id from the chunk stores.
+	"""
+	with ChunkStoreWriter(str(tmp_path / "processed_repo")) as writer:
+		writer.add("chunk zero", {"source": "https://a/index.md"})
+		writer.add("chunk one", {"source": "https://a/guide.md"})
+
+	with patch('src.rag_app.main.pipeline', make_pipeline(chunk_catalog=ChunkStoreCatalog(str(tmp_path)))):
+		response = client.get('/chunks/processed_repo-1')
+		missing = client.get('/chunks/processed_repo-2')
+
+	assert response.status_code == 200
+	assert response.json() == {"id": "processed_repo-1", "text": "chunk one", "metadata": {"source": "https://a/guide.md"}}
+	assert missing.status_code == 404
+
+SNAPSHOT = {"what is zenml": {"question": "What is ZenML?", "answer": "Precomputed.", "source_documents": ["https://a/zenml.md"]}}
+
+@patch('src.rag_app.main.pipeline', new_callable=lambda: make_pipeline(answer_snapshot=SNAPSHOT))
+def test_query_endpoint_serves_precomputed_answer(mock_pipeline):
+	"""
+	Tests that exact (normalized) hits in the answer snapshot skip the RAG chain.
+	"""
+	response = client.post('/query', json={'question': 'what is zenml'})
+
+	assert response.status_code == 200
+	assert response.json() == {"answer": "Precomputed.", "source_documents": ["https://a/zenml.md"]}
+	mock_pipeline.qa_chain.ainvoke.assert_not_called()
+
+@patch('src.rag_app.main.generate_answer', return_value="Generated.")
+@patch('src.rag_app.main.retrieve_batch')
+@patch('src.rag_app.main.pipeline', new_callable=lambda: make_pipeline(answer_snapshot=SNAPSHOT))
+def test_batch_query_endpoint_mixes_precomputed_answers(mock_pipeline, mock_retrieve, mock_generate):
+	"""
+	Tests that only snapshot misses are retrieved and generated, and order is kept.
+	"""
+	mock_retrieve.return_value = [make_documents(['dvc.txt'])]
+
+	response = client.post('/query/batch', json={'questions': ['What is DVC?', 'What is ZenML?']})
+
+	results = response.json()['results']
+	assert [r['answer'] for r in results] == ["Generated.", "Precomputed."]
+	mock_retrieve.assert_called_once_with(['What is DVC?'], mock_pipeline)
+
+@patch('src.rag_app.main.retrieve_cache', ResultCache(16, 60))
+@patch('src.rag_app.main.pipeline', new_callable=make_pipeline)
+def test_retrieve_endpoint_filters_sources_and_caches(mock_pipeline):
+	"""
+	Tests that /retrieve passes k and the source filter to the retriever,
+	returns distances, and answers a repeated question from its cache.
+	"""
+	mock_pipeline.retriever.retrieve_many.return_value = [[
+		(Document(page_content="ZenML is a pipeline tool.", metadata={"source": "https://a/zenml.md"}, id="repo-3"), 0.25)
+	]]
+	body = {'question': 'What is ZenML?', 'k': 3, 'sources': ['https://a/zenml.md', 'https://a/dvc.md']}
+
+	first = client.post('/retrieve', json=body)
+	second = client.post('/retrieve', json={**body, 'question': 'what is zenml'})
+
+	assert first.status_code == 200
+	assert first.json() == {
+		"results": [{"id": "repo-3", "text": "ZenML is a pipeline tool.", "metadata": {"source": "https://a/zenml.md"}, "distance": 0.25}],
+		"cached": False
+	}
+	assert second.json()['cached'] is True
+	mock_pipeline.retriever.retrieve_many.assert_called_once_with(
+		['What is ZenML?'], k=3, where={"$or": [
+			{"source": {"$in": ['https://a/dvc.md', 'https://a/zenml.md']}},
+			{"duplicate_source:https://a/dvc.md": True},
+			{"duplicate_source:https://a/zenml.md": True},
+		]}
+	)
+
+@patch('src.rag_app.main.pipeline', new_callable=make_pipeline)
+def test_retrieve_endpoint_rejects_large_k(mock_pipeline):
+	response = client.post('/retrieve', json={'question': 'What is ZenML?', 'k': 10_000})
+	assert response.status_code == 422
+	mock_pipeline.retriever.retrieve_many.assert_not_called()
+
+def test_profile_endpoint_is_disabled_by_default():
+	assert client.post('/admin/profile', json={'seconds': 0.1}).status_code == 404
+
+def test_profile_endpoint_samples_the_process(tmp_path):
+	with patch('src.rag_app.main.PROFILE_ENABLED', True), patch('src.rag_app.main.PROFILE_DIR', tmp_path):
+		response = TestClient(app, client=("127.0.0.1", 50000)).post('/admin/profile', json={'seconds': 0.1})
+
+	assert response.status_code == 200
+	profile = response.json()
+	assert profile['samples'] > 0
+	assert (tmp_path / os.path.basename(profile['file'])).exists()
+	assert len(profile['top_stacks']) <= 10
+
+def test_profile_endpoint_needs_the_token_from_remote_clients(tmp_path):
+	with patch('src.rag_app.main.PROFILE_ENABLED', True), patch('src.rag_app.main.PROFILE_DIR', tmp_path), patch('src.rag_app.main.PROFILE_TOKEN', "secret"):
+		refused = client.post('/admin/profile', json={'seconds': 0.1}, headers={'X-Profile-Token': "wrong"})
+		allowed = client.post('/admin/profile', json={'seconds': 0.1}, headers={'X-Profile-Token': "secret"})
+
+	assert refused.status_code == 403
+	assert allowed.status_code == 200
+
+def test_profile_endpoint_runs_one_profile_at_a_time(tmp_path):
+	with patch('src.rag_app.main.PROFILE_ENABLED', True), patch('src.rag_app.main.PROFILE_DIR', tmp_path), main.admin_profile_lock:
+		response = TestClient(app, client=("127.0.0.1", 50000)).post('/admin/profile', json={'seconds': 0.1})
+
+	assert response.status_code == 409
+	assert not list(tmp_path.iterdir())
+
+def make_published_pipeline(version):
+	state = make_pipeline(version=version)
+	state.client, state.collection = MagicMock(), MagicMock()
+	state.collection.count.return_value = 2
+	return state
+
+def test_swap_index_keeps_in_flight_queries_on_the_old_index():
+	"""
+	Tests that a query started before an index swap finishes on the old index,
+	later queries use the new one, and the old index is closed once the
+	query using it is done.
+	"""
+	old, new = make_published_pipeline("v1"), make_published_pipeline("v2")
+	async def publish_while_answering(inputs):
+		with patch('src.rag_app.main.build_pipeline_state', return_value=new):
+			assert swap_index({"version": "v2", "collection": "docs"})
+		old.client.close.assert_not_called()
+		return {"result": "answer from v1", "source_documents": []}
+	old.qa_chain.ainvoke = AsyncMock(side_effect=publish_while_answering)
+	new.qa_chain.ainvoke = AsyncMock(return_value={"result": "answer from v2", "source_documents": []})
+
+	with patch('src.rag_app.main.pipeline', old), patch('src.rag_app.main.retrieve_cache', ResultCache(16, 60)) as cache:
+		cache.put("stale", [])
+		first = client.post('/query', json={'question': 'q'})
+		second = client.post('/query', json={'question': 'q'})
+		assert client.get('/stats').json()['index']['version'] == "v2"
+		assert len(cache) == 0
+
+	assert first.json()['answer'] == "answer from v1"
+	assert second.json()['answer'] == "answer from v2"
+	new.retriever.retrieve_many.assert_called_once_with(["warm up"], k=1)
+	old.client.close.assert_called_once()
+	new.client.close.assert_not_called()
+
+def test_swap_index_refuses_an_empty_collection():
+	new = make_published_pipeline("v2")
+	new.collection.count.return_value = 0
+	with patch('src.rag_app.main.build_pipeline_state', return_value=new), patch('src.rag_app.main.pipeline', make_pipeline()) as current:
+		with pytest.raises(ValueError):
+			swap_index({"version": "v2", "collection": "docs"})
+		assert main.pipeline is current
+	new.client.close.assert_called_once()
+
+def test_retired_index_closes_its_own_chunk_catalog_only():
+	"""
+	Tests that retiring a state closes a catalog opened for its version but
+	leaves the module-level catalog shared by unpublished states open.
+	"""
+	owned, shared = make_published_pipeline("v1"), make_published_pipeline("v2")
+	owned.chunk_catalog = MagicMock()
+	with patch('src.rag_app.main.chunk_catalog', MagicMock()) as module_catalog:
+		shared.chunk_catalog = module_catalog
+		owned.retire()
+		shared.retire()
+	owned.chunk_catalog.close.assert_called_once()
+	module_catalog.close.assert_not_called()
+
+@patch('src.rag_app.main.generate_answer')
+@patch('src.rag_app.main.retrieve_batch')
+def test_retired_index_stays_open_until_a_streamed_batch_is_done(mock_retrieve, mock_generate):
+	"""
+	Tests that /query/batch holds its index while it streams, like /query.
+	"""
+	old, new = make_published_pipeline("v1"), make_published_pipeline("v2")
+	mock_retrieve.return_value = [make_documents(['a.txt']), make_documents(['b.txt'])]
+	def generate(question, documents):
+		if question == 'first':
+			with patch('src.rag_app.main.build_pipeline_state', return_value=new):
+				swap_index({"version": "v2", "collection": "docs"})
+			assert not old.closed
+		return f"answer to {question}"
+	mock_generate.side_effect = generate
+
+	with patch('src.rag_app.main.pipeline', old):
+		response = client.post('/query/batch', json={'questions': ['first', 'second'], 'parallelism': 1, 'stream': True})
+		assert main.pipeline is new
+
+	assert len(response.text.splitlines()) == 2
+	assert old.closed and old.users == 0
+	old.client.close.assert_called_once()
+	assert new.users == 0 and not new.closed
@@ -0,0 +1,28 @@
+from unittest.mock import patch
+
+from src.rag_app.result_cache import ResultCache
+
+def test_evicts_least_recently_used():
+	cache = ResultCache(maxsize=2, ttl_seconds=60)
+	cache.put("a", 1)
+	cache.put("b", 2)
+	assert cache.get("a") == 1
+	cache.put("c", 3)
+	assert cache.get("b") is None
+	assert (cache.get("a"), cache.get("c")) == (1, 3)
+	assert (cache.hits, cache.misses) == (3, 1)
+
+def test_entries_expire():
+	cache = ResultCache(maxsize=2, ttl_seconds=10)
+	with patch('src.rag_app.result_cache.time.monotonic', return_value=100.0):
+		cache.put("a", 1)
+	with patch('src.rag_app.result_cache.time.monotonic', return_value=109.0):
+		assert cache.get("a") == 1
+	with patch('src.rag_app.result_cache.time.monotonic', return_value=111.0):
+		assert cache.get("a") is None
+	assert len(cache) == 0
+
+def test_zero_size_disables_caching():
+	cache = ResultCache(maxsize=0, ttl_seconds=10)
+	cache.put("a", 1)
+	assert cache.get("a") is None
@@ -0,0 +1,78 @@
+import chromadb
+from unittest.mock import MagicMock
+
+from src.rag_app.retriever import CollectionRetriever, source_filter
+from src.vectorizer.vectorizer import to_chroma_metadata
+
+def make_retriever(query_result, chunk_catalog=None):
+	collection = MagicMock()
+	collection.query.return_value = query_result
+	embedding_function = MagicMock()
+	embedding_function.embed_documents.side_effect = lambda texts: [[float(i)] for i, _ in enumerate(texts)]
+	return CollectionRetriever(collection=collection, embedding_function=embedding_function, k=2, chunk_catalog=chunk_catalog)
+
+def test_retrieve_many_batches_embedding_and_query():
+	"""
+	Tests that questions share one embedding call and one collection query.
+	"""
+	retriever = make_retriever({
+		'ids': [['a-0', 'a-1'], ['b-0']],
+		'documents': [['text a0', 'text a1'], ['text b0']],
+		'metadatas': [[{'source': 'a'}, {'source': 'a'}], [None]],
+		'distances': [[0.1, 0.2], [0.3]],
+	})
+
+	results = retriever.retrieve_many(['q1', 'q2'], where={'source': 'a'})
+
+	retriever.embedding_function.embed_documents.assert_called_once_with(['q1', 'q2'])
+	retriever.collection.query.assert_called_once_with(
+		query_embeddings=[[0.0], [1.0]],
+		n_results=2,
+		where={'source': 'a'},
+		include=["documents", "metadatas", "distances"]
+	)
+	assert [[(d.page_content, d.id, score) for d, score in r] for r in results] == [
+		[('text a0', 'a-0', 0.1), ('text a1', 'a-1', 0.2)],
+		[('text b0', 'b-0', 0.3)],
+	]
+	assert results[1][0][0].metadata == {}
+
+def test_missing_documents_are_read_from_chunk_store():
+	"""
+	Tests hydration of chunk text when the collection stores only vectors.
+	"""
+	catalog = MagicMock()
+	catalog.get.side_effect = lambda chunk_id: {'a-0': 'from store'}[chunk_id]
+	retriever = make_retriever({
+		'ids': [['a-0', 'gone-0']],
+		'documents': [[None, None]],
+		'metadatas': [[{}, {}]],
+		'distances': [[0.1, 0.2]],
+	}, chunk_catalog=catalog)
+
+	documents = retriever.invoke('q')
+
+	assert [d.page_content for d in documents] == ['from store', '']
+
+def test_source_filter_finds_chunks_that_absorbed_the_page(tmp_path):
+	"""
+	Tests that filtering on a page whose chunk was merged into another page's
+	chunk returns that chunk, without the filter entries in its metadata.
+	"""
+	collection = chromadb.PersistentClient(path=str(tmp_path)).create_collection("docs")
+	collection.add(
+		ids=["a-0", "c-0"],
+		embeddings=[[1.0, 0.0], [0.0, 1.0]],
+		metadatas=[
+			to_chroma_metadata({"source": "https://a/install.md", "duplicate_sources": ["https://b/install.md"]}),
+			to_chroma_metadata({"source": "https://c/other.md"}),
+		]
+	)
+	retriever = CollectionRetriever(collection=collection, embedding_function=MagicMock(), k=2)
+
+	absorbed = retriever.search_by_vectors([[1.0, 0.0]], where=source_filter(["https://b/install.md"]))[0]
+	both = retriever.search_by_vectors([[1.0, 0.0]], where=source_filter(["https://b/install.md", "https://c/other.md"]))[0]
+
+	assert [document.id for document, _ in absorbed] == ["a-0"]
+	assert absorbed[0][0].metadata == {"source": "https://a/install.md", "duplicate_sources": "https://b/install.md"}
+	assert [document.id for document, _ in both] == ["a-0", "c-0"]
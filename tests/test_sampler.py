@@ -0,0 +1,82 @@
+import time
+import threading
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.profiling.sampler import StackSampler, RequestProfilerMiddleware, fold_stack, may_profile
+
+def busy_loop(stop: threading.Event):
+	while not stop.is_set():
+		sum(range(1000))
+
+def test_sampler_records_running_threads_and_skips_idle_ones():
+	stop = threading.Event()
+	busy = threading.Thread(target=busy_loop, args=(stop,), name="busy worker")
+	idle = threading.Thread(target=stop.wait, name="idle")
+	busy.start()
+	idle.start()
+	try:
+		with StackSampler(interval_seconds=0.001) as sampler:
+			time.sleep(0.2)
+	finally:
+		stop.set()
+		busy.join()
+		idle.join()
+
+	assert sampler.samples > 0
+	busy_stacks = [stack for stack in sampler.stacks if stack.startswith("busy_worker;")]
+	assert busy_stacks and all("tests.test_sampler:busy_loop" in stack for stack in busy_stacks)
+	assert not any(stack.startswith("idle;") for stack in sampler.stacks)
+	for line in sampler.folded().splitlines():
+		stack, count = line.rsplit(" ", 1)
+		assert " " not in stack and int(count) > 0
+
+def test_fold_stack_is_root_first():
+	def inner():
+		import sys
+		return fold_stack(sys._getframe(), "main")
+	frames = inner().split(";")
+	assert frames[0] == "main"
+	assert frames[-1] == "tests.test_sampler:test_fold_stack_is_root_first.<locals>.inner"
+	assert frames[-2] == "tests.test_sampler:test_fold_stack_is_root_first"
+
+def test_middleware_profiles_requests_with_the_header(tmp_path):
+	app = FastAPI()
+	@app.get("/work")
+	def work():
+		time.sleep(0.05)
+		return {"ok": True}
+	app.add_middleware(RequestProfilerMiddleware, output_dir=str(tmp_path), interval_seconds=0.001)
+	client = TestClient(app, client=("127.0.0.1", 50000))
+
+	plain = client.get("/work")
+	profiled = client.get("/work", headers={"X-Profile": "1"})
+
+	assert "x-profile-file" not in plain.headers
+	profile_file = tmp_path / profiled.headers["x-profile-file"]
+	assert profile_file.name.endswith("_GET_work.folded")
+	assert "tests.test_sampler:test_middleware_profiles_requests_with_the_header.<locals>.work" in profile_file.read_text()
+	assert len(list(tmp_path.iterdir())) == 1
+
+def test_may_profile_requires_a_local_client_or_the_token():
+	assert may_profile("127.0.0.1", None, "")
+	assert may_profile("::1", None, "secret")
+	assert not may_profile("10.0.0.7", None, "")
+	assert not may_profile("10.0.0.7", "", "")
+	assert not may_profile("10.0.0.7", "wrong", "secret")
+	assert may_profile("10.0.0.7", "secret", "secret")
+
+def test_middleware_ignores_the_header_from_remote_clients_without_the_token(tmp_path):
+	app = FastAPI()
+	@app.get("/work")
+	def work():
+		return {"ok": True}
+	app.add_middleware(RequestProfilerMiddleware, output_dir=str(tmp_path), interval_seconds=0.001, admin_token="secret")
+	client = TestClient(app, client=("10.0.0.7", 50000))
+
+	refused = client.get("/work", headers={"X-Profile": "1", "X-Profile-Token": "wrong"})
+	profiled = client.get("/work", headers={"X-Profile": "1", "X-Profile-Token": "secret"})
+
+	assert "x-profile-file" not in refused.headers
+	assert (tmp_path / profiled.headers["x-profile-file"]).exists()
+	assert len(list(tmp_path.iterdir())) == 1
@@ -57,8 +57,8 @@ def test_extract_text_from_file_success(mock_file, mock_trafilatura):
 	"""
 	expected_result = "extracted text"
 	mock_trafilatura.return_value = expected_result
-	result = scraper.extract_text_from_file("dummy/path.md")
-	mock_file.assert_called_once_with("dummy/path.md", 'r')
+	result = scraper.extract_text_from_file("dummy/path.html")
+	mock_file.assert_called_once_with("dummy/path.html", 'r')
 	mock_trafilatura.assert_called_once_with("file content", include_comments=False, include_tables=False)
 	assert result == expected_result
 
@@ -69,7 +69,7 @@ def test_extract_text_from_file_no_text(mock_file, mock_trafilatura):
 	Tests the case where trafilatura returns None (no main text found).
 	"""
 	mock_trafilatura.return_value = None
-	result = scraper.extract_text_from_file("dummy/path.md")
+	result = scraper.extract_text_from_file("dummy/path.html")
 	assert result == ''
 
 @patch("builtins.open", side_effect=IOError("File not found"))
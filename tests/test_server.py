@@ -0,0 +1,137 @@
+import os
+import time
+import signal
+import threading
+from unittest.mock import patch
+
+from src.rag_app import main
+from src.rag_app.server import PreforkSupervisor, bind_socket
+
+def test_bind_socket_is_inheritable_by_workers():
+	"""
+	Tests that the listening socket survives the fork into the workers.
+	"""
+	sock = bind_socket("127.0.0.1", 0)
+	try:
+		assert sock.getsockname()[1] > 0
+		assert sock.get_inheritable()
+	finally:
+		sock.close()
+
+@patch('src.rag_app.main.connect_pipeline')
+@patch('src.rag_app.main.load_embedding_model')
+def test_init_pipeline_without_connect_only_loads_model(mock_load, mock_connect):
+	"""
+	Tests that the pre-fork parent loads the model but opens no database client.
+	"""
+	with patch('src.rag_app.main.embedding_function', None):
+		main.init_pipeline(connect=False)
+	mock_load.assert_called_once()
+	mock_connect.assert_not_called()
+
+@patch('src.rag_app.main.connect_pipeline')
+@patch('src.rag_app.main.load_embedding_model')
+def test_init_pipeline_in_worker_reuses_loaded_model(mock_load, mock_connect):
+	"""
+	Tests that a worker connects without reloading the model loaded before the fork.
+	"""
+	with patch('src.rag_app.main.embedding_function', object()):
+		main.init_pipeline()
+	mock_load.assert_not_called()
+	mock_connect.assert_called_once()
+
+def test_supervisor_restarts_crashed_worker_and_stops(tmp_path):
+	"""
+	Tests that a worker that dies is restarted and that stop() ends all workers.
+	"""
+	def target(worker_id):
+		with open(tmp_path / f"start-{worker_id}-{os.getpid()}", 'w'):
+			pass
+		# the first worker 0 crashes once; every other worker runs until stopped
+		crash_marker = tmp_path / "crashed"
+		if worker_id == 0 and not crash_marker.exists():
+			crash_marker.touch()
+			raise RuntimeError("worker crashed")
+		time.sleep(30)
+
+	supervisor = PreforkSupervisor(target, workers=2, restart_delay=0)
+
+	def stop_after_restart():
+		deadline = time.monotonic() + 10
+		while len(list(tmp_path.glob("start-*"))) < 3 and time.monotonic() < deadline:
+			time.sleep(0.05)
+		supervisor.stop()
+
+	stopper = threading.Thread(target=stop_after_restart)
+	previous_handlers = signal.getsignal(signal.SIGTERM), signal.getsignal(signal.SIGINT)
+	try:
+		stopper.start()
+		supervisor.run()
+	finally:
+		stopper.join()
+		signal.signal(signal.SIGTERM, previous_handlers[0])
+		signal.signal(signal.SIGINT, previous_handlers[1])
+
+	starts = sorted(p.name.split("-")[1] for p in tmp_path.glob("start-*"))
+	assert starts == ["0", "0", "1"]
+	assert supervisor.children == {}
+
+def test_supervisor_gives_up_on_a_crash_looping_worker(tmp_path):
+	"""
+	Tests that a worker crashing at startup is restarted with a growing delay
+	a limited number of times, after which the supervisor stops and fails.
+	"""
+	def target(worker_id):
+		with open(tmp_path / f"start-{worker_id}-{os.getpid()}", 'w'):
+			pass
+		if worker_id == 0:
+			raise RuntimeError("missing index")
+		time.sleep(30)
+
+	supervisor = PreforkSupervisor(target, workers=2, restart_delay=0.01, max_crash_restarts=2)
+	previous_handlers = signal.getsignal(signal.SIGTERM), signal.getsignal(signal.SIGINT)
+	try:
+		exit_code = supervisor.run()
+	finally:
+		signal.signal(signal.SIGTERM, previous_handlers[0])
+		signal.signal(signal.SIGINT, previous_handlers[1])
+
+	assert exit_code == 1
+	assert len(list(tmp_path.glob("start-0-*"))) == 3
+	assert supervisor.children == {}
+	assert [supervisor.backoff(n) for n in (1, 2, 3)] == [0.01, 0.02, 0.04]
+	assert PreforkSupervisor(target, 1, restart_delay=1, max_restart_delay=30).backoff(10) == 30
+
+def test_supervisor_reaps_and_stops_during_a_restart_backoff(tmp_path):
+	"""
+	Tests that while one crashed worker waits out a long backoff, another
+	worker's exit is still handled and stop() ends the run at once.
+	"""
+	def target(worker_id):
+		if worker_id == 1:
+			time.sleep(0.3)
+		raise RuntimeError("worker crashed")
+
+	supervisor = PreforkSupervisor(target, workers=2, restart_delay=30)
+
+	def stop_after_both_crashed():
+		deadline = time.monotonic() + 10
+		while len(supervisor.crashes) < 2 and time.monotonic() < deadline:
+			time.sleep(0.05)
+		supervisor.stop()
+
+	stopper = threading.Thread(target=stop_after_both_crashed)
+	previous_handlers = signal.getsignal(signal.SIGTERM), signal.getsignal(signal.SIGINT)
+	started = time.monotonic()
+	try:
+		stopper.start()
+		exit_code = supervisor.run()
+	finally:
+		stopper.join()
+		signal.signal(signal.SIGTERM, previous_handlers[0])
+		signal.signal(signal.SIGINT, previous_handlers[1])
+
+	assert time.monotonic() - started < 10
+	assert exit_code == 0
+	assert supervisor.crashes == {0: 1, 1: 1}
+	assert supervisor.children == {}
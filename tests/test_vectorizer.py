@@ -4,6 +4,14 @@ from unittest.mock import mock_open, patch, MagicMock
 
 import src.vectorizer.vectorizer as vectorizer
 from src.config import EMBEDDING_MODEL_NAME, DB_DIR, COLLECTION_NAME
+from src.chunkstore.chunkstore import ChunkStoreWriter
+
+@pytest.fixture(autouse=True)
+def journal_file(tmp_path):
+	"""Keeps the vectorization journal of every test out of the data directory."""
+	journal_path = tmp_path / "journal" / "vectorize_journal.jsonl"
+	with patch('src.vectorizer.vectorizer.VECTORIZE_JOURNAL_FILE', journal_path):
+		yield journal_path
 
 test_cases = [
 	(
@@ -46,6 +54,22 @@ def test_read_chunks_from_file(test_id, file_content, expected_output):
 		assert result == expected_output
 		mock_file.assert_called_once_with("dummy_path.txt", 'r')
 
+def test_read_chunk_records_from_file(tmp_path):
+	"""
+	Tests reading page-aware chunks with their metadata from a JSON Lines file.
+	"""
+	jsonl_file = tmp_path / "processed_repo.jsonl"
+	jsonl_file.write_text(
+		'{"text": " chunk1 ", "source": "https://a/index.md"}\n'
+		'\n'
+		'{"text": "  ", "source": "https://a/empty.md"}\n'
+		'{"text": "chunk2", "source": "https://a/guide.md"}\n'
+	)
+	assert vectorizer.read_chunk_records_from_file(str(jsonl_file)) == [
+		("chunk1", {"source": "https://a/index.md"}),
+		("chunk2", {"source": "https://a/guide.md"}),
+	]
+
 @patch('src.vectorizer.vectorizer.os')
 @patch('src.vectorizer.vectorizer.logging')
 @patch('src.vectorizer.vectorizer.chromadb')
@@ -77,8 +101,8 @@ def test_vectorize_and_store(mock_read_chunks, mock_sentence_transformer, mock_c
 	mock_sentence_transformer.assert_called_once_with(EMBEDDING_MODEL_NAME)
 	mock_model.encode.assert_called_once_with(['chunk1', 'chunk2'], show_progress_bar=True)
 	mock_chromadb.PersistentClient.assert_called_once_with(path=test_db_path)
-	mock_client.get_or_create_collection.assert_called_once_with(name=COLLECTION_NAME)
-	mock_collection.add.assert_called_once_with(
+	mock_client.get_or_create_collection.assert_called_once_with(name=COLLECTION_NAME, metadata=vectorizer.hnsw_metadata())
+	mock_collection.upsert.assert_called_once_with(
 		embeddings=mock_embeddings.tolist(),
 		documents=['chunk1', 'chunk2'],
 		metadatas=[{'source': "test_file.txt"}, {'source': "test_file.txt"}],
@@ -101,4 +125,154 @@ def test_vectorize_and_store_no_chunks(mock_sentence_transformer, mock_read_chun
 	with patch("src.vectorizer.vectorizer.DB_DIR", test_db_path):
 		vectorizer.vectorize_and_store('processed_data')
 
-	mock_logging.warning.assert_called_with("No chunks found to vectorize. Exiting.")
\ No newline at end of file
+	mock_logging.warning.assert_called_with("No chunks found to vectorize. Exiting.")
+@patch('src.vectorizer.vectorizer.os')
+@patch('src.vectorizer.vectorizer.logging')
+@patch('src.vectorizer.vectorizer.chromadb')
+@patch('src.vectorizer.vectorizer.SentenceTransformer')
+@patch('src.vectorizer.vectorizer.read_chunk_records_from_file')
+def test_vectorize_and_store_page_aware_chunks(mock_read_records, mock_sentence_transformer, mock_chromadb, mock_logging, mock_os):
+	"""
+	Tests that chunks from the streaming parser keep their page URL as the source.
+	"""
+	mock_os.path.join.side_effect = lambda a, b: f"{a}/{b}"
+	mock_os.listdir.return_value = ['processed_repo.jsonl']
+	mock_os.path.isfile.return_value = True
+	mock_read_records.return_value = [('chunk1', {'source': 'https://a/index.md'})]
+	mock_sentence_transformer.return_value.encode.return_value = np.array([[0.1, 0.2]])
+	mock_collection = mock_chromadb.PersistentClient.return_value.get_or_create_collection.return_value
+
+	vectorizer.vectorize_and_store('processed_data')
+
+	mock_read_records.assert_called_once_with('processed_data/processed_repo.jsonl')
+	mock_collection.upsert.assert_called_once_with(
+		embeddings=[[0.1, 0.2]],
+		documents=['chunk1'],
+		metadatas=[{'source': 'https://a/index.md', 'file': 'processed_repo.jsonl'}],
+		ids=['processed_repo.jsonl-0']
+	)
+
+@patch('src.vectorizer.vectorizer.CHROMA_STORE_DOCUMENTS', False)
+@patch('src.vectorizer.vectorizer.chromadb')
+@patch('src.vectorizer.vectorizer.SentenceTransformer')
+def test_vectorize_and_store_from_chunk_store(mock_sentence_transformer, mock_chromadb, tmp_path):
+	"""
+	Tests streaming from a chunk store in batches, storing vectors without document text.
+	"""
+	with ChunkStoreWriter(str(tmp_path / "processed_repo")) as writer:
+		for i in range(5):
+			writer.add(f"chunk{i}", {'source': f"https://a/page{i}.md"})
+	mock_sentence_transformer.return_value.encode.side_effect = lambda chunks, show_progress_bar: np.zeros((len(chunks), 2))
+	mock_collection = mock_chromadb.PersistentClient.return_value.get_or_create_collection.return_value
+
+	with patch('src.vectorizer.vectorizer.VECTORIZE_BATCH_SIZE', 2):
+		vectorizer.vectorize_and_store(str(tmp_path))
+
+	assert mock_collection.upsert.call_count == 3
+	first_batch = mock_collection.upsert.call_args_list[0].kwargs
+	assert first_batch['ids'] == ['processed_repo-0', 'processed_repo-1']
+	assert first_batch['documents'] is None
+	assert first_batch['metadatas'][0] == {'source': 'https://a/page0.md', 'file': 'processed_repo'}
+	assert mock_collection.upsert.call_args_list[2].kwargs['ids'] == ['processed_repo-4']
+
+def test_to_chroma_metadata_flattens_lists():
+	metadata = {'source': 'https://a/install.md', 'duplicate_sources': ['https://b/install.md', 'https://c/install.md']}
+	assert vectorizer.to_chroma_metadata(metadata) == {
+		'source': 'https://a/install.md',
+		'duplicate_sources': "https://b/install.md\nhttps://c/install.md",
+		'duplicate_source:https://b/install.md': True,
+		'duplicate_source:https://c/install.md': True
+	}
+
+@patch('src.vectorizer.vectorizer.SentenceTransformer')
+def test_vectorize_and_store_applies_hnsw_parameters(mock_sentence_transformer, tmp_path, caplog):
+	"""
+	Tests that a new collection gets the configured HNSW parameters, that an
+	existing collection built with another M is reported, and that it takes the
+	configured search parameters without being reported.
+	"""
+	import chromadb
+	db_dir = str(tmp_path / "db")
+	chromadb.PersistentClient(path=db_dir).create_collection(
+		name="other_index", metadata=vectorizer.hnsw_metadata(m=8, search_ef=10, num_threads=vectorizer.HNSW_NUM_THREADS + 1)
+	)
+	processed_dir = tmp_path / "processed"
+	processed_dir.mkdir()
+
+	with patch('src.vectorizer.vectorizer.DB_DIR', db_dir):
+		with patch('src.vectorizer.vectorizer.COLLECTION_NAME', "new_index"):
+			vectorizer.vectorize_and_store(str(processed_dir))
+		with patch('src.vectorizer.vectorizer.COLLECTION_NAME', "other_index"):
+			vectorizer.vectorize_and_store(str(processed_dir))
+
+	collection = chromadb.PersistentClient(path=db_dir).get_collection("new_index")
+	assert collection.configuration["hnsw"]["space"] == vectorizer.HNSW_SPACE
+	assert {key: value for key, value in vectorizer.hnsw_metadata().items() if key != "hnsw:space"}.items() <= collection.metadata.items()
+	assert f"'hnsw:M': {vectorizer.HNSW_M}" in caplog.text and "other_index" in caplog.text
+	assert "search_ef" not in caplog.text and "num_threads" not in caplog.text
+	other = chromadb.PersistentClient(path=db_dir).get_collection("other_index")
+	assert other.configuration["hnsw"]["ef_search"] == vectorizer.HNSW_SEARCH_EF
+	assert other.configuration["hnsw"]["max_neighbors"] == 8
+	assert other.metadata["hnsw:num_threads"] == vectorizer.HNSW_NUM_THREADS
+
+@patch('src.vectorizer.vectorizer.chromadb')
+@patch('src.vectorizer.vectorizer.SentenceTransformer')
+def test_vectorize_and_store_resumes_after_interruption(mock_sentence_transformer, mock_chromadb, tmp_path):
+	"""
+	Tests that a resumed run skips the batches and files the interrupted run
+	already stored, and that changed inputs start the run over.
+	"""
+	processed_dir = tmp_path / "processed"
+	processed_dir.mkdir()
+	for name in ("repo_a", "repo_b"):
+		with ChunkStoreWriter(str(processed_dir / name)) as writer:
+			for i in range(3):
+				writer.add(f"{name} chunk{i}", {'source': f"https://{name}/page{i}.md"})
+	encoded = []
+	def encode(chunks, show_progress_bar):
+		if chunks == ["repo_b chunk2"]:
+			raise KeyboardInterrupt()
+		encoded.extend(chunks)
+		return np.zeros((len(chunks), 2))
+	mock_sentence_transformer.return_value.encode.side_effect = encode
+	mock_collection = mock_chromadb.PersistentClient.return_value.get_or_create_collection.return_value
+
+	with patch('src.vectorizer.vectorizer.VECTORIZE_BATCH_SIZE', 2):
+		with pytest.raises(KeyboardInterrupt):
+			vectorizer.vectorize_and_store(str(processed_dir))
+		assert mock_collection.upsert.call_count == 3
+		encoded.clear()
+		mock_sentence_transformer.return_value.encode.side_effect = lambda chunks, show_progress_bar: encoded.extend(chunks) or np.zeros((len(chunks), 2))
+
+		vectorizer.vectorize_and_store(str(processed_dir), resume=True)
+		assert encoded == ["repo_b chunk2"]
+		assert mock_collection.upsert.call_args.kwargs['ids'] == ['repo_b-2']
+
+		# a finished run leaves nothing to resume, so everything is stored again
+		encoded.clear()
+		vectorizer.vectorize_and_store(str(processed_dir), resume=True)
+		assert len(encoded) == 6
+
+@patch('src.vectorizer.vectorizer.SentenceTransformer')
+def test_vectorize_and_store_changes_the_collection_version_with_its_inputs(mock_sentence_transformer, tmp_path):
+	"""
+	Tests that re-ingesting changed documents into the same collection, with the
+	same ids and chunk count, still gives it a new version.
+	"""
+	import chromadb
+	from src.rag_app.answer_cache import get_collection_version
+	mock_sentence_transformer.return_value.encode.side_effect = lambda chunks, show_progress_bar: np.ones((len(chunks), 2))
+	db_dir, processed_dir = str(tmp_path / "db"), tmp_path / "processed"
+	processed_dir.mkdir()
+	def ingest(text):
+		with ChunkStoreWriter(str(processed_dir / "repo")) as writer:
+			writer.add(text, {'source': "https://a/page.md"})
+		with patch('src.vectorizer.vectorizer.DB_DIR', db_dir):
+			vectorizer.vectorize_and_store(str(processed_dir))
+		return get_collection_version(chromadb.PersistentClient(path=db_dir).get_collection(COLLECTION_NAME))
+
+	first = ingest("old text")
+	second = ingest("new text")
+
+	assert first != second
+	assert first.rsplit(":", 1)[0] == second.rsplit(":", 1)[0]